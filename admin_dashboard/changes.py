@@ -0,0 +1,44 @@
+"""
+Change tracking for delta-synced dashboard analytics.
+
+Saving or deleting an Order (or one of its items) or a ChatSession (or its
+feedback or messages) stamps the day it belongs to with a version, a microsecond
+timestamp taken once the transaction commits. A client holding a version
+token only needs the buckets stamped after it.
+"""
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AnalyticsChange
+
+# Versions come from the clocks of different processes, so look back a little
+# further than the client's token rather than risk missing a change
+CLOCK_SKEW = 2 * 1_000_000
+
+
+def now_version():
+    return int(time.time() * 1_000_000)
+
+
+def mark_changed(source, created_at):
+    """Stamp the day of ``created_at`` as changed once the transaction commits"""
+    day = timezone.localdate(created_at)
+
+    def record():
+        AnalyticsChange.objects.update_or_create(
+            source=source, date=day, defaults={'version': now_version()}
+        )
+
+    transaction.on_commit(record)
+
+
+def changes_since(version):
+    """Map each source to the days changed after ``version``"""
+    changed = {}
+    for source, day in AnalyticsChange.objects.filter(
+        version__gt=version - CLOCK_SKEW
+    ).values_list('source', 'date'):
+        changed.setdefault(source, set()).add(day)
+    return changed
@@ -0,0 +1,229 @@
+"""
+Columnar export of orders, order items, chat sessions and chat messages.
+
+Each entity is written with typed columns as Parquet or Arrow IPC when
+``pyarrow`` is installed, or as gzip-compressed NDJSON otherwise. Rows are
+read with ``QuerySet.iterator()`` and written in batches of BATCH_SIZE, so
+memory use does not grow with the table. ``export_entity`` partitions the
+output by day (``<entity>/date=YYYY-MM-DD/part-0.<ext>``), the layout most
+analysis tools load as a partitioned dataset.
+
+Chat messages of archived sessions live in cold storage (see
+chatbot.archive) and are not part of the chat_messages export.
+"""
+import gzip
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from store.models import Order, OrderItem
+from chatbot.models import ChatSession, ChatMessage
+from chatbot.analytics import day_bounds
+
+BATCH_SIZE = 5000
+
+# Entity -> (queryset, partition field, [(column, lookup, type)])
+ENTITIES = {
+    'orders': (Order.objects.all(), 'created_at', [
+        ('id', 'id', 'int64'),
+        ('user_id', 'user_id', 'int64'),
+        ('email', 'email', 'string'),
+        ('status', 'status', 'string'),
+        ('total_amount', 'total_amount', 'decimal'),
+        ('created_at', 'created_at', 'timestamp'),
+        ('updated_at', 'updated_at', 'timestamp'),
+    ]),
+    'order_items': (OrderItem.objects.all(), 'order__created_at', [
+        ('id', 'id', 'int64'),
+        ('order_id', 'order_id', 'int64'),
+        ('product_id', 'product_id', 'int64'),
+        ('sku', 'product__sku', 'string'),
+        ('quantity', 'quantity', 'int64'),
+        ('price', 'price', 'decimal'),
+        ('order_created_at', 'order__created_at', 'timestamp'),
+    ]),
+    'chat_sessions': (ChatSession.objects.all(), 'created_at', [
+        ('id', 'id', 'int64'),
+        ('session_id', 'session_id', 'string'),
+        ('user_id', 'user_id', 'int64'),
+        ('channel', 'channel', 'string'),
+        ('status', 'status', 'string'),
+        ('is_escalated', 'is_escalated', 'bool'),
+        ('created_at', 'created_at', 'timestamp'),
+        ('updated_at', 'updated_at', 'timestamp'),
+        ('ended_at', 'ended_at', 'timestamp'),
+        ('archived_at', 'archived_at', 'timestamp'),
+    ]),
+    'chat_messages': (ChatMessage.objects.all(), 'timestamp', [
+        ('id', 'id', 'int64'),
+        ('session_id', 'session__session_id', 'string'),
+        ('message_type', 'message_type', 'string'),
+        ('content', 'content', 'string'),
+        ('intent', 'intent', 'string'),
+        ('confidence_score', 'confidence_score', 'float64'),
+        ('response_time', 'response_time', 'float64'),
+        ('timestamp', 'timestamp', 'timestamp'),
+    ]),
+}
+
+FORMATS = {
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('.arrow', 'application/vnd.apache.arrow.file'),
+    'ndjson': ('.ndjson.gz', 'application/gzip'),
+}
+
+
+def export_root():
+    return Path(getattr(settings, 'ANALYTICS_EXPORT_ROOT', Path(settings.BASE_DIR) / 'exports'))
+
+
+def available_formats():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ['ndjson']
+    return ['parquet', 'arrow', 'ndjson']
+
+
+def default_format():
+    return available_formats()[0]
+
+
+def iter_batches(entity, start=None, end=None):
+    """Yield lists of row tuples ordered by the entity's partition field"""
+    queryset, partition_field, columns = ENTITIES[entity]
+    if start:
+        queryset = queryset.filter(**{f'{partition_field}__gte': day_bounds(start)[0]})
+    if end:
+        queryset = queryset.filter(**{f'{partition_field}__lt': day_bounds(end)[1]})
+    rows = queryset.order_by(partition_field, 'pk').values_list(
+        *[lookup for _, lookup, _ in columns]
+    ).iterator(chunk_size=BATCH_SIZE)
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class NDJSONWriter:
+    """One JSON object per line, gzip-compressed"""
+
+    def __init__(self, fileobj, columns):
+        self.names = [name for name, _, _ in columns]
+        self.file = gzip.open(fileobj, 'wt', encoding='utf-8')
+
+    def write_batch(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(dict(zip(self.names, row)), cls=DjangoJSONEncoder) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowWriter:
+    """Typed record batches written as Parquet or an Arrow IPC file"""
+
+    def __init__(self, fileobj, columns, fmt):
+        import pyarrow as pa
+
+        self.pa = pa
+        types = {
+            'int64': pa.int64(),
+            'string': pa.string(),
+            'bool': pa.bool_(),
+            'float64': pa.float64(),
+            'decimal': pa.decimal128(10, 2),
+            'timestamp': pa.timestamp('us', tz='UTC'),
+        }
+        self.schema = pa.schema([pa.field(name, types[kind]) for name, _, kind in columns])
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(fileobj, self.schema)
+        else:
+            self.writer = pa.ipc.new_file(fileobj, self.schema)
+
+    def write_batch(self, rows):
+        arrays = [
+            self.pa.array([row[index] for row in rows], type=field.type)
+            for index, field in enumerate(self.schema)
+        ]
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(fileobj, entity, fmt):
+    """Open a batch writer on a path or binary file object"""
+    columns = ENTITIES[entity][2]
+    if fmt == 'ndjson':
+        return NDJSONWriter(fileobj, columns)
+    return ArrowWriter(fileobj, columns, fmt)
+
+
+def write_entity(entity, fileobj, fmt, start=None, end=None):
+    """Write one entity to a single file object. Returns the row count"""
+    writer = open_writer(fileobj, entity, fmt)
+    count = 0
+    try:
+        for batch in iter_batches(entity, start, end):
+            writer.write_batch(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
+
+
+def export_entity(entity, fmt=None, output_dir=None, start=None, end=None):
+    """Write one entity partitioned by day under ``output_dir``
+
+    Returns ``{path: row count}`` for the files written. Existing files of
+    the days written are replaced, so re-running an export is safe.
+    """
+    fmt = fmt or default_format()
+    extension = FORMATS[fmt][0]
+    output_dir = Path(output_dir or export_root()) / entity
+    partition_index = [lookup for _, lookup, _ in ENTITIES[entity][2]].index(ENTITIES[entity][1])
+
+    written = {}
+    writer = path = current_day = None
+    try:
+        for batch in iter_batches(entity, start, end):
+            # Rows arrive ordered by the partition field, so each day's rows
+            # are contiguous; split the batch where the day changes
+            for day, rows in _split_by_day(batch, partition_index):
+                if day != current_day:
+                    if writer:
+                        writer.close()
+                    current_day = day
+                    path = output_dir / f'date={day.isoformat()}' / f'part-0{extension}'
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    writer = open_writer(str(path), entity, fmt)
+                    written[path] = 0
+                writer.write_batch(rows)
+                written[path] += len(rows)
+    finally:
+        if writer:
+            writer.close()
+    return written
+
+
+def _split_by_day(batch, partition_index):
+    day, rows = None, []
+    for row in batch:
+        row_day = timezone.localdate(row[partition_index])
+        if row_day != day and rows:
+            yield day, rows
+            rows = []
+        day = row_day
+        rows.append(row)
+    if rows:
+        yield day, rows
@@ -0,0 +1,100 @@
+"""
+Live dashboard events over Server-Sent Events.
+
+Signals on orders, chat sessions, escalations and stock alerts publish small
+events once their transaction commits. Each event is stored as a
+DashboardEvent row, so reconnecting browsers can resume from their
+Last-Event-ID, and pushed through the chat push broker (chatbot.push) on the
+DASHBOARD_CHANNEL. Open dashboards hold one async SSE connection subscribed
+to that channel, like chat widgets, so no worker thread is tied up while
+they wait. Set CHATBOT_PUSH_BACKEND to a shared broker when running several
+workers.
+
+A stream ends after STREAM_DURATION and EventSource reconnects on its own.
+"""
+import asyncio
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max
+
+from chatbot.push import get_broker
+from .models import DashboardEvent
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CHANNEL = 'dashboard:events'
+
+# Seconds between keep-alive comments on an idle stream, and before a stream
+# is closed for the browser to reconnect
+HEARTBEAT = 15
+STREAM_DURATION = 120
+
+# Events kept for reconnecting clients; older ones are pruned as new ones arrive
+RETAINED_EVENTS = 1000
+
+
+def publish(kind, **payload):
+    """Record and push an event for open dashboards once the transaction commits"""
+    def record():
+        event = DashboardEvent.objects.create(kind=kind, payload=payload)
+        if event.pk % 100 == 0:
+            DashboardEvent.objects.filter(pk__lte=event.pk - RETAINED_EVENTS).delete()
+        try:
+            get_broker().publish(DASHBOARD_CHANNEL, {
+                'id': event.pk, 'kind': kind, 'data': json.dumps(payload, cls=DjangoJSONEncoder),
+            })
+        except Exception as e:
+            # Connected dashboards pick the event up from the table when they reconnect
+            logger.error(f"Error pushing dashboard event {event.pk}: {e}")
+
+    transaction.on_commit(record)
+
+
+def latest_id():
+    return DashboardEvent.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def last_id_before(when):
+    """Id of the last event recorded before ``when``
+
+    Pages rendered from metrics computed at ``when`` open their stream from
+    here, so events recorded after the figures were computed are replayed.
+    """
+    return DashboardEvent.objects.filter(created_at__lt=when).aggregate(last=Max('pk'))['last'] or 0
+
+
+def format_event(event_id, kind, data):
+    return f'id: {event_id}\nevent: {kind}\ndata: {data}\n\n'
+
+
+async def stream(last_id=None, duration=STREAM_DURATION):
+    """Yield SSE messages for events after ``last_id`` for ``duration`` seconds
+
+    Without ``last_id`` only events published after subscribing are sent.
+    """
+    # Subscribe before reading the backlog so nothing slips in between
+    subscription = await get_broker().subscribe(DASHBOARD_CHANNEL)
+    try:
+        yield 'retry: 3000\n\n'
+        if last_id is None:
+            last_id = (await DashboardEvent.objects.aaggregate(last=Max('pk')))['last'] or 0
+
+        async for event in DashboardEvent.objects.filter(pk__gt=last_id).order_by('pk'):
+            yield format_event(event.pk, event.kind, json.dumps(event.payload, cls=DjangoJSONEncoder))
+            last_id = event.pk
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        while loop.time() < deadline:
+            message = await subscription.get(timeout=min(HEARTBEAT, max(deadline - loop.time(), 0)))
+            if message is None:
+                # Comments keep proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+            elif message['id'] > last_id:
+                yield format_event(message['id'], message['kind'], message['data'])
+                last_id = message['id']
+    finally:
+        await subscription.close()
@@ -0,0 +1,115 @@
+"""
+Streaming CSV export of dashboard data.
+
+Rows are read with ``QuerySet.iterator()`` in fixed-size chunks and written to
+the response as they are produced, so memory use stays flat however many
+products, orders and chat sessions are exported.
+"""
+import csv
+import io
+import zlib
+
+from django.db.models import Count
+
+from store.models import Product, Order
+from chatbot.models import ChatSession
+from chatbot.analytics import day_bounds
+
+# Rows fetched per database round trip, and bytes buffered before a chunk is
+# handed to the response
+CHUNK_SIZE = 2000
+FLUSH_SIZE = 64 * 1024
+
+
+def product_rows(start=None, end=None):
+    yield ['Name', 'Category', 'Price', 'Stock', 'SKU', 'Active']
+    for product in Product.objects.select_related('category').order_by('pk').iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            product.name,
+            product.category.name,
+            product.price,
+            product.stock_quantity,
+            product.sku,
+            'Yes' if product.is_active else 'No'
+        ]
+
+
+def order_rows(start=None, end=None):
+    yield ['Order ID', 'Customer', 'Total Amount', 'Status', 'Date']
+    orders = _in_range(Order.objects.select_related('user'), start, end)
+    for order in orders.order_by('pk').iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            order.id,
+            order.user.username if order.user else order.email,
+            order.total_amount,
+            order.get_status_display(),
+            order.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        ]
+
+
+def chat_session_rows(start=None, end=None):
+    yield ['Session ID', 'User', 'Channel', 'Messages Count', 'Escalated', 'Date']
+    sessions = _in_range(ChatSession.objects.select_related('user'), start, end).annotate(
+        message_count=Count('messages')
+    )
+    for session in sessions.order_by('pk').iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            session.session_id,
+            session.user.username if session.user else 'Guest',
+            session.channel,
+            session.message_count,
+            'Yes' if session.is_escalated else 'No',
+            session.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        ]
+
+
+# Section name -> (heading, row generator). Date ranges apply to the
+# creation date of orders and chat sessions; products are always exported
+# in full.
+SECTIONS = {
+    'products': ('PRODUCTS DATA', product_rows),
+    'orders': ('ORDERS DATA', order_rows),
+    'chatbot': ('CHATBOT DATA', chat_session_rows),
+}
+
+
+def _in_range(queryset, start, end):
+    if start:
+        queryset = queryset.filter(created_at__gte=day_bounds(start)[0])
+    if end:
+        queryset = queryset.filter(created_at__lt=day_bounds(end)[1])
+    return queryset
+
+
+def export_rows(sections, start=None, end=None):
+    """Yield the CSV rows of the selected sections, separated by blank rows"""
+    for index, name in enumerate(sections):
+        heading, rows = SECTIONS[name]
+        if index:
+            yield []
+        yield [f'=== {heading} ===']
+        yield from rows(start, end)
+
+
+def csv_chunks(rows):
+    """Encode rows as CSV, yielding roughly FLUSH_SIZE bytes at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks):
+    """Compress a byte stream into a single gzip member"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
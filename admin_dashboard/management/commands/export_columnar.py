@@ -0,0 +1,36 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.columnar import ENTITIES, FORMATS, available_formats, default_format, export_entity, export_root
+
+
+class Command(BaseCommand):
+    help = 'Export orders, order items and chat data as day-partitioned columnar files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity', action='append', choices=list(ENTITIES), default=[],
+            help='Entity to export; may be repeated (default: all)'
+        )
+        parser.add_argument(
+            '--format', choices=list(FORMATS),
+            help='parquet or arrow (requires pyarrow), or ndjson (default: best available)'
+        )
+        parser.add_argument('--start', help='First day to export (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to export (YYYY-MM-DD)')
+        parser.add_argument('--output', help=f'Output directory (default: {export_root()})')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or default_format()
+        if fmt not in available_formats():
+            raise CommandError(f'The {fmt} format requires pyarrow to be installed')
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        for entity in options['entity'] or list(ENTITIES):
+            written = export_entity(entity, fmt, options['output'], start, end)
+            self.stdout.write(self.style.SUCCESS(
+                f'{entity}: {sum(written.values())} rows in {len(written)} {fmt} partition(s)'
+            ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from admin_dashboard.reports import REPORT_PERIODS, request_report
+
+
+class Command(BaseCommand):
+    help = 'Generate a new version of the business report in the foreground'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help=f'Reporting period in days ({", ".join(map(str, REPORT_PERIODS))})'
+        )
+
+    def handle(self, *args, **options):
+        period_days = options['days']
+        if period_days not in REPORT_PERIODS:
+            raise CommandError(f'Unsupported period: {period_days} days')
+
+        report, created = request_report(period_days, background=False)
+        if not created:
+            self.stdout.write(
+                f'Business report v{report.version} ({period_days} days) is already being generated'
+            )
+            return
+        if report.status != 'completed':
+            raise CommandError(f'Business report v{report.version} failed: {report.error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated business report v{report.version} ({period_days} days): {report.file.name}'
+        ))
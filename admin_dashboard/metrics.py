@@ -0,0 +1,362 @@
+"""
+Shared stale-while-revalidate cache for dashboard metrics.
+
+Every aggregate shown on the dashboard pages is registered here with its own
+TTL. Reads return the cached value; once it is older than its TTL the stale
+value is still served while a single background worker recomputes it. A
+per-metric lock in the cache makes sure only one process recomputes a given
+metric at a time, so several open dashboards never stampede the database.
+
+Metrics that have to be computed for a page are independent of each other,
+so ``collect`` runs them concurrently on a small thread pool (see
+``fan_out``) and records how long each one took.
+"""
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from functools import partial
+
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.db.models import Count, Sum, Q, Avg, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from store.models import Product, Category, Order, DailySales, CustomerSummary
+from store.customers import cohorts as customer_cohorts
+from store.sales import category_revenue
+from store.stock import low_stock_feed
+from chatbot.models import ChatSession, ChatMessage, ChatFeedback
+from chatbot.analytics import summarize, day_bounds, activity_heatmap
+
+logger = logging.getLogger(__name__)
+
+# How long a stale value may still be served after its TTL, how long a
+# recompute lock is held at most, and how long a cold read waits for another
+# worker's recompute before computing itself
+STALE_GRACE = 3600
+LOCK_TIMEOUT = 60
+COLD_WAIT = 5
+
+# Threads, and so database connections, used to run one page's queries
+FANOUT_WORKERS = 4
+
+MetricResult = namedtuple('MetricResult', ['value', 'computed_at'])
+Metric = namedtuple('Metric', ['name', 'compute', 'ttl'])
+
+_registry = {}
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dashboard-metrics')
+_fanout_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='dashboard-fanout')
+
+
+def metric(name, ttl):
+    """Register a function computing a dashboard metric"""
+    def register(compute):
+        _registry[name] = Metric(name, compute, ttl)
+        return compute
+    return register
+
+
+def _cache_key(name, args):
+    return ':'.join(['dashboard-metric', name, *map(str, args)])
+
+
+def _compute(entry, key, args):
+    # Stamp the value with the time the computation started: it reflects at
+    # least every change committed before then
+    started = time.time()
+    value = entry.compute(*args)
+    result = MetricResult(value, started)
+    cache.set(key, result, timeout=entry.ttl + STALE_GRACE)
+    return result
+
+
+def _refresh_in_background(entry, key, args):
+    try:
+        _compute(entry, key, args)
+    except Exception as e:
+        logger.error(f"Error refreshing dashboard metric {key}: {e}")
+    finally:
+        cache.delete(key + ':lock')
+        close_old_connections()
+
+
+def get(name, *args):
+    """Return a MetricResult, recomputing in the background when stale"""
+    entry = _registry[name]
+    key = _cache_key(name, args)
+
+    result = cache.get(key)
+    if result is not None:
+        # cache.add is atomic, so only one caller wins the refresh
+        if time.time() - result.computed_at >= entry.ttl and cache.add(key + ':lock', 1, LOCK_TIMEOUT):
+            _executor.submit(_refresh_in_background, entry, key, args)
+        return result
+
+    # Cold cache: one caller computes while the others wait for its result
+    if cache.add(key + ':lock', 1, LOCK_TIMEOUT):
+        try:
+            return _compute(entry, key, args)
+        finally:
+            cache.delete(key + ':lock')
+
+    deadline = time.time() + COLD_WAIT
+    while time.time() < deadline:
+        time.sleep(0.05)
+        result = cache.get(key)
+        if result is not None:
+            return result
+    return _compute(entry, key, args)
+
+
+def invalidate(*names):
+    """Drop the cached values of unparametrized metrics"""
+    cache.delete_many([_cache_key(name, ()) for name in names])
+
+
+def _timed(task):
+    started = time.perf_counter()
+    value = task()
+    return value, (time.perf_counter() - started) * 1000
+
+
+def _run_in_worker(task):
+    try:
+        return _timed(task)
+    finally:
+        close_old_connections()
+
+
+def fan_out(tasks, on_done=None):
+    """Run independent callables concurrently on the fan-out pool
+
+    ``tasks`` maps names to callables taking no arguments. Returns
+    ``(results, timings)``, both keyed by name, with timings in milliseconds.
+    ``on_done(name)`` is called in the calling thread as each task finishes.
+
+    Inside a transaction the tasks run one after another in the calling
+    thread, since the pool's connections can't see uncommitted rows.
+    """
+    results, timings = {}, {}
+    if len(tasks) < 2 or connection.in_atomic_block:
+        for name, task in tasks.items():
+            results[name], timings[name] = _timed(task)
+            if on_done:
+                on_done(name)
+        return results, timings
+
+    futures = {_fanout_executor.submit(_run_in_worker, task): name for name, task in tasks.items()}
+    for future in as_completed(futures):
+        name = futures[future]
+        results[name], timings[name] = future.result()
+        if on_done:
+            on_done(name)
+    return results, timings
+
+
+def server_timing(timings):
+    """Format per-task timings as a Server-Timing header value"""
+    return ', '.join(f'{name};dur={duration:.1f}' for name, duration in timings.items())
+
+
+class MetricSet(dict):
+    """Values of several metrics, when the oldest was computed and how long
+    each took to fetch"""
+
+    def __init__(self, results, timings=None):
+        super().__init__((name, result.value) for name, result in results.items())
+        self.computed_at = min((result.computed_at for result in results.values()), default=time.time())
+        self.timings = timings or {}
+
+    @property
+    def computed_ago(self):
+        return int(time.time() - self.computed_at)
+
+
+def collect(*names, **parametrized):
+    """Fetch several metrics at once
+
+    Plain metrics are passed by name; parametrized ones as keyword arguments
+    mapping the metric name to its argument tuple.
+    """
+    tasks = {name: partial(get, name) for name in names}
+    tasks.update({name: partial(get, name, *args) for name, args in parametrized.items()})
+    results, timings = fan_out(tasks)
+    logger.debug(f"Dashboard metrics fetched: {server_timing(timings)}")
+    return MetricSet(results, timings)
+
+
+# Metric definitions
+
+@metric('order_stats', ttl=60)
+def order_stats():
+    """Order counts and revenue from the daily sales rollups"""
+    today = timezone.localdate()
+    week = Q(date__gte=today - timedelta(days=7))
+    stats = DailySales.objects.aggregate(
+        total_orders=Sum('order_count'),
+        total_revenue=Sum('revenue'),
+        total_delivered_revenue=Sum('delivered_revenue'),
+        today_orders=Sum('order_count', filter=Q(date=today)),
+        weekly_orders=Sum('order_count', filter=week),
+        weekly_revenue=Sum('revenue', filter=week),
+        weekly_delivered_revenue=Sum('delivered_revenue', filter=week),
+    )
+    # Aggregates can't share a name with the field they sum
+    stats['delivered_revenue'] = stats.pop('total_delivered_revenue')
+    return {key: value or 0 for key, value in stats.items()}
+
+
+@metric('product_stats', ttl=300)
+def product_stats():
+    return {
+        'total_products': Product.objects.filter(is_active=True).count(),
+        'total_categories': Category.objects.count(),
+    }
+
+
+@metric('low_stock_products', ttl=60)
+def low_stock_products():
+    """Products with an open low-stock alert, lowest stock first"""
+    return [alert.product for alert in low_stock_feed(limit=10)]
+
+
+@metric('recent_products', ttl=300)
+def recent_products():
+    return list(Product.objects.filter(is_active=True).order_by('-created_at')[:6])
+
+
+@metric('top_categories', ttl=300)
+def top_categories():
+    return list(Category.objects.annotate(
+        product_count=Count('products', filter=Q(products__is_active=True))
+    ).order_by('-product_count')[:6])
+
+
+@metric('order_status_data', ttl=60)
+def order_status_data():
+    return list(Order.objects.values('status').annotate(count=Count('id')))
+
+
+@metric('monthly_revenue', ttl=300)
+def monthly_revenue():
+    """Delivered revenue for the current calendar month and the five before it"""
+    month_starts = []
+    month = timezone.localdate().replace(day=1)
+    for _ in range(6):
+        month_starts.insert(0, month)
+        month = (month - timedelta(days=1)).replace(day=1)
+    revenue_by_month = {}
+    for day, revenue in DailySales.objects.filter(date__gte=month_starts[0]).values_list('date', 'delivered_revenue'):
+        revenue_by_month[(day.year, day.month)] = revenue_by_month.get((day.year, day.month), 0) + revenue
+    return [{
+        'month': month_start.strftime('%b %Y'),
+        'revenue': float(revenue_by_month.get((month_start.year, month_start.month)) or 0)
+    } for month_start in month_starts]
+
+
+@metric('daily_sales', ttl=300)
+def daily_sales():
+    """Delivered sales per day over the last 30 days"""
+    first_day = timezone.localdate() - timedelta(days=29)
+    sales_by_day = dict(
+        DailySales.objects.filter(date__gte=first_day).values_list('date', 'delivered_revenue')
+    )
+    return [{
+        'date': (first_day + timedelta(days=i)).strftime('%Y-%m-%d'),
+        'sales': float(sales_by_day.get(first_day + timedelta(days=i)) or 0)
+    } for i in range(30)]
+
+
+@metric('category_distribution', ttl=300)
+def category_distribution():
+    return list(Category.objects.annotate(
+        product_count=Count('products', filter=Q(products__is_active=True)),
+        revenue=category_revenue(),
+    ).filter(product_count__gt=0).values('name', 'product_count', 'revenue'))
+
+
+@metric('top_products', ttl=300)
+def top_products():
+    return list(Product.objects.annotate(
+        total_sold=Sum('sales_rollups__units_sold')
+    ).filter(total_sold__gt=0).order_by('-total_sold')[:5])
+
+
+@metric('product_performance', ttl=300)
+def product_performance():
+    return list(Product.objects.annotate(
+        total_revenue=Sum('sales_rollups__revenue'),
+        total_sold=Sum('sales_rollups__units_sold')
+    ).filter(total_revenue__gt=0).order_by('-total_revenue')[:10].values(
+        'name', 'total_revenue', 'total_sold', 'stock_quantity'
+    ))
+
+
+@metric('customer_data', ttl=300)
+def customer_data():
+    """Customer and cohort figures from the per-customer order summaries"""
+    stats = CustomerSummary.objects.aggregate(
+        total_customers=Count('id'),
+        repeat_customers=Count('id', filter=Q(order_count__gt=1)),
+        average_lifetime_value=Avg('lifetime_value'),
+        average_basket=Avg('average_basket'),
+    )
+    stats['average_lifetime_value'] = float(stats['average_lifetime_value'] or 0)
+    stats['average_basket'] = float(stats['average_basket'] or 0)
+    stats['cohorts'] = customer_cohorts()
+    return stats
+
+
+@metric('chat_stats', ttl=60)
+def chat_stats():
+    today_start, today_end = day_bounds(timezone.localdate())
+    week_start = day_bounds(timezone.localdate() - timedelta(days=7))[0]
+    return ChatSession.objects.aggregate(
+        total=Count('id'),
+        escalated=Count('id', filter=Q(is_escalated=True)),
+        today=Count('id', filter=Q(created_at__gte=today_start, created_at__lt=today_end)),
+        weekly=Count('id', filter=Q(created_at__gte=week_start)),
+    )
+
+
+@metric('chat_satisfaction', ttl=300)
+def chat_satisfaction():
+    return ChatFeedback.objects.aggregate(average=Avg('rating'), count=Count('id'))
+
+
+@metric('chat_activity', ttl=60)
+def chat_activity():
+    """Chat sessions per day over the last seven days"""
+    activity_start = timezone.localdate() - timedelta(days=6)
+    sessions_by_day = dict(
+        ChatSession.objects.filter(created_at__gte=day_bounds(activity_start)[0])
+        .annotate(day=TruncDate('created_at')).values_list('day').annotate(count=Count('id'))
+    )
+    return [{
+        'date': (activity_start + timedelta(days=i)).strftime('%m/%d'),
+        'sessions': sessions_by_day.get(activity_start + timedelta(days=i), 0)
+    } for i in range(7)]
+
+
+@metric('intent_distribution', ttl=300)
+def intent_distribution():
+    return list(ChatMessage.objects.exclude(intent='').values('intent').annotate(
+        count=Count('id')
+    ).order_by('-count')[:10])
+
+
+@metric('chatbot_summary', ttl=300)
+def chatbot_summary():
+    """All-time chatbot figures served from the daily rollups"""
+    today = timezone.localdate()
+    first_session = ChatSession.objects.aggregate(first=Min('created_at'))['first']
+    first_day = timezone.localdate(first_session) if first_session else today
+    return summarize(first_day, today)
+
+
+@metric('chat_heatmap', ttl=120)
+def chat_heatmap(window):
+    return activity_heatmap(['sessions', 'escalations'], days=window)
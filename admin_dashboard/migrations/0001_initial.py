@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('orders', 'Orders'), ('chat', 'Chat Sessions')], max_length=20)),
+                ('date', models.DateField()),
+                ('version', models.BigIntegerField(help_text='Microsecond timestamp of the latest change')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['version'], name='analyticschange_version_idx')],
+                'unique_together': {('source', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0003_dashboardevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dashboardevent',
+            name='kind',
+            field=models.CharField(choices=[('order_created', 'Order Created'), ('order_status', 'Order Status Changed'), ('order_status_bulk', 'Order Statuses Changed in Bulk'), ('chat_started', 'Chat Session Started'), ('escalation', 'Escalation Raised'), ('low_stock', 'Low Stock')], max_length=20),
+        ),
+    ]
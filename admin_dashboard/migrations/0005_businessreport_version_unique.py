@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def renumber_duplicate_versions(apps, schema_editor):
+    # Concurrent requests could create the same version twice; keep the
+    # first and move later ones to new versions
+    BusinessReport = apps.get_model('admin_dashboard', 'BusinessReport')
+    duplicates = BusinessReport.objects.values('period_days', 'version').annotate(
+        rows=Count('id')
+    ).filter(rows__gt=1)
+    for duplicate in duplicates:
+        period = BusinessReport.objects.filter(period_days=duplicate['period_days'])
+        for report in period.filter(version=duplicate['version']).order_by('created_at', 'pk')[1:]:
+            report.version = period.aggregate(last=Max('version'))['last'] + 1
+            report.save(update_fields=['version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0004_alter_dashboardevent_kind'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_versions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='businessreport',
+            constraint=models.UniqueConstraint(fields=('period_days', 'version'), name='businessreport_version_unique'),
+        ),
+    ]
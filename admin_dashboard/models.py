@@ -1,3 +1,88 @@
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-# Create your models here.
+
+class AnalyticsChange(models.Model):
+    """Latest change to the orders or chat sessions of one day
+
+    Maintained by signals on the source models so dashboard clients can ask
+    which daily buckets changed since their last fetch (see changes.py).
+    """
+    SOURCE_CHOICES = [
+        ('orders', 'Orders'),
+        ('chat', 'Chat Sessions'),
+    ]
+    
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    date = models.DateField()
+    version = models.BigIntegerField(help_text="Microsecond timestamp of the latest change")
+    
+    class Meta:
+        unique_together = ['source', 'date']
+        indexes = [
+            models.Index(fields=['version'], name='analyticschange_version_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.date} @ {self.version}"
+
+
+class BusinessReport(models.Model):
+    """A generated business report artifact
+
+    Every generation is kept as a new version; downloads serve the latest
+    completed version for the requested period.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    period_days = models.PositiveIntegerField(default=30)
+    version = models.PositiveIntegerField(default=1)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveIntegerField(default=0, help_text="Percent complete")
+    file = models.FileField(upload_to='reports/%Y/%m/', blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['period_days', 'status', 'version'], name='businessreport_latest_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['period_days', 'version'], name='businessreport_version_unique'),
+        ]
+    
+    def __str__(self):
+        return f"Business report ({self.period_days} days) v{self.version} - {self.status}"
+
+
+class DashboardEvent(models.Model):
+    """A small event pushed to open dashboards over Server-Sent Events
+
+    Published by signals on the source models and streamed by the live
+    events view (see events.py); the auto-incrementing id is the SSE event id
+    clients resume from.
+    """
+    KIND_CHOICES = [
+        ('order_created', 'Order Created'),
+        ('order_status', 'Order Status Changed'),
+        ('order_status_bulk', 'Order Statuses Changed in Bulk'),
+        ('chat_started', 'Chat Session Started'),
+        ('escalation', 'Escalation Raised'),
+        ('low_stock', 'Low Stock'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
@@ -0,0 +1,186 @@
+"""
+Background generation of business reports.
+
+``request_report`` queues a report for a period on a worker thread and
+returns its BusinessReport row, which tracks status and progress. The
+rendered HTML is saved to default storage as a new version, so downloads are
+served from the latest completed artifact instead of recomputing it. Only one
+report per period is generated at a time.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, Sum, Q, Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from store.models import Product, Category, DailySales
+from store.sales import category_revenue
+from store.stock import low_stock_feed
+from chatbot.models import ChatSession
+from chatbot.analytics import day_bounds
+from . import metrics
+from .models import BusinessReport
+
+logger = logging.getLogger(__name__)
+
+# Selectable reporting periods in days
+REPORT_PERIODS = (7, 30, 90, 365)
+
+# Reports still pending or running after this long are assumed to have died
+# with their worker and no longer block a new generation
+REPORT_TIMEOUT = timedelta(minutes=30)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='business-reports')
+
+
+def latest_report(period_days):
+    """Latest completed report for the period, or None"""
+    return BusinessReport.objects.filter(
+        period_days=period_days, status='completed'
+    ).order_by('-version').first()
+
+
+def request_report(period_days, user=None, background=True):
+    """Queue a report for the period unless one is already being generated
+
+    Versions are unique per period, so when two requests race to create the
+    next version the loser retries and joins the winner's report. With
+    ``background=False`` the report is built before returning.
+
+    Returns ``(report, created)``.
+    """
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                active = BusinessReport.objects.filter(
+                    period_days=period_days, status__in=['pending', 'running'],
+                    created_at__gte=timezone.now() - REPORT_TIMEOUT
+                ).first()
+                if active:
+                    return active, False
+
+                last_version = BusinessReport.objects.filter(
+                    period_days=period_days
+                ).aggregate(last=Max('version'))['last'] or 0
+                report = BusinessReport.objects.create(
+                    period_days=period_days, version=last_version + 1, requested_by=user
+                )
+            break
+        except IntegrityError:
+            # Another request took this version; its report is active now
+            if attempt == 2:
+                raise
+
+    if background:
+        transaction.on_commit(lambda: _executor.submit(run_report, report.pk))
+    else:
+        run_report(report.pk)
+        report.refresh_from_db()
+    return report, True
+
+
+def run_report(report_id):
+    """Worker entry point: build a queued report and record failures"""
+    try:
+        report = BusinessReport.objects.get(pk=report_id)
+        try:
+            build_report(report)
+        except Exception as e:
+            logger.error(f"Error generating business report {report_id}: {e}")
+            report.status = 'failed'
+            report.error = str(e)
+            report.save(update_fields=['status', 'error'])
+    finally:
+        close_old_connections()
+
+
+def _set_progress(report, progress, status='running'):
+    report.progress = progress
+    report.status = status
+    report.save(update_fields=['progress', 'status'])
+
+
+def build_report(report):
+    """Compute the report figures, render them and store the artifact"""
+    _set_progress(report, 0)
+    today = timezone.localdate()
+    period_first_day = today - timedelta(days=report.period_days - 1)
+    period_start = day_bounds(period_first_day)[0]
+    week_start = day_bounds(today - timedelta(days=7))[0]
+    in_period = Q(created_at__gte=period_start)
+
+    # Order and revenue figures come from the daily sales rollups
+    week = Q(date__gte=today - timedelta(days=7))
+    period = Q(date__gte=period_first_day)
+
+    # The sections are independent queries, so they run concurrently
+    sections = {
+        'order_stats': lambda: DailySales.objects.aggregate(
+            total_orders=Sum('order_count'),
+            total_revenue=Sum('delivered_revenue'),
+            weekly_orders=Sum('order_count', filter=week),
+            weekly_revenue=Sum('delivered_revenue', filter=week),
+            period_orders=Sum('order_count', filter=period),
+            period_revenue=Sum('delivered_revenue', filter=period),
+        ),
+        # Product and category rankings cover the reporting period
+        'top_products': lambda: list(Product.objects.annotate(
+            total_sold=Sum('sales_rollups__units_sold', filter=Q(sales_rollups__date__gte=period_first_day))
+        ).filter(total_sold__gt=0).order_by('-total_sold')[:5]),
+        'low_stock_products': lambda: [alert.product for alert in low_stock_feed(limit=10)],
+        'total_products': lambda: Product.objects.filter(is_active=True).count(),
+        'category_performance': lambda: list(Category.objects.annotate(
+            product_count=Count('products', filter=Q(products__is_active=True)),
+            total_revenue=category_revenue(since=period_first_day),
+        ).order_by('-product_count')),
+        'chat_stats': lambda: ChatSession.objects.aggregate(
+            total=Count('id'),
+            escalated=Count('id', filter=Q(is_escalated=True)),
+            weekly=Count('id', filter=Q(created_at__gte=week_start)),
+            period=Count('id', filter=in_period),
+        ),
+    }
+    done = []
+
+    def section_done(name):
+        done.append(name)
+        _set_progress(report, 90 * len(done) // len(sections))
+
+    results, timings = metrics.fan_out(sections, on_done=section_done)
+    logger.info(f"Business report {report.pk} sections: {metrics.server_timing(timings)}")
+    order_stats = results['order_stats']
+    chat_stats = results['chat_stats']
+
+    context = {
+        'report_date': timezone.localtime(),
+        'period': f'Last {report.period_days} Days',
+        'version': report.version,
+        'total_products': results['total_products'],
+        'total_orders': order_stats['total_orders'] or 0,
+        # Revenue in the report only counts delivered orders
+        'total_revenue': order_stats['total_revenue'] or 0,
+        'weekly_orders': order_stats['weekly_orders'] or 0,
+        'weekly_revenue': order_stats['weekly_revenue'] or 0,
+        'period_orders': order_stats['period_orders'] or 0,
+        'period_revenue': order_stats['period_revenue'] or 0,
+        'top_products': results['top_products'],
+        'category_performance': results['category_performance'],
+        'total_chat_sessions': chat_stats['total'],
+        'weekly_chat_sessions': chat_stats['weekly'],
+        'period_chat_sessions': chat_stats['period'],
+        'escalation_rate': round((chat_stats['escalated'] / max(chat_stats['total'], 1)) * 100, 1),
+        'low_stock_products': results['low_stock_products'],
+    }
+    html_content = render_to_string('admin_dashboard/business_report.html', context)
+
+    filename = f'business_report_{report.period_days}d_v{report.version}_{today.strftime("%Y%m%d")}.html'
+    report.file.save(filename, ContentFile(html_content.encode('utf-8')), save=False)
+    report.status = 'completed'
+    report.progress = 100
+    report.completed_at = timezone.now()
+    report.save(update_fields=['file', 'status', 'progress', 'completed_at'])
+    return report
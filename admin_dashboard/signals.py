@@ -0,0 +1,107 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from store.models import Order, OrderItem
+from store.signals import order_statuses_changed, products_changed, stock_alerts_opened
+from chatbot.models import ChatSession, ChatMessage, ChatFeedback, EscalationQueue
+from . import metrics
+from .changes import mark_changed
+from .events import publish
+
+
+@receiver([post_save, post_delete], sender=Order)
+def track_order_change(sender, instance, **kwargs):
+    mark_changed('orders', instance.created_at)
+
+
+@receiver(order_statuses_changed)
+def track_bulk_order_change(sender, orders, **kwargs):
+    # One stamp per affected day rather than per order
+    for created_at in {timezone.localdate(order.created_at): order.created_at for order in orders}.values():
+        mark_changed('orders', created_at)
+
+
+@receiver(products_changed)
+def refresh_product_metrics(sender, **kwargs):
+    # Bulk edits are usually checked on the dashboard right away, so don't
+    # wait for the cached product widgets to expire
+    transaction.on_commit(lambda: metrics.invalidate(
+        'product_stats', 'low_stock_products', 'recent_products', 'top_categories',
+        'category_distribution', 'product_performance',
+    ))
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def track_order_item_change(sender, instance, **kwargs):
+    mark_changed('orders', instance.order.created_at)
+
+
+@receiver([post_save, post_delete], sender=ChatSession)
+def track_chat_session_change(sender, instance, **kwargs):
+    mark_changed('chat', instance.created_at)
+
+
+@receiver([post_save, post_delete], sender=ChatFeedback)
+def track_chat_feedback_change(sender, instance, **kwargs):
+    mark_changed('chat', instance.session.created_at)
+
+
+@receiver([post_save, post_delete], sender=ChatMessage)
+def track_chat_message_change(sender, instance, **kwargs):
+    # Intent figures are bucketed by the message's own day, session
+    # durations by the day the session started
+    mark_changed('chat', instance.timestamp)
+    if timezone.localdate(instance.session.created_at) != timezone.localdate(instance.timestamp):
+        mark_changed('chat', instance.session.created_at)
+
+
+# Live dashboard events
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    # The status stored before this save, to tell status changes apart
+    if not instance._state.adding:
+        instance._previous_status = Order.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Order)
+def publish_order_event(sender, instance, created, **kwargs):
+    if created:
+        publish('order_created', id=instance.pk, status=instance.status, total_amount=instance.total_amount)
+        return
+    previous = getattr(instance, '_previous_status', None)
+    if previous and previous != instance.status:
+        publish(
+            'order_status', id=instance.pk, previous_status=previous,
+            status=instance.status, total_amount=instance.total_amount
+        )
+
+
+@receiver(order_statuses_changed)
+def publish_bulk_order_event(sender, orders, status, **kwargs):
+    previous = Counter(order.previous_status for order in orders)
+    publish('order_status_bulk', status=status, count=len(orders), previous_status=dict(previous))
+
+
+@receiver(post_save, sender=ChatSession)
+def publish_chat_started(sender, instance, created, **kwargs):
+    if created:
+        publish('chat_started', session_id=instance.session_id, channel=instance.channel)
+
+
+@receiver(post_save, sender=EscalationQueue)
+def publish_escalation(sender, instance, created, **kwargs):
+    if created:
+        publish('escalation', session_id=instance.session.session_id, priority=instance.priority)
+
+
+@receiver(stock_alerts_opened)
+def publish_low_stock(sender, alerts, **kwargs):
+    for alert in alerts:
+        publish(
+            'low_stock', product_id=alert.product_id, name=alert.product.name,
+            stock_quantity=alert.stock_quantity, threshold=alert.threshold
+        )
@@ -1,3 +1,445 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from store.models import Category, Product, Order, OrderItem, StockAlert
+from chatbot.models import ChatSession, ChatMessage, ChatFeedback
+from chatbot.push import get_broker
+from . import columnar, events, metrics, reports
+from .models import BusinessReport, DashboardEvent
+
+
+class DashboardActivityTestCase(TestCase):
+    """Staff client plus a helper creating dashboard activity"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        cls.category = Category.objects.create(name='Hardware')
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def add_activity(self, count):
+        """Create orders, products and chat sessions spread over six months"""
+        now = timezone.now()
+        for i in range(count):
+            product = Product.objects.create(
+                name=f'Product {Product.objects.count()}', category=self.category,
+                description='Test', price=Decimal('10.00'), sku=f'SKU-{Product.objects.count()}',
+                stock_quantity=i % 15
+            )
+            order = Order.objects.create(
+                user=self.staff, email='staff@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal('10.00'),
+                status='delivered' if i % 2 else 'pending'
+            )
+            Order.objects.filter(pk=order.pk).update(created_at=now - timedelta(days=i * 20))
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+
+            session = ChatSession.objects.create(session_id=f'session-{ChatSession.objects.count()}', is_escalated=i % 3 == 0)
+            ChatSession.objects.filter(pk=session.pk).update(created_at=now - timedelta(days=i))
+            ChatMessage.objects.create(session=session, message_type='bot', content='Hi', intent='greeting')
+            ChatFeedback.objects.create(session=session, rating=4)
+
+
+class DashboardQueryCountTests(DashboardActivityTestCase):
+    """Dashboard pages must issue a fixed number of queries"""
+
+    def count_queries(self, url):
+        # Measure the computation, not the metrics cache
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_dashboard_home_query_count_is_constant(self):
+        url = reverse('admin_dashboard:home')
+        self.add_activity(2)
+        baseline = self.count_queries(url)
+
+        self.add_activity(10)
+        self.assertEqual(self.count_queries(url), baseline)
+        # 14 metric queries, session, user and the live events resume point
+        self.assertLessEqual(baseline, 17)
+
+
+class MetricsCacheTests(TestCase):
+    """Dashboard metrics are served from cache and refreshed once when stale"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_fresh_value_is_served_without_queries(self):
+        first = metrics.get('order_stats')
+        with self.assertNumQueries(0):
+            self.assertEqual(metrics.get('order_stats'), first)
+
+    def test_stale_value_is_served_while_one_refresh_runs(self):
+        stale = metrics.get('order_stats')
+        ttl = metrics._registry['order_stats'].ttl
+        with mock.patch.object(metrics, '_executor') as executor, \
+                mock.patch('admin_dashboard.metrics.time.time', return_value=time.time() + ttl + 1):
+            self.assertEqual(metrics.get('order_stats'), stale)
+            self.assertEqual(metrics.get('order_stats'), stale)
+        executor.submit.assert_called_once()
+
+    def test_refresh_replaces_value_and_releases_lock(self):
+        stale = metrics.get('order_stats')
+        user = User.objects.create_user('customer')
+        # Order figures are read from the sales rollups updated on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(
+                user=user, email='a@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal('5.00')
+            )
+        entry = metrics._registry['order_stats']
+        key = metrics._cache_key('order_stats', ())
+        cache.add(key + ':lock', 1)
+        metrics._refresh_in_background(entry, key, ())
+
+        refreshed = metrics.get('order_stats')
+        self.assertEqual(refreshed.value['total_orders'], stale.value['total_orders'] + 1)
+        self.assertIsNone(cache.get(key + ':lock'))
+
+    def test_fan_out_runs_tasks_concurrently(self):
+        # Both tasks only get past the barrier if they run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        tasks = {'first': lambda: barrier.wait() >= 0, 'second': lambda: barrier.wait() >= 0}
+        with mock.patch('admin_dashboard.metrics.connection', in_atomic_block=False):
+            results, timings = metrics.fan_out(tasks)
+        self.assertEqual(results, {'first': True, 'second': True})
+        self.assertEqual(set(timings), {'first', 'second'})
+
+    def test_dashboard_reports_metric_timings(self):
+        user = User.objects.create_user('staff', is_staff=True)
+        self.client.force_login(user)
+        response = self.client.get(reverse('admin_dashboard:home'))
+        self.assertIn('order_stats;dur=', response['Server-Timing'])
+        self.assertIn('chat_activity;dur=', response['Server-Timing'])
+
+
+class AnalyticsApiDeltaTests(TestCase):
+    """analytics_api only resends buckets changed since the client's token"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.staff)
+        self.url = reverse('admin_dashboard:analytics_api')
+
+    def test_full_then_empty_delta_then_not_modified(self):
+        full = self.client.get(self.url).json()
+        self.assertTrue(full['full'])
+        self.assertEqual(len(full['daily_sales']), 30)
+
+        response = self.client.get(self.url, {'since': full['version']})
+        delta = response.json()
+        self.assertFalse(delta['full'])
+        self.assertEqual(delta['daily_sales'], [])
+        self.assertNotIn('chatbot_data', delta)
+
+        response = self.client.get(self.url, {'since': full['version']}, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_changed_day_is_resent(self):
+        version = self.client.get(self.url).json()['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(
+                user=self.staff, email='staff@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal('12.00'), status='delivered'
+            )
+        cache.clear()
+
+        delta = self.client.get(self.url, {'since': version}).json()
+        self.assertEqual(delta['daily_sales'], [
+            {'date': timezone.localdate().strftime('%Y-%m-%d'), 'sales': 12.0}
+        ])
+        self.assertIn('customer_data', delta)
+        self.assertNotIn('chatbot_data', delta)
+
+    def test_new_message_resends_chat_figures(self):
+        session = ChatSession.objects.create(session_id='delta-chat')
+        version = self.client.get(self.url).json()['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatMessage.objects.create(session=session, message_type='bot', content='Hi', intent='greeting')
+        cache.clear()
+
+        delta = self.client.get(self.url, {'since': version}).json()
+        self.assertIn('chatbot_data', delta)
+
+
+class ExportDataTests(DashboardActivityTestCase):
+    """The CSV export streams every row with a fixed number of queries"""
+
+    def read_export(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_dashboard:export_data'), params)
+            content = b''.join(response.streaming_content)
+        return response, content, len(queries)
+
+    def test_export_query_count_is_constant(self):
+        self.add_activity(2)
+        _, _, baseline = self.read_export()
+        self.add_activity(10)
+        _, content, count = self.read_export()
+        self.assertEqual(count, baseline)
+        self.assertEqual(content.decode().count('session-'), 12)
+
+    def test_sections_date_range_and_gzip(self):
+        self.add_activity(3)
+        since = (timezone.localdate() - timedelta(days=1)).isoformat()
+        response, content, _ = self.read_export(sections='chatbot', start=since, gzip='1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+
+        rows = gzip.decompress(content).decode().splitlines()
+        self.assertEqual(rows[0], '=== CHATBOT DATA ===')
+        # Sessions were created today, yesterday and two days ago
+        self.assertEqual(len(rows), 4)
+
+
+class ColumnarExportTests(DashboardActivityTestCase):
+    """Entities are exported one partition per day"""
+
+    def test_ndjson_partitions_by_day(self):
+        self.add_activity(3)
+        with tempfile.TemporaryDirectory() as output_dir:
+            written = columnar.export_entity('chat_sessions', 'ndjson', output_dir)
+            self.assertEqual(len(written), 3)
+            today = timezone.localdate().isoformat()
+            path = Path(output_dir) / 'chat_sessions' / f'date={today}' / 'part-0.ndjson.gz'
+            with gzip.open(path, 'rt') as export_file:
+                rows = [json.loads(line) for line in export_file]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['session_id'], 'session-0')
+        self.assertTrue(rows[0]['is_escalated'])
+
+    def test_staff_download(self):
+        self.add_activity(2)
+        response = self.client.get(
+            reverse('admin_dashboard:export_columnar', args=['order_items']), {'format': 'ndjson'}
+        )
+        rows = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(json.loads(rows[0])['quantity'], 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BusinessReportTests(DashboardActivityTestCase):
+    """Reports are generated once in the background and served from storage"""
+
+    def test_generate_then_serve_latest_version(self):
+        self.add_activity(2)
+        url = reverse('admin_dashboard:report_generate')
+        with mock.patch.object(reports, '_executor') as executor, \
+                self.captureOnCommitCallbacks(execute=True):
+            queued = self.client.post(url, {'period': 90})
+            # A second request joins the report already in progress
+            joined = self.client.post(url, {'period': 90})
+        self.assertEqual(queued.status_code, 202)
+        self.assertEqual(joined.json()['report_id'], queued.json()['report_id'])
+        executor.submit.assert_called_once()
+
+        reports.run_report(queued.json()['report_id'])
+        status = self.client.get(queued.json()['status_url']).json()
+        self.assertEqual((status['status'], status['progress'], status['version']), ('completed', 100, 1))
+
+        response = self.client.get(reverse('admin_dashboard:generate_report'), {'period': 90})
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('Last 90 Days', content)
+        self.assertIn('(version 1)', content)
+
+        with mock.patch.object(reports, '_executor'), self.captureOnCommitCallbacks(execute=True):
+            regenerated = self.client.post(url, {'period': 90, 'regenerate': '1'}).json()
+        self.assertEqual(regenerated['version'], 2)
+
+    def test_racing_request_joins_the_winner(self):
+        competitor = BusinessReport.objects.create(period_days=7, version=1)
+        filter_ = BusinessReport.objects.filter
+        # The first pass reads before the competitor committed: no active
+        # report and no versions yet
+        stale_reads = [BusinessReport.objects.none(), BusinessReport.objects.none()]
+
+        def racing_filter(*args, **kwargs):
+            return stale_reads.pop(0) if stale_reads else filter_(*args, **kwargs)
+
+        with mock.patch.object(BusinessReport.objects, 'filter', racing_filter), \
+                mock.patch.object(reports, '_executor'):
+            report, created = reports.request_report(7)
+        self.assertEqual((report, created), (competitor, False))
+        self.assertEqual(BusinessReport.objects.filter(period_days=7).count(), 1)
+
+    def test_command_builds_in_the_foreground_through_request_report(self):
+        self.add_activity(1)
+        call_command('generate_business_report', days=7, stdout=io.StringIO())
+        report = BusinessReport.objects.get(period_days=7)
+        self.assertEqual((report.status, report.version), ('completed', 1))
+
+        BusinessReport.objects.create(period_days=7, version=2)
+        out = io.StringIO()
+        call_command('generate_business_report', days=7, stdout=out)
+        self.assertIn('already being generated', out.getvalue())
+        self.assertEqual(BusinessReport.objects.filter(period_days=7).count(), 2)
+
+
+class ProductBulkEditTests(DashboardActivityTestCase):
+    """Grid edits are applied in one batch unless the product changed meanwhile"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.products = [Product.objects.create(
+            name=f'Bolt {i}', category=self.category, description='Bolt',
+            price=Decimal('2.00'), sku=f'BOLT-{i}', stock_quantity=50
+        ) for i in range(3)]
+
+    def post(self, changes):
+        return self.client.post(
+            reverse('admin_dashboard:product_bulk_edit'), json.dumps({'changes': changes}),
+            content_type='application/json'
+        )
+
+    def test_edits_skip_stale_rows_and_refresh_stock_state(self):
+        first, second, third = self.products
+        metrics.get('product_stats')
+        stale = second.updated_at.isoformat()
+        Product.objects.filter(pk=second.pk).update(updated_at=timezone.now())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([
+                {'sku': first.sku, 'updated_at': first.updated_at.isoformat(), 'price': '2.50', 'stock_quantity': '3'},
+                {'sku': second.sku, 'updated_at': stale, 'price': '9.99'},
+                {'sku': third.sku, 'updated_at': third.updated_at.isoformat(), 'price': '-1'},
+            ])
+
+        data = response.json()
+        self.assertEqual(list(data['updated']), [first.sku])
+        self.assertEqual(set(data['skipped']), {second.sku, third.sku})
+        first.refresh_from_db()
+        self.assertEqual((first.price, first.stock_quantity, first.is_active), (Decimal('2.50'), 3, True))
+        self.assertEqual(first.updated_at.isoformat(), data['updated'][first.sku])
+        self.assertEqual(Product.objects.get(pk=second.pk).price, Decimal('2.00'))
+        self.assertTrue(StockAlert.objects.filter(product=first, resolved_at__isnull=True).exists())
+        self.assertIsNone(cache.get(metrics._cache_key('product_stats', ())))
+
+    def test_malformed_body(self):
+        self.assertEqual(self.client.post(
+            reverse('admin_dashboard:product_bulk_edit'), 'nope', content_type='application/json'
+        ).status_code, 400)
+
+
+class LiveEventsTests(DashboardActivityTestCase):
+    """Order and chat activity is pushed to dashboards as SSE events"""
+
+    def create_order(self):
+        return Order.objects.create(
+            user=self.staff, email='staff@example.com', phone='0', shipping_address='A',
+            billing_address='A', total_amount=Decimal('12.50')
+        )
+
+    def test_order_events_are_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.create_order()
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'shipped'
+            order.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+
+        created, changed = DashboardEvent.objects.order_by('pk')
+        self.assertEqual((created.kind, created.payload['total_amount']), ('order_created', '12.50'))
+        self.assertEqual(changed.kind, 'order_status')
+        self.assertEqual((changed.payload['previous_status'], changed.payload['status']), ('pending', 'shipped'))
+
+    def test_bulk_status_update_publishes_one_event(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order_ids = [self.create_order().pk for _ in range(3)]
+        upload = SimpleUploadedFile('orders.csv', f'order_id\n{order_ids[2]}\n'.encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('admin_dashboard:order_bulk_status'), {
+                'status': 'processing', 'order_ids': order_ids[:2], 'csv_file': upload,
+            })
+        self.assertRedirects(response, reverse('admin_dashboard:order_list'))
+
+        self.assertEqual(Order.objects.filter(status='processing').count(), 3)
+        event = DashboardEvent.objects.get(kind='order_status_bulk')
+        self.assertEqual(event.payload, {'status': 'processing', 'count': 3, 'previous_status': {'pending': 3}})
+
+    def test_bulk_status_only_redirects_within_the_site(self):
+        order = self.create_order()
+        url = reverse('admin_dashboard:order_bulk_status')
+        data = {'status': 'processing', 'order_ids': [order.pk]}
+        response = self.client.post(url, {**data, 'next': 'https://evil.example.com/'})
+        self.assertRedirects(response, reverse('admin_dashboard:order_list'))
+        response = self.client.post(url, {**data, 'status': 'shipped', 'next': '/dashboard/orders/?status=processing'})
+        self.assertRedirects(response, '/dashboard/orders/?status=processing')
+
+    def test_stream_replays_after_last_id_then_pushes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order()
+        last_id = events.latest_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatSession.objects.create(session_id='live-1')
+        async_to_sync(self.read_stream)(last_id)
+
+    async def read_stream(self, last_id):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(reverse('admin_dashboard:live_events'), {'last_id': last_id})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(content)).startswith(b'retry:'))
+            message = (await anext(content)).decode()
+            self.assertIn('event: chat_started', message)
+            self.assertIn('"session_id": "live-1"', message)
+
+            # Published after the backlog: delivered through the push broker
+            get_broker().publish(events.DASHBOARD_CHANNEL, {
+                'id': last_id + 5, 'kind': 'low_stock', 'data': '{"name": "Nails"}',
+            })
+            message = (await anext(content)).decode()
+            self.assertIn(f'id: {last_id + 5}', message)
+            self.assertIn('event: low_stock', message)
+        finally:
+            await content.aclose()
+
+    def test_dashboard_opens_the_stream_where_its_figures_end(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order()
+        response = self.client.get(reverse('admin_dashboard:home'))
+        included = events.latest_id()
+        self.assertEqual(response.context['live_events_after'], included)
+
+        # Served from cache later: events since the figures were computed replay
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order()
+        response = self.client.get(reverse('admin_dashboard:home'))
+        self.assertEqual(response.context['live_events_after'], included)
+        self.assertContains(response, f'?last_id={included}')
@@ -9,6 +9,8 @@ urlpatterns = [
     # Products
     path('products/', views.product_list, name='product_list'),
     path('products/create/', views.product_create, name='product_create'),
+    path('products/import/', views.product_import, name='product_import'),
+    path('products/bulk-edit/', views.product_bulk_edit, name='product_bulk_edit'),
     path('products/<int:pk>/edit/', views.product_edit, name='product_edit'),
     path('products/<int:pk>/delete/', views.product_delete, name='product_delete'),
     
@@ -19,6 +21,7 @@ urlpatterns = [
     
     # Orders
     path('orders/', views.order_list, name='order_list'),
+    path('orders/bulk-status/', views.order_bulk_status, name='order_bulk_status'),
     path('orders/<int:pk>/', views.order_detail, name='order_detail'),
     
     # Chatbot settings
@@ -27,8 +30,13 @@ urlpatterns = [
     
     # Analytics API
     path('api/analytics/', views.analytics_api, name='analytics_api'),
+    path('api/events/', views.live_events, name='live_events'),
     
     # Export and Reports
     path('export/', views.export_data, name='export_data'),
+    path('export/<str:entity>/', views.export_columnar, name='export_columnar'),
     path('report/', views.generate_report, name='generate_report'),
+    path('report/generate/', views.report_generate, name='report_generate'),
+    path('report/<int:pk>/status/', views.report_status, name='report_status'),
+    path('report/<int:pk>/download/', views.report_download, name='report_download'),
 ]
\ No newline at end of file
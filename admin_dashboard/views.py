@@ -1,137 +1,89 @@
 from django.core.serializers.json import DjangoJSONEncoder
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Count, Sum, Q, Avg
-from django.core.paginator import Paginator
-from django.http import JsonResponse
-from store.models import Product, Category, Order, OrderItem
+from django.db.models import Count, Q, Exists, OuterRef
+from django.http import JsonResponse, StreamingHttpResponse, FileResponse, Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import url_has_allowed_host_and_scheme
+from store.models import Product, Category, Order, OrderItem, StockAlert
+from store import catalog
+from store.pagination import KeysetPaginator
+from store.orders import ALLOWED_TRANSITIONS, bulk_transition, parse_order_ids
+from store.search import order_search_filter
 from chatbot.models import ChatSession, FAQ, BusinessHours, CompanyInfo, ChatMessage, ChatFeedback
+from chatbot.analytics import day_bounds
+from . import columnar, events, exports, metrics, reports
+from .changes import changes_since
+from .models import BusinessReport
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
+import hashlib
 import json
+import tempfile
+
+# Selectable windows (in days) for the chatbot activity charts
+ACTIVITY_WINDOWS = (7, 30, 90)
 
 
 @staff_member_required
 def dashboard_home(request):
     """Admin dashboard home with key metrics"""
-    today = timezone.now().date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
-    
-    # Calculate key metrics
-    total_products = Product.objects.filter(is_active=True).count()
-    total_orders = Order.objects.count()
-    total_revenue = Order.objects.aggregate(total=Sum('total_amount'))['total'] or 0
-    recent_orders = Order.objects.filter(created_at__date=today).count()
-    
-    # Weekly stats
-    weekly_orders = Order.objects.filter(created_at__date__gte=week_ago).count()
-    weekly_revenue = Order.objects.filter(created_at__date__gte=week_ago).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    # Low stock products
-    low_stock_products = Product.objects.filter(stock_quantity__lte=10, is_active=True)[:5]
-    
-    # Recent products
-    recent_products = Product.objects.filter(is_active=True).order_by('-created_at')[:6]
-    
-    # Top categories with product counts
-    top_categories = Category.objects.annotate(
-        product_count=Count('products', filter=Q(products__is_active=True))
-    ).order_by('-product_count')[:6]
-    
-    # Total categories count
-    total_categories = Category.objects.count()
-    
-    # Recent orders
-    recent_orders_list = Order.objects.select_related('user').order_by('-created_at')[:5]
-    
-    # Chat sessions today
-    chat_sessions_today = ChatSession.objects.filter(created_at__date=today).count()
-    
-    # Enhanced Analytics Data
-    # Product distribution by category (for pie chart)
-    category_distribution = list(Category.objects.annotate(
-        product_count=Count('products', filter=Q(products__is_active=True)),
-        revenue=Sum('products__orderitem__price', filter=Q(products__orderitem__order__status='delivered'))
-    ).filter(product_count__gt=0).values('name', 'product_count', 'revenue'))
-    
-    # Order status distribution (for pie chart)
-    order_status_data = list(Order.objects.values('status').annotate(count=Count('id')))
-    
-    # Revenue by month (last 6 months)
-    six_months_ago = today - timedelta(days=180)
-    monthly_revenue = []
-    for i in range(6):
-        month_start = six_months_ago + timedelta(days=30*i)
-        month_end = month_start + timedelta(days=30)
-        revenue = Order.objects.filter(
-            created_at__date__range=[month_start, month_end],
-            status='delivered'
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-        monthly_revenue.append({
-            'month': month_start.strftime('%b %Y'),
-            'revenue': float(revenue)
-        })
-    
-    # Top selling products
-    top_products = Product.objects.annotate(
-        total_sold=Sum('orderitem__quantity', filter=Q(orderitem__order__status='delivered'))
-    ).filter(total_sold__gt=0).order_by('-total_sold')[:5]
-    
-    # Chatbot analytics
-    total_chat_sessions = ChatSession.objects.count()
-    escalated_chats = ChatSession.objects.filter(is_escalated=True).count()
-    chat_satisfaction = ChatFeedback.objects.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
-    
-    # Recent chat activity (last 7 days)
-    chat_activity = []
-    for i in range(7):
-        day = today - timedelta(days=6-i)
-        sessions = ChatSession.objects.filter(created_at__date=day).count()
-        chat_activity.append({
-            'date': day.strftime('%m/%d'),
-            'sessions': sessions
-        })
-    
-    # Most common intents from chatbot
-    common_intents = list(ChatMessage.objects.exclude(intent='').values('intent').annotate(
-        count=Count('id')
-    ).order_by('-count')[:5])
+    # Aggregates are served from the shared metrics cache and refreshed in
+    # the background once stale, so open dashboards don't hit the database.
+    # Metrics missing from the cache are computed concurrently.
+    results = metrics.collect(
+        'order_stats', 'product_stats', 'low_stock_products', 'recent_products',
+        'top_categories', 'chat_stats', 'category_distribution',
+        'order_status_data', 'monthly_revenue', 'top_products', 'chat_satisfaction',
+        'chat_activity', 'intent_distribution',
+    )
+    order_stats = results['order_stats']
+    chat_stats = results['chat_stats']
     
     context = {
-        'total_products': total_products,
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'recent_orders_count': recent_orders,
-        'weekly_orders': weekly_orders,
-        'weekly_revenue': weekly_revenue,
-        'low_stock_products': low_stock_products,
-        'recent_products': recent_products,
-        'top_categories': top_categories,
-        'total_categories': total_categories,
-        'recent_orders_list': recent_orders_list,
-        'chat_sessions_today': chat_sessions_today,
+        'total_products': results['product_stats']['total_products'],
+        'total_orders': order_stats['total_orders'],
+        'total_revenue': order_stats['total_revenue'],
+        'recent_orders_count': order_stats['today_orders'],
+        'weekly_orders': order_stats['weekly_orders'],
+        'weekly_revenue': order_stats['weekly_revenue'],
+        'low_stock_products': results['low_stock_products'][:5],
+        'recent_products': results['recent_products'],
+        'top_categories': results['top_categories'],
+        'total_categories': results['product_stats']['total_categories'],
+        'recent_orders_list': Order.objects.select_related('user').order_by('-created_at')[:5],
+        'chat_sessions_today': chat_stats['today'],
         
         # Enhanced Analytics
-        'category_distribution': json.dumps(category_distribution, cls=DjangoJSONEncoder),
-        'order_status_data': json.dumps(order_status_data),
-        'monthly_revenue': json.dumps(monthly_revenue),
-        'top_products': top_products,
-        'total_chat_sessions': total_chat_sessions,
-        'escalated_chats': escalated_chats,
-        'chat_satisfaction': round(chat_satisfaction, 1),
-        'chat_activity': json.dumps(chat_activity),
-        'common_intents': json.dumps(common_intents),
+        'category_distribution': json.dumps(results['category_distribution'], cls=DjangoJSONEncoder),
+        'order_status_data': json.dumps(results['order_status_data']),
+        'monthly_revenue': json.dumps(results['monthly_revenue']),
+        'top_products': results['top_products'],
+        'total_chat_sessions': chat_stats['total'],
+        'escalated_chats': chat_stats['escalated'],
+        'chat_satisfaction': round(results['chat_satisfaction']['average'] or 0, 1),
+        'chat_activity': json.dumps(results['chat_activity']),
+        'common_intents': json.dumps(results['intent_distribution'][:5]),
+        'metrics_computed_ago': results.computed_ago,
+        # Live events after this one are not in the figures above yet
+        'live_events_after': events.last_id_before(
+            datetime.fromtimestamp(results.computed_at, tz=dt_timezone.utc)
+        ),
     }
     
-    return render(request, 'admin_dashboard/home.html', context)
+    response = render(request, 'admin_dashboard/home.html', context)
+    response['Server-Timing'] = metrics.server_timing(results.timings)
+    return response
 
 
 @staff_member_required
 def product_list(request):
     """List all products with search and filter"""
-    products = Product.objects.select_related('category').order_by('-created_at')
+    products = Product.objects.select_related('category').annotate(
+        is_low_stock=Exists(StockAlert.objects.filter(product=OuterRef('pk'), resolved_at__isnull=True))
+    ).order_by('-created_at')
     categories = Category.objects.all()
     
     # Search
@@ -155,10 +107,11 @@ def product_list(request):
     elif status == 'inactive':
         products = products.filter(is_active=False)
     elif status == 'low_stock':
-        products = products.filter(stock_quantity__lte=10)
+        # Products with an open low-stock alert (see store.stock)
+        products = products.filter(is_low_stock=True)
     
     # Pagination
-    paginator = Paginator(products, 20)
+    paginator = KeysetPaginator(products, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -186,6 +139,7 @@ def product_create(request):
                 unit=request.POST.get('unit'),
                 sku=request.POST.get('sku'),
                 stock_quantity=request.POST.get('stock_quantity', 0),
+                low_stock_threshold=request.POST.get('low_stock_threshold') or None,
                 is_active=request.POST.get('is_active') == 'on'
             )
             
@@ -202,6 +156,52 @@ def product_create(request):
     return render(request, 'admin_dashboard/product_form.html', {'categories': categories})
 
 
+@staff_member_required
+def product_import(request):
+    """Create or update products by SKU from an uploaded catalog file"""
+    context = {'columns': catalog.COLUMNS}
+    
+    if request.method == 'POST' and request.FILES.get('catalog_file'):
+        upload = request.FILES['catalog_file']
+        dry_run = request.POST.get('dry_run') == 'on'
+        try:
+            result = catalog.import_file(upload.file, catalog.detect_format(upload.name), dry_run=dry_run)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            messages.error(request, f'Could not read {upload.name}: {e}')
+        else:
+            context.update({
+                'result': result,
+                'errors': result.errors[:200],
+                'dry_run': dry_run,
+            })
+            if not dry_run and result.imported:
+                messages.success(request, f'Imported {result.imported} product(s) from {upload.name}.')
+    
+    return render(request, 'admin_dashboard/product_import.html', context)
+
+
+@staff_member_required
+def product_bulk_edit(request):
+    """Apply price, stock and status edits from the product grid in one batch"""
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'POST required'}, status=405)
+    
+    try:
+        changes = json.loads(request.body)['changes']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'Expected {"changes": [...]}'}, status=400)
+    if not isinstance(changes, list) or not all(isinstance(change, dict) for change in changes):
+        return JsonResponse({'status': 'error', 'message': 'Expected {"changes": [...]}'}, status=400)
+    
+    updated, skipped = catalog.bulk_edit(changes)
+    return JsonResponse({
+        'status': 'success',
+        # New timestamps, for editing the same rows again
+        'updated': {product.sku: product.updated_at.isoformat() for product in updated},
+        'skipped': skipped,
+    })
+
+
 @staff_member_required
 def product_edit(request, pk):
     """Edit an existing product"""
@@ -216,6 +216,7 @@ def product_edit(request, pk):
             product.unit = request.POST.get('unit')
             product.sku = request.POST.get('sku')
             product.stock_quantity = request.POST.get('stock_quantity', 0)
+            product.low_stock_threshold = request.POST.get('low_stock_threshold') or None
             product.is_active = request.POST.get('is_active') == 'on'
             
             if request.FILES.get('image'):
@@ -258,17 +259,15 @@ def order_list(request):
     if status:
         orders = orders.filter(status=status)
     
-    # Search
+    # Search: order numbers, emails and customer name prefixes each map to
+    # an indexed lookup (see store.search)
     search_query = request.GET.get('search', '')
-    if search_query:
-        orders = orders.filter(
-            Q(id__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(user__username__icontains=search_query)
-        )
+    search_filter = order_search_filter(search_query)
+    if search_filter is not None:
+        orders = orders.filter(search_filter)
     
     # Pagination
-    paginator = Paginator(orders, 20)
+    paginator = KeysetPaginator(orders, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -282,6 +281,39 @@ def order_list(request):
     return render(request, 'admin_dashboard/order_list.html', context)
 
 
+@staff_member_required
+def order_bulk_status(request):
+    """Move the selected orders, or those listed in an uploaded CSV, to a new status"""
+    if request.method != 'POST':
+        return redirect('admin_dashboard:order_list')
+    
+    status = request.POST.get('status', '')
+    order_ids = [int(pk) for pk in request.POST.getlist('order_ids') if pk.isdigit()]
+    if request.FILES.get('csv_file'):
+        lines = request.FILES['csv_file'].read().decode('utf-8-sig', errors='replace').splitlines()
+        order_ids += parse_order_ids(lines)
+    
+    if not order_ids:
+        messages.error(request, 'Select orders or upload a CSV of order ids.')
+    elif status not in ALLOWED_TRANSITIONS:
+        messages.error(request, 'Choose a valid status.')
+    else:
+        updated, skipped = bulk_transition(order_ids, status)
+        if updated:
+            messages.success(request, f'{len(updated)} order(s) updated to {status}.')
+        if skipped:
+            examples = ', '.join(f'#{pk} ({reason})' for pk, reason in sorted(skipped.items())[:5])
+            messages.warning(request, f'{len(skipped)} order(s) skipped: {examples}')
+    
+    # Back to the filtered list the form was posted from, if it's on this site
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(
+        next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+    ):
+        next_url = reverse('admin_dashboard:order_list')
+    return redirect(next_url)
+
+
 @staff_member_required
 def order_detail(request, pk):
     """View order details"""
@@ -518,59 +550,93 @@ def chatbot_settings(request):
 
 @staff_member_required
 def analytics_api(request):
-    """API endpoint for dashboard analytics data"""
-    today = timezone.now().date()
+    """API endpoint for dashboard analytics data
+    
+    Every response carries a ``version`` token. Passing it back as
+    ``?since=<version>`` returns only the daily sales buckets and sections
+    whose orders or chat sessions changed since then (``full`` is false), and
+    If-None-Match requests get a 304 when nothing changed at all. Tokens from
+    a previous day, or invalid ones, get the full payload.
+    """
+    results = metrics.collect(
+        'daily_sales', 'product_performance', 'customer_data',
+        'chat_stats', 'chat_satisfaction', 'intent_distribution',
+    )
+    # The token is when the oldest cached figure was computed, so changes
+    # committed after that are reported again until the cache catches up
+    version = int(results.computed_at * 1_000_000)
+    
+    try:
+        since = int(request.GET.get('since', 0))
+    except ValueError:
+        since = 0
+    today_start = day_bounds(timezone.localdate())[0]
+    full = since < int(today_start.timestamp() * 1_000_000)
+    changed = {} if full else changes_since(since)
+    
+    etag_source = f"{version}:{since}:{full}:" + ';'.join(
+        f"{source}={','.join(sorted(day.isoformat() for day in days))}"
+        for source, days in sorted(changed.items())
+    )
+    etag = '"%s"' % hashlib.md5(etag_source.encode()).hexdigest()
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    
+    data = {
+        'version': version,
+        'full': full,
+        'computed_ago': results.computed_ago,
+    }
     
     # Sales analytics
-    daily_sales = []
-    for i in range(30):
-        day = today - timedelta(days=29-i)
-        sales = Order.objects.filter(
-            created_at__date=day,
-            status='delivered'
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-        daily_sales.append({
-            'date': day.strftime('%Y-%m-%d'),
-            'sales': float(sales)
-        })
-    
-    # Product performance
-    product_performance = list(Product.objects.annotate(
-        total_revenue=Sum('orderitem__price', filter=Q(orderitem__order__status='delivered')),
-        total_sold=Sum('orderitem__quantity', filter=Q(orderitem__order__status='delivered'))
-    ).filter(total_revenue__gt=0).order_by('-total_revenue')[:10].values(
-        'name', 'total_revenue', 'total_sold', 'stock_quantity'
-    ))
-    
-    # Customer insights
-    customer_data = {
-        'total_customers': Order.objects.values('user').distinct().count(),
-        'repeat_customers': Order.objects.values('user').annotate(
-            order_count=Count('id')
-        ).filter(order_count__gt=1).count(),
-    }
+    if full or 'orders' in changed:
+        changed_days = {day.strftime('%Y-%m-%d') for day in changed.get('orders', ())}
+        data['daily_sales'] = [
+            bucket for bucket in results['daily_sales']
+            if full or bucket['date'] in changed_days
+        ]
+        data['product_performance'] = results['product_performance']
+        data['customer_data'] = results['customer_data']
+    else:
+        data['daily_sales'] = []
     
     # Chatbot performance
-    chatbot_data = {
-        'total_sessions': ChatSession.objects.count(),
-        'escalation_rate': round(
-            (ChatSession.objects.filter(is_escalated=True).count() / 
-             max(ChatSession.objects.count(), 1)) * 100, 1
-        ),
-        'avg_satisfaction': round(
-            ChatFeedback.objects.aggregate(avg=Avg('rating'))['avg'] or 0, 1
-        ),
-        'intent_distribution': list(ChatMessage.objects.exclude(intent='').values('intent').annotate(
-            count=Count('id')
-        ).order_by('-count')[:8])
-    }
-    
-    return JsonResponse({
-        'daily_sales': daily_sales,
-        'product_performance': product_performance,
-        'customer_data': customer_data,
-        'chatbot_data': chatbot_data,
-    })
+    if full or 'chat' in changed:
+        chat_stats = results['chat_stats']
+        data['chatbot_data'] = {
+            'total_sessions': chat_stats['total'],
+            'escalation_rate': round((chat_stats['escalated'] / max(chat_stats['total'], 1)) * 100, 1),
+            'avg_satisfaction': round(results['chat_satisfaction']['average'] or 0, 1),
+            'intent_distribution': results['intent_distribution'][:8]
+        }
+    
+    response = JsonResponse(data)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@staff_member_required
+async def live_events(request):
+    """Server-Sent Events stream of new orders, chats, escalations and low stock
+    
+    The dashboard opens it with ``?last_id=`` set to the last event already
+    reflected in its cached figures, and browsers resume from the
+    Last-Event-ID header when they reconnect. Requires an ASGI server (see
+    riverway/asgi.py), like the chat stream.
+    """
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_id')
+    try:
+        last_id = max(int(last_id), 0)
+    except (TypeError, ValueError):
+        last_id = None
+    
+    response = StreamingHttpResponse(events.stream(last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @staff_member_required
@@ -578,47 +644,48 @@ def chatbot_analytics(request):
     """Dedicated chatbot analytics page with detailed insights"""
     today = timezone.now().date()
     week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
     
-    # Basic chatbot metrics
-    total_sessions = ChatSession.objects.count()
-    weekly_sessions = ChatSession.objects.filter(created_at__date__gte=week_ago).count()
-    escalated_sessions = ChatSession.objects.filter(is_escalated=True).count()
+    # Hourly and daily activity for the selected window, bucketed by day,
+    # hour and escalation status in a single grouped query
+    try:
+        window = int(request.GET.get('window', 30))
+    except ValueError:
+        window = 30
+    if window not in ACTIVITY_WINDOWS:
+        window = 30
+    
+    # Chatbot metrics: closed days come from the ChatAnalytics rollups and
+    # only today is computed from raw rows, cached like the other dashboards
+    results = metrics.collect('chatbot_summary', chat_heatmap=(window,))
+    summary = results['chatbot_summary']
+    heatmap = results['chat_heatmap']
+    
+    total_sessions = summary['total_sessions']
+    weekly_sessions = sum(day['sessions'] for day in summary['daily'] if day['date'] >= week_ago)
+    escalated_sessions = summary['escalated_sessions']
     escalation_rate = round((escalated_sessions / max(total_sessions, 1)) * 100, 1)
     
     # Satisfaction metrics
-    avg_satisfaction = ChatFeedback.objects.aggregate(avg=Avg('rating'))['avg'] or 0
-    total_feedback = ChatFeedback.objects.count()
+    avg_satisfaction = summary['average_rating']
+    total_feedback = summary['total_feedback']
     
     # Channel distribution
-    channel_stats = list(ChatSession.objects.values('channel').annotate(
-        count=Count('id')
-    ).order_by('-count'))
+    channel_stats = summary['channel_stats']
     
     # Intent analysis
-    intent_stats = list(ChatMessage.objects.exclude(intent='').values('intent').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10])
-    
-    # Hourly activity pattern (for heatmap)
-    hourly_activity = []
-    for hour in range(24):
-        sessions = ChatSession.objects.filter(created_at__hour=hour).count()
-        hourly_activity.append({
-            'hour': f"{hour:02d}:00",
-            'sessions': sessions
-        })
+    intent_stats = summary['intent_stats'][:10]
+    
+    hourly_activity = [{
+        'hour': f"{hour:02d}:00",
+        'sessions': sessions
+    } for hour, sessions in enumerate(heatmap['sessions']['by_hour'])]
     
-    # Daily activity for last 30 days
     daily_activity = []
-    for i in range(30):
-        day = today - timedelta(days=29-i)
-        sessions = ChatSession.objects.filter(created_at__date=day).count()
-        escalated = ChatSession.objects.filter(
-            created_at__date=day, is_escalated=True
-        ).count()
+    for day, escalated_day in zip(heatmap['sessions']['by_day'], heatmap['escalations']['by_day']):
+        sessions = day['value']
+        escalated = escalated_day['value']
         daily_activity.append({
-            'date': day.strftime('%Y-%m-%d'),
+            'date': day['date'].strftime('%Y-%m-%d'),
             'sessions': sessions,
             'escalated': escalated,
             'success_rate': round(((sessions - escalated) / max(sessions, 1)) * 100, 1)
@@ -628,10 +695,7 @@ def chatbot_analytics(request):
     top_faqs = FAQ.objects.filter(is_active=True).order_by('-view_count')[:10]
     
     # Resolution time analysis
-    avg_response_time = ChatMessage.objects.filter(
-        message_type='bot',
-        response_time__isnull=False
-    ).aggregate(avg=Avg('response_time'))['avg'] or 0
+    avg_response_time = summary['average_response_time']
     
     # Recent escalations
     recent_escalations = ChatSession.objects.filter(
@@ -649,9 +713,16 @@ def chatbot_analytics(request):
         'intent_stats': json.dumps(intent_stats),
         'hourly_activity': json.dumps(hourly_activity),
         'daily_activity': json.dumps(daily_activity),
+        'window': window,
+        'activity_windows': ACTIVITY_WINDOWS,
         'top_faqs': top_faqs,
         'avg_response_time': round(avg_response_time, 2),
         'recent_escalations': recent_escalations,
+        'metrics_computed_ago': results.computed_ago,
+        # Live events after this one are not in the figures above yet
+        'live_events_after': events.last_id_before(
+            datetime.fromtimestamp(results.computed_at, tz=dt_timezone.utc)
+        ),
     }
     
     return render(request, 'admin_dashboard/chatbot_analytics.html', context)
@@ -659,129 +730,143 @@ def chatbot_analytics(request):
 
 @staff_member_required
 def export_data(request):
-    """Export dashboard data to CSV"""
-    import csv
-    from django.http import HttpResponse
-    from datetime import datetime
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="dashboard_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # Products data
-    writer.writerow(['=== PRODUCTS DATA ==='])
-    writer.writerow(['Name', 'Category', 'Price', 'Stock', 'SKU', 'Active'])
-    for product in Product.objects.select_related('category').all():
-        writer.writerow([
-            product.name,
-            product.category.name,
-            product.price,
-            product.stock_quantity,
-            product.sku,
-            'Yes' if product.is_active else 'No'
-        ])
-    
-    writer.writerow([])  # Empty row
-    
-    # Orders data
-    writer.writerow(['=== ORDERS DATA ==='])
-    writer.writerow(['Order ID', 'Customer', 'Total Amount', 'Status', 'Date'])
-    for order in Order.objects.select_related('user').all():
-        writer.writerow([
-            order.id,
-            order.user.username if order.user else order.email,
-            order.total_amount,
-            order.get_status_display(),
-            order.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
-    
-    writer.writerow([])  # Empty row
-    
-    # Chatbot data
-    writer.writerow(['=== CHATBOT DATA ==='])
-    writer.writerow(['Session ID', 'User', 'Channel', 'Messages Count', 'Escalated', 'Date'])
-    for session in ChatSession.objects.select_related('user').all()[:100]:  # Last 100 sessions
-        message_count = session.messages.count()
-        writer.writerow([
-            session.session_id,
-            session.user.username if session.user else 'Guest',
-            session.channel,
-            message_count,
-            'Yes' if session.is_escalated else 'No',
-            session.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
+    """Export dashboard data to CSV
+    
+    Streams the selected ``sections`` (comma separated, default all) with
+    orders and chat sessions limited to the optional ``start``/``end`` dates
+    (YYYY-MM-DD). ``gzip=1`` compresses the download.
+    """
+    sections = [name for name in request.GET.get('sections', ','.join(exports.SECTIONS)).split(',') if name]
+    try:
+        start, end = _export_date_range(request)
+    except ValueError:
+        messages.error(request, 'Invalid export date range. Use YYYY-MM-DD.')
+        return redirect('admin_dashboard:home')
+    unknown = [name for name in sections if name not in exports.SECTIONS]
+    if unknown or not sections:
+        messages.error(request, f'Unknown export section: {", ".join(unknown) or "none selected"}')
+        return redirect('admin_dashboard:home')
+    
+    chunks = exports.csv_chunks(exports.export_rows(sections, start, end))
+    filename = f'dashboard_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    if request.GET.get('gzip') in ('1', 'true'):
+        response = StreamingHttpResponse(exports.gzip_chunks(chunks), content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(chunks, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     
     return response
 
 
+@staff_member_required
+def export_columnar(request, entity):
+    """Download one entity as a Parquet, Arrow or NDJSON file
+    
+    Accepts ``format`` and the same ``start``/``end`` dates as export_data.
+    The file is built on disk in batches and then streamed to the client.
+    """
+    if entity not in columnar.ENTITIES:
+        raise Http404('Unknown export entity')
+    fmt = request.GET.get('format') or columnar.default_format()
+    if fmt not in columnar.available_formats():
+        messages.error(request, f'The {fmt} export format is not available on this server.')
+        return redirect('admin_dashboard:home')
+    try:
+        start, end = _export_date_range(request)
+    except ValueError:
+        messages.error(request, 'Invalid export date range. Use YYYY-MM-DD.')
+        return redirect('admin_dashboard:home')
+    
+    extension, content_type = columnar.FORMATS[fmt]
+    export_file = tempfile.TemporaryFile()
+    columnar.write_entity(entity, export_file, fmt, start, end)
+    export_file.seek(0)
+    
+    return FileResponse(
+        export_file, as_attachment=True, content_type=content_type,
+        filename=f'{entity}_{datetime.now().strftime("%Y%m%d_%H%M%S")}{extension}'
+    )
+
+
+def _export_date_range(request):
+    """Optional ``start``/``end`` dates (YYYY-MM-DD) of an export request"""
+    start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date() if request.GET.get('start') else None
+    end = datetime.strptime(request.GET['end'], '%Y-%m-%d').date() if request.GET.get('end') else None
+    return start, end
+
+
 @staff_member_required
 def generate_report(request):
-    """Generate comprehensive business report"""
-    from django.http import HttpResponse
-    from django.template.loader import render_to_string
-    from datetime import datetime, timedelta
-    import json
-    
-    today = timezone.now().date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
-    
-    # Gather comprehensive data
-    total_products = Product.objects.filter(is_active=True).count()
-    total_orders = Order.objects.count()
-    total_revenue = Order.objects.filter(status='delivered').aggregate(
-        total=Sum('total_amount')
-    )['total'] or 0
-    
-    weekly_orders = Order.objects.filter(created_at__date__gte=week_ago).count()
-    weekly_revenue = Order.objects.filter(
-        created_at__date__gte=week_ago, status='delivered'
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    # Top products
-    top_products = Product.objects.annotate(
-        total_sold=Sum('orderitem__quantity', filter=Q(orderitem__order__status='delivered'))
-    ).filter(total_sold__gt=0).order_by('-total_sold')[:5]
-    
-    # Category performance
-    category_performance = Category.objects.annotate(
-        product_count=Count('products', filter=Q(products__is_active=True)),
-        total_revenue=Sum('products__orderitem__price', 
-                         filter=Q(products__orderitem__order__status='delivered'))
-    ).order_by('-product_count')
-    
-    # Chatbot stats
-    total_chat_sessions = ChatSession.objects.count()
-    weekly_chat_sessions = ChatSession.objects.filter(created_at__date__gte=week_ago).count()
-    escalated_chats = ChatSession.objects.filter(is_escalated=True).count()
-    escalation_rate = round((escalated_chats / max(total_chat_sessions, 1)) * 100, 1)
-    
-    # Low stock alerts
-    low_stock_products = Product.objects.filter(
-        stock_quantity__lte=10, is_active=True
-    ).order_by('stock_quantity')[:10]
-    
-    context = {
-        'report_date': datetime.now(),
-        'period': 'Last 30 Days',
-        'total_products': total_products,
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'weekly_orders': weekly_orders,
-        'weekly_revenue': weekly_revenue,
-        'top_products': top_products,
-        'category_performance': category_performance,
-        'total_chat_sessions': total_chat_sessions,
-        'weekly_chat_sessions': weekly_chat_sessions,
-        'escalation_rate': escalation_rate,
-        'low_stock_products': low_stock_products,
+    """Download the latest business report for a period
+    
+    Reports are generated in the background (see reports.py). When no report
+    exists yet for the period, one is queued and a 202 response points to
+    its status endpoint.
+    """
+    period_days = _report_period(request)
+    report = reports.latest_report(period_days)
+    if report is None:
+        report, _ = reports.request_report(period_days, request.user)
+        return JsonResponse(_report_status(report), status=202)
+    return _report_file_response(report)
+
+
+@staff_member_required
+def report_generate(request):
+    """Queue a business report, or return the latest one unless ``regenerate`` is set"""
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'POST required'}, status=405)
+    
+    period_days = _report_period(request)
+    if request.POST.get('regenerate') not in ('1', 'true'):
+        report = reports.latest_report(period_days)
+        if report is not None:
+            return JsonResponse(_report_status(report))
+    
+    report, _ = reports.request_report(period_days, request.user)
+    return JsonResponse(_report_status(report), status=202)
+
+
+@staff_member_required
+def report_status(request, pk):
+    """Progress of a business report generation"""
+    report = get_object_or_404(BusinessReport, pk=pk)
+    return JsonResponse(_report_status(report))
+
+
+@staff_member_required
+def report_download(request, pk):
+    """Download a specific version of a business report"""
+    report = get_object_or_404(BusinessReport, pk=pk, status='completed')
+    return _report_file_response(report)
+
+
+def _report_period(request):
+    try:
+        period_days = int(request.POST.get('period') or request.GET.get('period') or 30)
+    except ValueError:
+        period_days = 30
+    return period_days if period_days in reports.REPORT_PERIODS else 30
+
+
+def _report_status(report):
+    return {
+        'report_id': report.pk,
+        'period_days': report.period_days,
+        'version': report.version,
+        'status': report.status,
+        'progress': report.progress,
+        'error': report.error,
+        'created_at': report.created_at.isoformat(),
+        'completed_at': report.completed_at.isoformat() if report.completed_at else None,
+        'status_url': reverse('admin_dashboard:report_status', args=[report.pk]),
+        'download_url': reverse('admin_dashboard:report_download', args=[report.pk]) if report.status == 'completed' else None,
     }
-    
-    # Generate HTML report
-    html_content = render_to_string('admin_dashboard/business_report.html', context)
-    
-    response = HttpResponse(html_content, content_type='text/html')
-    response['Content-Disposition'] = f'attachment; filename="business_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.html"'
-    
-    return response
+
+
+def _report_file_response(report):
+    return FileResponse(
+        report.file.open('rb'), as_attachment=True, content_type='text/html',
+        filename=f'business_report_{report.period_days}d_v{report.version}_{report.completed_at.strftime("%Y%m%d_%H%M%S")}.html'
+    )
@@ -13,7 +13,7 @@ class ChatSessionAdmin(admin.ModelAdmin):
     list_display = ('session_id', 'channel', 'user', 'status', 'created_at', 'is_escalated', 'message_count')
     list_filter = ('channel', 'status', 'is_escalated', 'created_at')
     search_fields = ('session_id', 'user__username', 'user_email', 'user_phone')
-    readonly_fields = ('created_at', 'updated_at', 'session_id')
+    readonly_fields = ('created_at', 'updated_at', 'session_id', 'archived_at', 'archive_path')
     
     def message_count(self, obj):
         return obj.messages.count()
@@ -0,0 +1,316 @@
+"""
+Daily chatbot analytics rollups.
+
+Each closed day is summarised once into a ChatAnalytics row. The rollup job
+(``manage.py rollup_chat_analytics``) only recomputes days that are missing or
+whose sessions changed since its last run, and ``summarize`` serves any date
+range from those rows plus a live computation for today. Missing days are
+filled on demand, at most LAZY_ROLLUP_LIMIT per request; the job fills the
+rest. ``activity_heatmap``
+buckets raw rows by day and hour of day for the activity charts.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from .models import ChatSession, ChatMessage, ChatFeedback, ChatAnalytics
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = [choice[0] for choice in ChatSession.CHANNEL_CHOICES]
+
+ROLLUP_FIELDS = (
+    'total_sessions', 'resolved_queries', 'escalated_queries', 'average_response_time',
+    'response_count', 'average_session_duration', 'user_satisfaction_score', 'feedback_count',
+    *[f'channel_{channel}' for channel in CHANNELS], 'most_common_intent', 'intent_counts',
+)
+
+# Fields derived from ChatMessage rows, which may since have been archived
+MESSAGE_FIELDS = ('average_response_time', 'response_count', 'average_session_duration',
+                  'most_common_intent', 'intent_counts')
+
+# Missing days a dashboard request may roll up itself before leaving the
+# rest to the job
+LAZY_ROLLUP_LIMIT = 7
+
+
+def day_bounds(day):
+    """Aware [start, end) datetimes covering a local calendar day"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def range_bounds(start_date, end_date):
+    """Aware [start, end) datetimes covering an inclusive range of local days"""
+    return day_bounds(start_date)[0], day_bounds(end_date)[1]
+
+
+def compute_day(day):
+    """Compute the ChatAnalytics field values for one day from raw rows"""
+    start, end = day_bounds(day)
+    sessions = ChatSession.objects.filter(created_at__gte=start, created_at__lt=end)
+
+    session_stats = sessions.aggregate(
+        total=Count('id'),
+        escalated=Count('id', filter=Q(is_escalated=True)),
+        **{channel: Count('id', filter=Q(channel=channel)) for channel in CHANNELS}
+    )
+
+    bot_messages = ChatMessage.objects.filter(
+        timestamp__gte=start, timestamp__lt=end, message_type='bot'
+    )
+    response_stats = bot_messages.filter(response_time__isnull=False).aggregate(
+        avg=Avg('response_time'), count=Count('id')
+    )
+    intent_counts = dict(
+        bot_messages.exclude(intent='').values_list('intent').annotate(count=Count('id'))
+    )
+
+    durations = [
+        (span['last'] - span['first']).total_seconds()
+        for span in sessions.annotate(
+            first=Min('messages__timestamp'), last=Max('messages__timestamp')
+        ).filter(first__isnull=False).values('first', 'last')
+    ]
+
+    feedback_stats = ChatFeedback.objects.filter(
+        created_at__gte=start, created_at__lt=end
+    ).aggregate(avg=Avg('rating'), count=Count('id'))
+
+    total = session_stats['total']
+    escalated = session_stats['escalated']
+    return {
+        'total_sessions': total,
+        'resolved_queries': total - escalated,
+        'escalated_queries': escalated,
+        'average_response_time': response_stats['avg'] or 0.0,
+        'response_count': response_stats['count'],
+        'average_session_duration': sum(durations) / len(durations) if durations else 0.0,
+        'user_satisfaction_score': feedback_stats['avg'] or 0.0,
+        'feedback_count': feedback_stats['count'],
+        **{f'channel_{channel}': session_stats[channel] for channel in CHANNELS},
+        'most_common_intent': Counter(intent_counts).most_common(1)[0][0] if intent_counts else '',
+        'intent_counts': intent_counts,
+    }
+
+
+def rollup_day(day, job_started_at=None):
+    """Recompute and store the rollup for a closed day"""
+    values = compute_day(day)
+    values['job_started_at'] = job_started_at
+
+    # Once a day's sessions are archived their messages are gone from the
+    # table, so keep the message-derived figures from the earlier rollup
+    start, end = day_bounds(day)
+    if ChatSession.objects.filter(created_at__gte=start, created_at__lt=end, archived_at__isnull=False).exists():
+        if ChatAnalytics.objects.filter(date=day).exists():
+            for field in MESSAGE_FIELDS:
+                values.pop(field)
+
+    rollup, _ = ChatAnalytics.objects.update_or_create(date=day, defaults=values)
+    return rollup
+
+
+def affected_days(today=None):
+    """Closed days whose rollup is missing or older than their source rows"""
+    today = today or timezone.localdate()
+    first_session = ChatSession.objects.aggregate(first=Min('created_at'))['first']
+    if first_session is None:
+        return []
+
+    first_day = timezone.localdate(first_session)
+    rolled_up = set(ChatAnalytics.objects.filter(
+        date__gte=first_day, date__lt=today
+    ).values_list('date', flat=True))
+    days = {
+        first_day + timedelta(days=offset)
+        for offset in range((today - first_day).days)
+    } - rolled_up
+
+    # Only rows written by the job mark a run: days filled on demand by
+    # summarize() are written between runs, and using them as the watermark
+    # would hide changes made since the job last looked
+    last_run = ChatAnalytics.objects.aggregate(last=Max('job_started_at'))['last']
+    if last_run is not None:
+        # Sessions touched since the last run (e.g. escalated later) and
+        # feedback left since then change the day they belong to
+        changed_sessions = ChatSession.objects.filter(
+            updated_at__gt=last_run, created_at__lt=day_bounds(today)[0]
+        ).values_list('created_at', flat=True)
+        changed_feedback = ChatFeedback.objects.filter(
+            created_at__gt=last_run, created_at__lt=day_bounds(today)[0]
+        ).values_list('created_at', flat=True)
+        days.update(timezone.localdate(ts) for ts in changed_sessions)
+        days.update(timezone.localdate(ts) for ts in changed_feedback)
+
+    return sorted(days)
+
+
+def refresh_rollups(days=None):
+    """Roll up the given days, or every affected closed day. Returns the days
+
+    Only a run over the affected days moves the job's watermark; rolling up
+    hand-picked days leaves it alone so changes on other days are still found.
+    """
+    job_started_at = None
+    if days is None:
+        # Changes made while the job runs are picked up by the next run
+        job_started_at = timezone.now()
+        days = affected_days()
+    for day in days:
+        rollup_day(day, job_started_at)
+    return days
+
+
+def summarize(start_date, end_date):
+    """Combine rollups for closed days with live figures for today
+
+    Returns totals, weighted averages, channel and intent breakdowns and a
+    per-day series for the inclusive range.
+    """
+    today = timezone.localdate()
+    closed_end = min(end_date, today - timedelta(days=1))
+
+    days = {}
+    pending = []
+    if start_date <= closed_end:
+        existing = {
+            row.date: row for row in ChatAnalytics.objects.filter(date__range=[start_date, closed_end])
+        }
+        missing = [
+            day for day in (start_date + timedelta(days=n) for n in range((closed_end - start_date).days + 1))
+            if day not in existing
+        ]
+        # Fill a few gaps lazily so recent figures never depend on the job
+        # having run; a long backlog is left to the job rather than computed
+        # inside one request
+        if len(missing) > LAZY_ROLLUP_LIMIT:
+            logger.warning(
+                f"{len(missing)} chat analytics days are not rolled up; "
+                f"run rollup_chat_analytics to fill them"
+            )
+        pending = missing[:-LAZY_ROLLUP_LIMIT]
+        for day in missing[-LAZY_ROLLUP_LIMIT:]:
+            existing[day] = rollup_day(day)
+        for day, row in existing.items():
+            days[day] = {field: getattr(row, field) for field in ROLLUP_FIELDS}
+    if start_date <= today <= end_date:
+        days[today] = compute_day(today)
+
+    channel_counts = Counter()
+    intent_counts = Counter()
+    totals = Counter()
+    for values in days.values():
+        totals['sessions'] += values['total_sessions']
+        totals['escalated'] += values['escalated_queries']
+        totals['responses'] += values['response_count']
+        totals['response_time'] += values['average_response_time'] * values['response_count']
+        totals['feedback'] += values['feedback_count']
+        totals['rating'] += values['user_satisfaction_score'] * values['feedback_count']
+        for channel in CHANNELS:
+            channel_counts[channel] += values[f'channel_{channel}']
+        intent_counts.update(values['intent_counts'])
+
+    return {
+        'total_sessions': totals['sessions'],
+        'escalated_sessions': totals['escalated'],
+        'average_rating': totals['rating'] / totals['feedback'] if totals['feedback'] else 0,
+        'total_feedback': totals['feedback'],
+        'average_response_time': totals['response_time'] / totals['responses'] if totals['responses'] else 0,
+        'channel_stats': [
+            {'channel': channel, 'count': count}
+            for channel, count in channel_counts.most_common() if count
+        ],
+        'intent_stats': [
+            {'intent': intent, 'count': count}
+            for intent, count in intent_counts.most_common()
+        ],
+        'daily': [
+            {'date': day, 'sessions': days[day]['total_sessions'], 'escalated': days[day]['escalated_queries']}
+            for day in sorted(days)
+        ],
+        # Closed days left out until the rollup job has filled them
+        'pending_days': len(pending),
+    }
+
+
+
+# Metrics the activity heatmap can bucket: source model, timestamp field,
+# row filter and, for averages, the field being averaged
+HEATMAP_METRICS = {
+    'sessions': (ChatSession, 'created_at', Q(), None),
+    'escalations': (ChatSession, 'created_at', Q(is_escalated=True), None),
+    'messages': (ChatMessage, 'timestamp', Q(), None),
+    'response_time': (ChatMessage, 'timestamp', Q(message_type='bot', response_time__isnull=False), 'response_time'),
+}
+
+
+def activity_heatmap(metrics=('sessions',), days=30, end_date=None):
+    """Bucket metrics by day and hour of day over the last ``days`` days
+
+    Metrics sharing a source table are computed together in a single grouped
+    query. Returns ``{metric: {'by_hour': [24 values], 'by_day': [{'date',
+    'value'}], 'grid': [[24 values] per day]}}``; averages are weighted by
+    the number of rows in each bucket.
+    """
+    end_date = end_date or timezone.localdate()
+    start_date = end_date - timedelta(days=days - 1)
+    start, end = range_bounds(start_date, end_date)
+    dates = [start_date + timedelta(days=n) for n in range(days)]
+
+    sources = {}
+    for metric in metrics:
+        model, field, condition, average_field = HEATMAP_METRICS[metric]
+        sources.setdefault((model, field), []).append((metric, condition, average_field))
+
+    # buckets[metric][(day, hour)] = (total, rows)
+    buckets = {metric: {} for metric in metrics}
+    for (model, field), source_metrics in sources.items():
+        aggregates = {}
+        for metric, condition, average_field in source_metrics:
+            aggregates[f'{metric}__rows'] = Count('pk', filter=condition)
+            if average_field:
+                aggregates[f'{metric}__total'] = Sum(average_field, filter=condition)
+
+        rows = model.objects.filter(**{f'{field}__gte': start, f'{field}__lt': end}).annotate(
+            day=TruncDate(field), hour=ExtractHour(field)
+        ).values('day', 'hour').annotate(**aggregates).order_by()
+
+        for row in rows:
+            for metric, condition, average_field in source_metrics:
+                count = row[f'{metric}__rows']
+                total = (row[f'{metric}__total'] or 0) if average_field else count
+                buckets[metric][(row['day'], row['hour'])] = (total, count)
+
+    return {
+        metric: _heatmap_series(buckets[metric], dates, HEATMAP_METRICS[metric][3] is not None)
+        for metric in metrics
+    }
+
+
+def _heatmap_series(cells, dates, is_average):
+    def value(total, count):
+        if is_average:
+            return round(total / count, 3) if count else 0
+        return total
+
+    def combine(keys):
+        total = sum(cells.get(key, (0, 0))[0] for key in keys)
+        count = sum(cells.get(key, (0, 0))[1] for key in keys)
+        return value(total, count)
+
+    return {
+        'by_hour': [combine([(day, hour) for day in dates]) for hour in range(24)],
+        'by_day': [
+            {'date': day, 'value': combine([(day, hour) for hour in range(24)])}
+            for day in dates
+        ],
+        'grid': [
+            [value(*cells.get((day, hour), (0, 0))) for hour in range(24)]
+            for day in dates
+        ],
+    }
@@ -0,0 +1,159 @@
+"""
+Cold storage for old chat transcripts.
+
+Messages of sessions that have been idle longer than CHATBOT_ARCHIVE_AFTER_DAYS
+are written to gzip-compressed JSONL files partitioned by the session's
+creation date (``<CHATBOT_ARCHIVE_ROOT>/YYYY/MM/DD.jsonl.gz``, one line per
+session) and then deleted from ChatMessage. The ChatSession row stays in place
+with ``archived_at``/``archive_path`` set, so feedback, escalations and session
+counts keep working and transcripts can be read back transparently.
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ChatSession, ChatMessage
+from .analytics import refresh_rollups
+from .push import message_payload
+
+logger = logging.getLogger(__name__)
+
+
+def archive_root():
+    return Path(getattr(settings, 'CHATBOT_ARCHIVE_ROOT', Path(settings.BASE_DIR) / 'archive' / 'chat'))
+
+
+def partition_for(created_at):
+    """Relative archive file for sessions created on the given date"""
+    return created_at.strftime('%Y/%m/%d') + '.jsonl.gz'
+
+
+def _archived_message(message):
+    payload = message_payload(message)
+    payload['response_time'] = message.response_time
+    return payload
+
+
+def archive_sessions(older_than_days=None, batch_size=200, dry_run=False):
+    """Move idle sessions' messages to cold storage
+
+    Returns a ``(sessions, messages)`` tuple with the number archived.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'CHATBOT_ARCHIVE_AFTER_DAYS', 180)
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    # Sessions whose most recent message is older than the cutoff. Sessions
+    # archived before and resumed later qualify again for their new messages.
+    candidates = ChatSession.objects.annotate(
+        last_message_at=Max('messages__timestamp')
+    ).filter(last_message_at__lt=cutoff).order_by('created_at')
+
+    if dry_run:
+        return candidates.count(), ChatMessage.objects.filter(
+            session__in=candidates.values('pk')
+        ).count()
+
+    # Roll up closed days first; rollups keep their message-derived figures
+    # once the rows they were computed from are gone
+    refresh_rollups()
+
+    # Archived sessions drop out of the candidate set, so re-slicing the
+    # queryset walks through the whole backlog one batch at a time
+    total_sessions = total_messages = 0
+    while True:
+        batch = list(candidates[:batch_size])
+        if not batch:
+            break
+        sessions, messages = _archive_batch(batch)
+        total_sessions += sessions
+        total_messages += messages
+
+    return total_sessions, total_messages
+
+
+def _archive_batch(sessions):
+    """Write one batch of sessions to their partitions, then drop the rows"""
+    messages_by_session = {}
+    for message in ChatMessage.objects.filter(session__in=sessions).order_by('id'):
+        messages_by_session.setdefault(message.session_id, []).append(message)
+
+    partitions = {}
+    for chat_session in sessions:
+        partitions.setdefault(partition_for(chat_session.created_at), []).append(chat_session)
+
+    root = archive_root()
+    message_ids = []
+    for relative_path, partition_sessions in partitions.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending a new gzip member keeps the file readable as one stream
+        with gzip.open(path, 'at', encoding='utf-8') as archive_file:
+            for chat_session in partition_sessions:
+                session_messages = messages_by_session.get(chat_session.pk, [])
+                archive_file.write(json.dumps({
+                    'session_id': chat_session.session_id,
+                    'channel': chat_session.channel,
+                    'created_at': chat_session.created_at.isoformat(),
+                    'messages': [_archived_message(msg) for msg in session_messages],
+                }) + '\n')
+                message_ids.extend(msg.id for msg in session_messages)
+            archive_file.flush()
+            os.fsync(archive_file.fileno())
+
+    # Rows are only deleted once their archive line is safely on disk
+    with transaction.atomic():
+        now = timezone.now()
+        for relative_path, partition_sessions in partitions.items():
+            ChatSession.objects.filter(
+                pk__in=[s.pk for s in partition_sessions]
+            ).update(archived_at=now, archive_path=relative_path)
+        ChatMessage.objects.filter(id__in=message_ids).delete()
+
+    logger.info(f"Archived {len(sessions)} chat sessions ({len(message_ids)} messages)")
+    return len(sessions), len(message_ids)
+
+
+def read_archived_messages(chat_session):
+    """Return the archived messages of a session as history payloads"""
+    if not chat_session.archive_path:
+        return []
+
+    path = archive_root() / chat_session.archive_path
+    messages = {}
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as archive_file:
+            for line in archive_file:
+                # Cheap substring test before parsing every line of the day
+                if chat_session.session_id not in line:
+                    continue
+                record = json.loads(line)
+                if record['session_id'] == chat_session.session_id:
+                    for message in record['messages']:
+                        messages[message['id']] = message
+    except FileNotFoundError:
+        logger.error(f"Archive file missing for chat session {chat_session.session_id}: {path}")
+
+    return [messages[message_id] for message_id in sorted(messages)]
+
+
+def session_messages(chat_session, after=0):
+    """All messages of a session with id greater than ``after``, oldest first
+
+    Archived messages come from cold storage, anything newer from the table.
+    """
+    live = [message_payload(msg) for msg in ChatMessage.objects.filter(
+        session=chat_session, id__gt=after
+    ).order_by('id')]
+    if not chat_session.archived_at:
+        return live
+    archived = [msg for msg in read_archived_messages(chat_session) if msg['id'] > after]
+    return archived + live
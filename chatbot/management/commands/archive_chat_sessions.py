@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from chatbot.archive import archive_sessions, archive_root
+
+
+class Command(BaseCommand):
+    help = 'Move messages of idle chat sessions to compressed cold storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=getattr(settings, 'CHATBOT_ARCHIVE_AFTER_DAYS', 180),
+            help='Archive sessions whose last message is older than this many days'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Number of sessions written and deleted per transaction'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how much would be archived'
+        )
+
+    def handle(self, *args, **options):
+        sessions, messages = archive_sessions(
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'{sessions} sessions ({messages} messages) older than {options["days"]} days would be archived'
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Archived {sessions} sessions ({messages} messages) to {archive_root()}'
+            ))
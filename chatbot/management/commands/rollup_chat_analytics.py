@@ -0,0 +1,42 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from chatbot.analytics import refresh_rollups
+from chatbot.models import ChatAnalytics
+
+
+class Command(BaseCommand):
+    help = 'Fill the daily ChatAnalytics rollups, recomputing only affected days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date', action='append', default=[],
+            help='Recompute a specific day (YYYY-MM-DD); may be repeated'
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Drop and rebuild every closed day (archived days lose their message-derived figures)'
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                days = sorted({date.fromisoformat(value) for value in options['date']})
+            except ValueError as e:
+                raise CommandError(f'Invalid date: {e}')
+            if any(day >= timezone.localdate() for day in days):
+                raise CommandError('Only closed days (before today) can be rolled up')
+            # Hand-picked days don't move the job's watermark
+            refresh_rollups(days)
+        else:
+            if options['full']:
+                ChatAnalytics.objects.all().delete()
+            # Rolls up the affected days and stamps the watermark
+            days = refresh_rollups()
+
+        if days:
+            self.stdout.write(self.style.SUCCESS(
+                f'Rolled up {len(days)} day(s): {days[0]} to {days[-1]}'
+            ))
+        else:
+            self.stdout.write('Chat analytics rollups are up to date')
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0002_chatbotsettings_intent_chatmessage_confidence_score_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='archive_path',
+            field=models.CharField(blank=True, help_text='Archive file holding the messages, relative to CHATBOT_ARCHIVE_ROOT', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, help_text='When the messages were moved to cold storage', null=True),
+        ),
+    ]
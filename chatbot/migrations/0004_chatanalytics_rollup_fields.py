@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_chatsession_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='channel_email',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='channel_telegram',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='feedback_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='intent_counts',
+            field=models.JSONField(blank=True, default=dict, help_text='Bot replies per intent'),
+        ),
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='response_count',
+            field=models.IntegerField(default=0, help_text='Bot replies with a measured response time'),
+        ),
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
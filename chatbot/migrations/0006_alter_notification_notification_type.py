@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('booking_confirmation', 'Booking Confirmation'), ('order_status', 'Order Status Update'), ('promotional', 'Promotional'), ('reminder', 'Reminder'), ('escalation', 'Escalation Alert'), ('low_stock', 'Low Stock Alert')], max_length=30),
+        ),
+    ]
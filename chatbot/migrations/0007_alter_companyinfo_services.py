@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0006_alter_notification_notification_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='companyinfo',
+            name='services',
+            field=models.TextField(default='Hardware products and supplies', help_text='List of services offered'),
+        ),
+    ]
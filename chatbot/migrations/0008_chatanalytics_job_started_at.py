@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:33
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def keep_watermark(apps, schema_editor):
+    # Existing rows can't tell job runs from on-demand fills; treat them as
+    # written by the job so the next run still finds changes since then
+    ChatAnalytics = apps.get_model('chatbot', 'ChatAnalytics')
+    ChatAnalytics.objects.update(job_started_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0007_alter_companyinfo_services'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatanalytics',
+            name='job_started_at',
+            field=models.DateTimeField(blank=True, help_text='Start of the rollup job run that wrote this row; empty for days filled on demand', null=True),
+        ),
+        migrations.RunPython(keep_watermark, migrations.RunPython.noop),
+    ]
@@ -33,6 +33,16 @@ class ChatSession(models.Model):
     user_phone = models.CharField(max_length=20, blank=True)
     user_email = models.EmailField(blank=True)
     user_ip = models.GenericIPAddressField(null=True, blank=True)
+    archived_at = models.DateTimeField(null=True, blank=True, help_text="When the messages were moved to cold storage")
+    archive_path = models.CharField(max_length=255, blank=True, help_text="Archive file holding the messages, relative to CHATBOT_ARCHIVE_ROOT")
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='chatsession_created_idx'),
+            # Partial index: boolean flags are too unselective to lead an index
+            models.Index(fields=['created_at'], condition=models.Q(is_escalated=True), name='chatsession_escalated_idx'),
+            models.Index(fields=['updated_at'], name='chatsession_updated_idx'),
+        ]
     
     def __str__(self):
         return f"Chat {self.session_id} ({self.channel})"
@@ -56,6 +66,11 @@ class ChatMessage(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['session', 'timestamp'], name='chatmsg_session_ts_idx'),
+            models.Index(fields=['message_type', 'timestamp', 'intent'], name='chatmsg_type_ts_intent_idx'),
+            models.Index(fields=['timestamp'], name='chatmsg_ts_idx'),
+        ]
     
     def __str__(self):
         return f"{self.message_type}: {self.content[:50]}..."
@@ -113,6 +128,11 @@ class ChatFeedback(models.Model):
     was_helpful = models.BooleanField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='chatfeedback_created_idx'),
+        ]
+    
     def __str__(self):
         return f"Feedback for {self.session.session_id}: {self.rating}/5"
 
@@ -145,6 +165,7 @@ class Notification(models.Model):
         ('promotional', 'Promotional'),
         ('reminder', 'Reminder'),
         ('escalation', 'Escalation Alert'),
+        ('low_stock', 'Low Stock Alert'),
     ]
     
     CHANNEL_CHOICES = [
@@ -188,8 +209,18 @@ class ChatAnalytics(models.Model):
     channel_website = models.IntegerField(default=0)
     channel_whatsapp = models.IntegerField(default=0)
     channel_messenger = models.IntegerField(default=0)
+    channel_telegram = models.IntegerField(default=0)
+    channel_email = models.IntegerField(default=0)
     most_common_intent = models.CharField(max_length=100, blank=True)
+    intent_counts = models.JSONField(default=dict, blank=True, help_text="Bot replies per intent")
+    response_count = models.IntegerField(default=0, help_text="Bot replies with a measured response time")
+    feedback_count = models.IntegerField(default=0)
+    job_started_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Start of the rollup job run that wrote this row; empty for days filled on demand"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ('date',)
@@ -5,6 +5,7 @@ from typing import Dict, List, Tuple, Optional
 from django.utils import timezone
 from .models import FAQ, Intent, BusinessHours, CompanyInfo, ChatbotSettings
 from store.models import Product, Category
+from store.images import THUMBNAIL_WIDTH, variant_url
 import logging
 
 logger = logging.getLogger(__name__)
@@ -167,15 +168,12 @@ class NLPEngine:
             # Get some alternative suggestions from our actual products
             popular_products = Product.objects.filter(is_active=True, stock_quantity__gt=0).order_by('-stock_quantity')[:4]
             product_list = list(popular_products.values(
-                'id', 'name', 'price', 'image', 'description', 'unit', 'stock_quantity', 'rating', 'rating_count'
+                'id', 'name', 'price', 'image', 'image_variants', 'description', 'unit', 'stock_quantity', 'rating', 'rating_count'
             ))
             
             # Add image URLs
             for prod in product_list:
-                if prod['image']:
-                    prod['image_url'] = f"/media/{prod['image']}"
-                else:
-                    prod['image_url'] = None
+                prod['image_url'] = variant_url(prod['image'], prod.pop('image_variants'), THUMBNAIL_WIDTH)
             
             category_messages = {
                 'beauty': f"I understand you're looking for {product}, but we specialize in hardware and building supplies. We don't carry beauty products like {product}.",
@@ -250,15 +248,12 @@ class NLPEngine:
             
             if found_products.exists():
                 product_list = list(found_products.values(
-                    'id', 'name', 'price', 'image', 'description', 'unit', 'stock_quantity', 'rating', 'rating_count'
+                    'id', 'name', 'price', 'image', 'image_variants', 'description', 'unit', 'stock_quantity', 'rating', 'rating_count'
                 ))
                 
                 # Add image URLs
                 for product in product_list:
-                    if product['image']:
-                        product['image_url'] = f"/media/{product['image']}"
-                    else:
-                        product['image_url'] = None
+                    product['image_url'] = variant_url(product['image'], product.pop('image_variants'), THUMBNAIL_WIDTH)
                 
                 return {
                     'message': f"I found some products that might match what you're looking for:",
@@ -492,14 +487,11 @@ class ChatbotEngine:
                         'products': []
                     }
                 popular_list = list(popular_products.values(
-                    'id', 'name', 'price', 'image', 'description', 'unit', 'stock_quantity', 'rating', 'rating_count'
+                    'id', 'name', 'price', 'image', 'image_variants', 'description', 'unit', 'stock_quantity', 'rating', 'rating_count'
                 ))
                 # Add image URLs
                 for product in popular_list:
-                    if product['image']:
-                        product['image_url'] = f"/media/{product['image']}"
-                    else:
-                        product['image_url'] = None
+                    product['image_url'] = variant_url(product['image'], product.pop('image_variants'), THUMBNAIL_WIDTH)
                 
                 return {
                     'message': "I couldn't find exactly what you mentioned, but here are some of our most popular products that might interest you:",
@@ -514,6 +506,7 @@ class ChatbotEngine:
                     'name': product.name,
                     'price': float(product.price),
                     'image': product.image.name if product.image else None,
+                    'image_variants': product.image_variants,
                     'description': product.description,
                     'unit': product.unit,
                     'stock_quantity': product.stock_quantity,
@@ -524,10 +517,7 @@ class ChatbotEngine:
             
             # Add image URLs to products
             for product in product_list:
-                if product['image']:
-                    product['image_url'] = f"/media/{product['image']}"
-                else:
-                    product['image_url'] = None
+                product['image_url'] = variant_url(product['image'], product.pop('image_variants'), THUMBNAIL_WIDTH)
             
             if len(product_list) == 1:
                 product = product_list[0]
@@ -551,7 +541,8 @@ class ChatbotEngine:
                     message += " - Let me know if you'd like to see similar alternatives!\n\n"
                 message += f"**Product Details:** {product['description']}\n\n"
                 if product['image_url']:
-                    message += f"[View Product Image]({product['image_url']})\n\n"
+                    # Link the full-size image rather than the card thumbnail
+                    message += f"[View Product Image]({variant_url(product['image'], None)})\n\n"
                 if product['stock_quantity'] > 0:
                     message += "Would you like more information, similar products, or a personalized quote?"
             else:
@@ -0,0 +1,149 @@
+"""
+Real-time delivery of chat messages to connected widgets and agent consoles.
+
+New ChatMessage rows are published to a broker under their session_id and the
+SSE endpoint (chatbot.views.chat_stream) subscribes to it. Live dashboard
+events travel through the same broker (see admin_dashboard.events). The default broker
+lives in-process, which is enough for a single ASGI worker. Multi-worker
+deployments should point CHATBOT_PUSH_BACKEND at a shared broker such as
+``chatbot.push.RedisBroker``.
+"""
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Messages buffered per subscriber before new ones are dropped. A client that
+# falls this far behind catches up from the database when it reconnects.
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def message_payload(message):
+    """Serialize a ChatMessage the same way the history endpoint does"""
+    return {
+        'id': message.id,
+        'type': message.message_type,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat(),
+        'intent': message.intent,
+        'confidence': message.confidence_score
+    }
+
+
+class InProcessBroker:
+    """Fan out payloads to subscribers living in this process"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.offer(payload)
+
+    async def subscribe(self, channel):
+        subscription = _QueueSubscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+class _QueueSubscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, payload):
+        # Publishers run in request threads, so hand over to the subscriber's loop
+        self.loop.call_soon_threadsafe(self._put, payload)
+
+    def _put(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping push message for slow subscriber on {self.channel}")
+
+    async def get(self, timeout):
+        """Return the next payload, or None if nothing arrived within timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.broker._unsubscribe(self)
+
+
+class RedisBroker:
+    """Fan out payloads through Redis pub/sub so every worker sees them
+
+    Requires the ``redis`` package and CHATBOT_PUSH_REDIS_URL.
+    """
+
+    prefix = 'riverway:chat:'
+
+    def __init__(self):
+        import redis
+        import redis.asyncio
+
+        self.url = getattr(settings, 'CHATBOT_PUSH_REDIS_URL', 'redis://localhost:6379/0')
+        self._client = redis.Redis.from_url(self.url)
+        self._async_redis = redis.asyncio
+
+    def publish(self, channel, payload):
+        self._client.publish(self.prefix + channel, json.dumps(payload))
+
+    async def subscribe(self, channel):
+        subscription = _RedisSubscription(self, self.prefix + channel)
+        await subscription.pubsub.subscribe(subscription.channel)
+        return subscription
+
+
+class _RedisSubscription:
+    def __init__(self, broker, channel):
+        self.channel = channel
+        self.client = broker._async_redis.Redis.from_url(broker.url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Return the configured broker instance (one per process)"""
+    backend = getattr(settings, 'CHATBOT_PUSH_BACKEND', 'chatbot.push.InProcessBroker')
+    return import_string(backend)()
+
+
+def publish_message(message):
+    """Push a saved ChatMessage to everyone listening on its session"""
+    try:
+        get_broker().publish(message.session.session_id, message_payload(message))
+    except Exception as e:
+        logger.error(f"Error publishing chat message {message.id}: {e}")
@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import ChatMessage
+from .push import publish_message
+
+
+@receiver(post_save, sender=ChatMessage)
+def push_new_chat_message(sender, instance, created, **kwargs):
+    """Deliver new messages to connected clients once they are committed"""
+    if created:
+        transaction.on_commit(lambda: publish_message(instance))
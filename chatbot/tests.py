@@ -1,3 +1,190 @@
-from django.test import TestCase
+import io
+from datetime import datetime, time, timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Max
+from django.test import Client, TestCase
+from django.utils import timezone
+
+from . import analytics
+from .analytics import activity_heatmap
+from .models import ChatSession, ChatMessage, ChatFeedback, ChatAnalytics
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plan assertions target the SQLite planner')
+class HotQueryPlanTests(TestCase):
+    """The dashboard and analytics queries must be served by an index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.session = ChatSession.objects.create(session_id='plan-check')
+        cls.since = timezone.now() - timedelta(days=7)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Expected {index_name} in query plan:\n{plan}")
+
+    def test_session_messages_by_time(self):
+        self.assertUsesIndex(
+            ChatMessage.objects.filter(session=self.session, timestamp__gte=self.since),
+            'chatmsg_session_ts_idx'
+        )
+
+    def test_bot_messages_by_time_and_intent(self):
+        self.assertUsesIndex(
+            ChatMessage.objects.filter(message_type='bot', timestamp__gte=self.since).values('intent'),
+            'chatmsg_type_ts_intent_idx'
+        )
+
+    def test_sessions_by_creation_range(self):
+        self.assertUsesIndex(
+            ChatSession.objects.filter(created_at__gte=self.since, created_at__lt=timezone.now()),
+            'chatsession_created_idx'
+        )
+
+    def test_escalated_sessions_by_creation(self):
+        self.assertUsesIndex(
+            ChatSession.objects.filter(is_escalated=True, created_at__gte=self.since),
+            'chatsession_escalated_idx'
+        )
+
+    def test_feedback_by_creation(self):
+        self.assertUsesIndex(
+            ChatFeedback.objects.filter(created_at__gte=self.since),
+            'chatfeedback_created_idx'
+        )
+
+
+class ActivityHeatmapTests(TestCase):
+
+    def test_buckets_sessions_by_day_hour_and_escalation_in_one_query(self):
+        today = timezone.localdate()
+        at = timezone.make_aware(datetime.combine(today - timedelta(days=1), time(14, 30)))
+        for i, escalated in enumerate([False, True, False]):
+            session = ChatSession.objects.create(session_id=f'heatmap-{i}', is_escalated=escalated)
+            ChatSession.objects.filter(pk=session.pk).update(created_at=at)
+
+        with self.assertNumQueries(1):
+            heatmap = activity_heatmap(['sessions', 'escalations'], days=7)
+
+        sessions = heatmap['sessions']
+        self.assertEqual(sessions['by_hour'][14], 3)
+        self.assertEqual(sum(sessions['by_hour']), 3)
+        self.assertEqual(sessions['by_day'][-2], {'date': today - timedelta(days=1), 'value': 3})
+        self.assertEqual(sessions['grid'][-2][14], 3)
+        self.assertEqual(heatmap['escalations']['by_hour'][14], 1)
+        self.assertEqual(len(sessions['by_day']), 7)
+
+    def test_response_time_is_a_weighted_average(self):
+        session = ChatSession.objects.create(session_id='heatmap-rt')
+        for response_time in (1.0, 2.0, 6.0):
+            ChatMessage.objects.create(session=session, message_type='bot', content='x', response_time=response_time)
+
+        heatmap = activity_heatmap(['response_time'], days=1)
+        self.assertEqual(heatmap['response_time']['by_day'][0]['value'], 3.0)
+
+
+class ChatHistoryTests(TestCase):
+    """History is unbounded unless paged, and cached copies follow the latest message"""
+
+    def setUp(self):
+        self.session = ChatSession.objects.create(session_id='history-1')
+        for i in range(3):
+            ChatMessage.objects.create(session=self.session, message_type='user', content=f'message {i}')
+
+    def test_full_history_without_limit(self):
+        data = self.client.get('/chatbot/history/history-1/').json()
+        self.assertEqual(len(data['messages']), 3)
+        self.assertEqual((data['pagination']['limit'], data['pagination']['has_more']), (None, False))
+
+        data = self.client.get('/chatbot/history/history-1/?limit=2').json()
+        self.assertEqual((len(data['messages']), data['pagination']['has_more']), (2, True))
+
+    def test_new_message_in_the_same_second_changes_the_etag(self):
+        response = self.client.get('/chatbot/history/history-1/')
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/chatbot/history/history-1/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ChatMessage.objects.create(session=self.session, message_type='bot', content='reply')
+        response = self.client.get('/chatbot/history/history-1/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['messages']), 4)
+
+
+class AgentReplyTests(TestCase):
+    """Agent replies need a staff session and the CSRF token"""
+
+    def setUp(self):
+        self.session = ChatSession.objects.create(session_id='escalated-1', is_escalated=True)
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.cookies['csrftoken'] = self.token = 'agentconsole' * 2 + 'csrf' * 2
+        self.url = '/chatbot/agent-reply/escalated-1/'
+
+    def post(self, **headers):
+        return self.client.post(self.url, '{"message": "On my way"}', content_type='application/json', **headers)
+
+    def test_requires_csrf_token_and_staff(self):
+        self.client.force_login(User.objects.create_user('agent', is_staff=True))
+        self.assertEqual(self.post().status_code, 403)
+        response = self.post(HTTP_X_CSRFTOKEN=self.token)
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertTrue(self.session.messages.filter(message_type='agent').exists())
+
+        self.client.force_login(User.objects.create_user('customer'))
+        response = self.post(HTTP_X_CSRFTOKEN=self.token)
+        self.assertEqual(response.status_code, 403)
+
+
+class RollupWatermarkTests(TestCase):
+    """On-demand rollups don't hide changes from the rollup job"""
+
+    def session_on(self, day, name):
+        session = ChatSession.objects.create(session_id=name)
+        ChatSession.objects.filter(pk=session.pk).update(
+            created_at=timezone.make_aware(datetime.combine(day, time(10)))
+        )
+        return session
+
+    def test_changes_after_a_lazy_fill_are_rolled_up_by_the_job(self):
+        today = timezone.localdate()
+        old_day, recent_day = today - timedelta(days=5), today - timedelta(days=1)
+        session = self.session_on(old_day, 'old')
+        self.session_on(recent_day, 'recent')
+        self.assertEqual(analytics.refresh_rollups(), [old_day + timedelta(days=n) for n in range(5)])
+
+        # Escalated after the job ran, then a dashboard fills a missing day
+        ChatSession.objects.filter(pk=session.pk).update(is_escalated=True, updated_at=timezone.now())
+        ChatAnalytics.objects.filter(date=recent_day).delete()
+        analytics.summarize(recent_day, recent_day)
+
+        self.assertEqual(analytics.affected_days(), [old_day])
+        analytics.refresh_rollups()
+        self.assertEqual(ChatAnalytics.objects.get(date=old_day).escalated_queries, 1)
+
+    def test_scheduled_command_advances_the_watermark(self):
+        today = timezone.localdate()
+        old_day = today - timedelta(days=3)
+        session = self.session_on(old_day, 'command')
+        call_command('rollup_chat_analytics', stdout=io.StringIO())
+        self.assertIsNotNone(ChatAnalytics.objects.aggregate(last=Max('job_started_at'))['last'])
+
+        ChatSession.objects.filter(pk=session.pk).update(is_escalated=True, updated_at=timezone.now())
+        self.assertEqual(analytics.affected_days(), [old_day])
+        call_command('rollup_chat_analytics', stdout=io.StringIO())
+        self.assertEqual(ChatAnalytics.objects.get(date=old_day).escalated_queries, 1)
+
+        call_command('rollup_chat_analytics', full=True, stdout=io.StringIO())
+        self.assertEqual(analytics.affected_days(), [])
+
+    def test_lazy_fill_is_capped(self):
+        today = timezone.localdate()
+        start = today - timedelta(days=analytics.LAZY_ROLLUP_LIMIT + 3)
+        self.session_on(start, 'first')
+        with self.assertLogs('chatbot.analytics', 'WARNING'):
+            summary = analytics.summarize(start, today)
+        self.assertEqual(summary['pending_days'], 3)
+        self.assertEqual(ChatAnalytics.objects.count(), analytics.LAZY_ROLLUP_LIMIT)
@@ -13,6 +13,10 @@ urlpatterns = [
     # Chat history
     path('history/<str:session_id>/', views.chat_history, name='chat_history'),
     
+    # Real-time push and agent replies
+    path('stream/<str:session_id>/', views.chat_stream, name='chat_stream'),
+    path('agent-reply/<str:session_id>/', views.agent_reply, name='agent_reply'),
+    
     # Widget
     path('widget/', views.chatbot_widget, name='widget'),
     
@@ -1,5 +1,5 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
@@ -7,18 +7,24 @@ from django.utils.decorators import method_decorator
 from django.views import View
 from django.utils import timezone
 from django.core.paginator import Paginator
-from django.db.models import Q, Avg, Count
+from django.db.models import Q, Avg, Count, Max
 from django.core.mail import send_mail
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.conf import settings
 from .models import (
     ChatSession, ChatMessage, FAQ, BusinessHours, CompanyInfo, 
     ChatFeedback, EscalationQueue, Notification, ChatAnalytics, ChatbotSettings
 )
 from .nlp_engine import ChatbotEngine
+from .push import get_broker, message_payload
+from .archive import session_messages
+from .analytics import summarize
 from store.models import Product, Category
 import json
 import uuid
 import re
+import hashlib
+import asyncio
 import time as time_module
 from datetime import datetime, time, timedelta
 import logging
@@ -192,12 +198,11 @@ def escalate_to_human(chat_session, reason):
             notes=reason
         )
         
-        # Get conversation history for email
-        messages = ChatMessage.objects.filter(session=chat_session).order_by('timestamp')
+        # Get conversation history for email (including archived messages)
         conversation_history = []
-        for msg in messages:
-            timestamp = msg.timestamp.strftime('%Y-%m-%d %H:%M:%S')
-            conversation_history.append(f"[{timestamp}] {msg.message_type.upper()}: {msg.content}")
+        for msg in session_messages(chat_session):
+            timestamp = datetime.fromisoformat(msg['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+            conversation_history.append(f"[{timestamp}] {msg['type'].upper()}: {msg['content']}")
         
         # Prepare email content
         user_info = "Guest User"
@@ -366,9 +371,19 @@ def submit_feedback(request):
         })
 
 
+# Page size limits for the incremental chat history endpoint
+HISTORY_MAX_LIMIT = 500
+
+
 @require_http_methods(["GET"])
 def chat_history(request, session_id):
-    """Get chat history for a session"""
+    """Get chat history for a session
+    
+    Returns the whole history unless paged with ``?after=<message id>`` and
+    ``&limit=<n>``, so reconnecting clients only fetch messages they have not
+    seen yet. Conditional requests (If-None-Match) get a 304 when nothing
+    changed since the client's last fetch.
+    """
     try:
         chat_session = get_object_or_404(ChatSession, session_id=session_id)
         
@@ -379,21 +394,56 @@ def chat_history(request, session_id):
                 'message': 'Permission denied'
             })
         
-        messages = ChatMessage.objects.filter(session=chat_session).order_by('timestamp')
+        try:
+            after = max(int(request.GET.get('after', 0)), 0)
+            limit = request.GET.get('limit')
+            limit = None if limit is None else min(max(int(limit), 1), HISTORY_MAX_LIMIT)
+        except (TypeError, ValueError):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid pagination parameters'
+            }, status=400)
+        
+        # The ETag is derived from the latest message id and the session's
+        # status, not from timestamps: Last-Modified only has one-second
+        # granularity, so a message posted in the same second as the client's
+        # last fetch would be answered with a stale 304
+        last_id = chat_session.messages.aggregate(last_id=Max('id'))['last_id'] or 0
+        etag_source = (
+            f"{chat_session.pk}:{last_id}:{chat_session.status}:{chat_session.is_escalated}:"
+            f"{bool(chat_session.archived_at)}:{after}:{limit}"
+        )
+        etag = '"%s"' % hashlib.md5(etag_source.encode()).hexdigest()
         
-        messages_data = [{
-            'id': msg.id,
-            'type': msg.message_type,
-            'content': msg.content,
-            'timestamp': msg.timestamp.isoformat(),
-            'intent': msg.intent,
-            'confidence': msg.confidence_score
-        } for msg in messages]
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
         
-        return JsonResponse({
+        if chat_session.archived_at:
+            # Older messages live in cold storage; merge them with any newer rows
+            messages_data = session_messages(chat_session, after)
+            if messages_data:
+                last_id = max(last_id, messages_data[-1]['id'])
+        else:
+            messages = ChatMessage.objects.filter(session=chat_session, id__gt=after).order_by('id')
+            if limit is not None:
+                # Fetch one extra row to know whether another page follows
+                messages = messages[:limit + 1]
+            messages_data = [message_payload(msg) for msg in messages]
+        has_more = limit is not None and len(messages_data) > limit
+        messages_data = messages_data[:limit]
+        
+        response = JsonResponse({
             'status': 'success',
             'session_id': session_id,
             'messages': messages_data,
+            'pagination': {
+                'after': after,
+                'limit': limit,
+                'has_more': has_more,
+                'next_after': messages_data[-1]['id'] if messages_data else after,
+                'last_message_id': last_id
+            },
             'session_info': {
                 'created_at': chat_session.created_at.isoformat(),
                 'channel': chat_session.channel,
@@ -401,6 +451,9 @@ def chat_history(request, session_id):
                 'is_escalated': chat_session.is_escalated
             }
         })
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
         
     except Exception as e:
         logger.error(f"Chat history error: {e}")
@@ -410,6 +463,125 @@ def chat_history(request, session_id):
         })
 
 
+# Seconds between keep-alive comments and before a stream is recycled.
+# Clients reconnect automatically and resume from Last-Event-ID.
+STREAM_HEARTBEAT_INTERVAL = 15
+STREAM_MAX_DURATION = 300
+
+
+@require_http_methods(["GET"])
+async def chat_stream(request, session_id):
+    """Server-Sent Events stream of new messages in a chat session
+    
+    Used by the widget after escalation to receive agent replies and by agent
+    consoles to follow the customer. Messages missed while disconnected are
+    replayed from the database using the Last-Event-ID header (or ?after=).
+    Requires an ASGI server (see riverway/asgi.py) for true streaming.
+    """
+    chat_session = await ChatSession.objects.filter(session_id=session_id).afirst()
+    if chat_session is None:
+        raise Http404("Chat session not found")
+    
+    user = await request.auser()
+    if chat_session.user_id and chat_session.user_id != user.id and not user.is_staff:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Permission denied'
+        }, status=403)
+    
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.GET.get('after', 0))
+    except ValueError:
+        after = 0
+    
+    response = StreamingHttpResponse(
+        _chat_event_stream(chat_session, after),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _chat_event_stream(chat_session, after):
+    """Yield SSE frames: backlog since ``after`` first, then live messages"""
+    # Subscribe before reading the backlog so nothing slips in between
+    subscription = await get_broker().subscribe(chat_session.session_id)
+    try:
+        yield 'retry: 3000\n\n'
+        
+        last_id = after
+        async for msg in ChatMessage.objects.filter(session=chat_session, id__gt=after).order_by('id'):
+            yield _sse_frame(message_payload(msg))
+            last_id = msg.id
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_MAX_DURATION
+        while loop.time() < deadline:
+            payload = await subscription.get(timeout=STREAM_HEARTBEAT_INTERVAL)
+            if payload is None:
+                yield ': keep-alive\n\n'
+            elif payload['id'] > last_id:
+                yield _sse_frame(payload)
+                last_id = payload['id']
+    finally:
+        await subscription.close()
+
+
+def _sse_frame(payload):
+    return f"id: {payload['id']}\nevent: message\ndata: {json.dumps(payload)}\n\n"
+
+
+@require_http_methods(["POST"])
+def agent_reply(request, session_id):
+    """Post a human agent reply into an escalated conversation
+    
+    Staff are authenticated by their session cookie, so the request must
+    carry the CSRF token (``X-CSRFToken`` header).
+    """
+    try:
+        if not request.user.is_staff:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Permission denied'
+            }, status=403)
+        
+        data = json.loads(request.body)
+        message = data.get('message', '').strip()
+        if not message:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Please enter a message.'
+            })
+        
+        chat_session = get_object_or_404(ChatSession, session_id=session_id)
+        
+        # Creating the row is enough: the post_save signal pushes it to
+        # every widget and console subscribed to this session
+        agent_message = ChatMessage.objects.create(
+            session=chat_session,
+            message_type='agent',
+            content=message
+        )
+        
+        # First agent reply marks the escalation as responded to
+        EscalationQueue.objects.filter(
+            session=chat_session, response_time__isnull=True
+        ).update(response_time=timezone.now(), assigned_agent=request.user)
+        
+        return JsonResponse({
+            'status': 'success',
+            'message': message_payload(agent_message)
+        })
+        
+    except Exception as e:
+        logger.error(f"Agent reply error: {e}")
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Failed to send reply'
+        })
+
+
 @require_http_methods(["GET"])
 def chatbot_widget(request):
     """Render chatbot widget"""
@@ -552,39 +724,14 @@ def analytics_data(request):
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
         
-        # Basic metrics
-        total_sessions = ChatSession.objects.filter(
-            created_at__date__range=[start_date, end_date]
-        ).count()
-        
-        escalated_sessions = ChatSession.objects.filter(
-            created_at__date__range=[start_date, end_date],
-            is_escalated=True
-        ).count()
-        
-        # Average ratings
-        avg_rating = ChatFeedback.objects.filter(
-            created_at__date__range=[start_date, end_date]
-        ).aggregate(Avg('rating'))['rating__avg'] or 0
-        
-        # Channel breakdown
-        channel_stats = ChatSession.objects.filter(
-            created_at__date__range=[start_date, end_date]
-        ).values('channel').annotate(count=Count('id'))
-        
-        # Intent breakdown
-        intent_stats = ChatMessage.objects.filter(
-            timestamp__date__range=[start_date, end_date],
-            message_type='bot',
-            intent__isnull=False
-        ).exclude(intent='').values('intent').annotate(count=Count('id'))[:10]
-        
-        # Average response time
-        avg_response_time = ChatMessage.objects.filter(
-            timestamp__date__range=[start_date, end_date],
-            message_type='bot',
-            response_time__isnull=False
-        ).aggregate(Avg('response_time'))['response_time__avg'] or 0
+        # Closed days come from the ChatAnalytics rollups, today from raw rows
+        summary = summarize(start_date, end_date)
+        total_sessions = summary['total_sessions']
+        escalated_sessions = summary['escalated_sessions']
+        avg_rating = summary['average_rating']
+        avg_response_time = summary['average_response_time']
+        channel_stats = summary['channel_stats']
+        intent_stats = summary['intent_stats'][:10]
         
         return JsonResponse({
             'status': 'success',
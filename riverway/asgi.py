@@ -3,6 +3,10 @@ ASGI config for riverway project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (e.g. ``uvicorn riverway.asgi:application``)
+so the chatbot's and the dashboard's Server-Sent Events streams can hold
+connections open without tying up a worker thread per client.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -125,6 +125,13 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Minified, content-hashed and precompressed at collectstatic (see
+# riverway/staticfiles.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'riverway.staticfiles.StaticAssetStorage'},
+}
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -152,3 +159,30 @@ EMAIL_TIMEOUT = 30
 # Chatbot Settings
 CHATBOT_EMAIL = 'info.riverwayco@gmail.com'
 CHATBOT_ESCALATION_SUBJECT = 'Chatbot Escalation - Customer Needs Assistance'
+
+# Real-time push for chat sessions (SSE at /chatbot/stream/<session_id>/) and
+# live dashboard events (/dashboard/api/events/).
+# The in-process broker serves a single worker; use 'chatbot.push.RedisBroker'
+# with CHATBOT_PUSH_REDIS_URL when running several workers.
+CHATBOT_PUSH_BACKEND = 'chatbot.push.InProcessBroker'
+CHATBOT_PUSH_REDIS_URL = 'redis://localhost:6379/0'
+
+# Cold storage for old chat transcripts (see `manage.py archive_chat_sessions`)
+CHATBOT_ARCHIVE_ROOT = BASE_DIR / 'archive' / 'chat'
+CHATBOT_ARCHIVE_AFTER_DAYS = 180
+
+# Columnar analytics exports (see `manage.py export_columnar`)
+ANALYTICS_EXPORT_ROOT = BASE_DIR / 'exports'
+
+# Products at or below this stock level raise a low-stock alert unless their
+# product or category sets its own threshold
+LOW_STOCK_THRESHOLD = 10
+
+# Serve collected static files from Django, with precompressed copies and
+# immutable caching, when no web server or CDN sits in front of it
+SERVE_STATIC = False
+
+# Seconds a cached catalog query or page fragment is kept (see store/caching.py).
+# Entries are invalidated by version on every catalog change; this only bounds
+# how long orphaned entries occupy the cache
+CATALOG_CACHE_TIMEOUT = 3600
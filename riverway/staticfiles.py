@@ -0,0 +1,289 @@
+"""
+Static asset pipeline.
+
+``collectstatic`` with StaticAssetStorage minifies the site's own CSS and
+JavaScript (under ``css/`` and ``js/``), fingerprints every file with a
+content hash through Django's manifest storage, and writes gzip (and, when
+the ``brotli`` package is installed, Brotli) copies next to each hashed text
+asset. Templates reference assets with ``{% static %}``, so pages always
+point at the current hashes and the files themselves can be cached forever.
+
+``serve`` delivers collected files with the precompressed copy the browser
+accepts and an immutable Cache-Control for hashed names. It is only routed
+when SERVE_STATIC is set; behind nginx or a CDN, configure the same there
+(see the deployment docs).
+
+Until ``collectstatic`` has written a manifest (development, tests) the
+unhashed source files are referenced instead.
+"""
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.views import static
+
+try:
+    import brotli
+except ImportError:  # optional; gzip copies are always written
+    brotli = None
+
+# Project assets that are minified; vendored and admin files are left alone
+MINIFY_PREFIXES = ('css/', 'js/')
+COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map')
+
+# Names like site.3f2a9c1b7d4e.css, as written by the manifest storage
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Unhashed names may change under the same URL
+REVALIDATE = 'public, max-age=300'
+
+
+def minify_css(text):
+    """Drop comments and redundant whitespace, leaving strings untouched"""
+    out = []
+    space = False
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c.isspace():
+            space = True
+            i += 1
+            continue
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        # Spaces next to block and declaration punctuation carry no meaning;
+        # before ':' they do (``a :hover``)
+        if space and out and out[-1][-1] not in '{};,:' and c not in '{};,':
+            out.append(' ')
+        space = False
+        if c in '"\'':
+            end = _skip_string(text, i)
+            out.append(text[i:end])
+            i = end
+            continue
+        if c == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(c)
+        i += 1
+    return ''.join(out) + '\n'
+
+
+REGEX_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+}
+
+
+def minify_js(text):
+    """Drop comments, indentation and blank lines
+
+    Line breaks are kept so automatic semicolon insertion is unaffected, and
+    strings, template literals and regular expressions are copied verbatim.
+    """
+    out = []
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c == '\n':
+            _end_line(out)
+            i += 1
+        elif c in ' \t\r':
+            while i < n and text[i] in ' \t\r':
+                i += 1
+            if out and out[-1][-1] not in ' \n':
+                out.append(' ')
+        elif c in '"\'':
+            end = _skip_string(text, i)
+            out.append(text[i:end])
+            i = end
+        elif c == '`':
+            end = _skip_template(text, i)
+            out.append(text[i:end])
+            i = end
+        elif text.startswith('//', i):
+            end = text.find('\n', i)
+            i = n if end < 0 else end
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            # A comment spanning lines still ends the statement for ASI
+            if '\n' in text[i:end]:
+                _end_line(out)
+            i = end
+        elif c == '/' and _regex_allowed(out):
+            end = _skip_regex(text, i)
+            out.append(text[i:end])
+            i = end
+        else:
+            out.append(c)
+            i += 1
+    _end_line(out)
+    return ''.join(out)
+
+
+def _end_line(out):
+    if out and out[-1] == ' ':
+        out.pop()
+    if out and out[-1][-1] != '\n':
+        out.append('\n')
+
+
+def _skip_string(text, i):
+    quote, i = text[i], i + 1
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+        elif text[i] == quote:
+            return i + 1
+        elif text[i] == '\n':
+            return i
+        else:
+            i += 1
+    return i
+
+
+def _skip_template(text, i):
+    i += 1
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+        elif text[i] == '`':
+            return i + 1
+        elif text.startswith('${', i):
+            i = _skip_braces(text, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_braces(text, i):
+    depth = 1
+    while i < len(text):
+        c = text[i]
+        if c in '"\'':
+            i = _skip_string(text, i)
+        elif c == '`':
+            i = _skip_template(text, i)
+        else:
+            if c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+                if not depth:
+                    return i + 1
+            i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """Whether a ``/`` here starts a regular expression rather than a division"""
+    tail = ''.join(out[-20:]).rstrip()
+    if not tail:
+        return True
+    if tail[-1] in ')]':
+        return False
+    word = re.search(r'[\w$]+$', tail)
+    if word:
+        return word.group() in REGEX_KEYWORDS
+    return True
+
+
+def _skip_regex(text, i):
+    j, in_class = i + 1, False
+    while j < len(text):
+        c = text[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            # Not a regular expression after all
+            return i + 1
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < len(text) and text[j].isalpha():
+                j += 1
+            return j
+        j += 1
+    return i + 1
+
+
+class StaticAssetStorage(ManifestStaticFilesStorage):
+    """Manifest storage that minifies project assets and precompresses text files"""
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # collectstatic hasn't run: reference the source files
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            # Minify the collected copies first so the hashes cover the
+            # minified content, then hash from those copies
+            paths = {name: self._minify(name, source) for name, source in paths.items()}
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            for name in sorted(set(self.hashed_files.values())):
+                if name.endswith(COMPRESS_EXTENSIONS):
+                    self._compress(name)
+
+    def _minify(self, name, source):
+        if not name.startswith(MINIFY_PREFIXES) or '.min.' in name:
+            return source
+        minify = {'.css': minify_css, '.js': minify_js}.get(os.path.splitext(name)[1])
+        if minify is None:
+            return source
+        storage, path = source
+        with storage.open(path) as original:
+            text = original.read().decode('utf-8')
+        self.delete(name)
+        self._save(name, ContentFile(minify(text).encode('utf-8')))
+        return self, name
+
+    def _compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            # Tiny files can grow when compressed
+            if len(compressed) < len(data):
+                self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+
+
+def serve(request, path):
+    """Serve a collected static file, precompressed when the browser allows"""
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+    if not os.path.isfile(fullpath):
+        raise Http404(f'{path} not found')
+
+    accepted = request.headers.get('Accept-Encoding', '')
+    name = path
+    for suffix, encoding in (('.br', 'br'), ('.gz', 'gzip')):
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            # django.views.static.serve sets Content-Encoding from the suffix
+            name = path + suffix
+            break
+
+    response = static.serve(request, name, document_root=settings.STATIC_ROOT)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response['Cache-Control'] = IMMUTABLE if HASHED_NAME_RE.search(path) else REVALIDATE
+    return response
@@ -0,0 +1,55 @@
+import gzip
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from . import staticfiles
+
+
+class MinifyTests(SimpleTestCase):
+    """Minification never touches strings, templates or regular expressions"""
+
+    def test_js(self):
+        source = (
+            "const id = url.match(/add-to-cart\\/(\\d+)\\//)[1];  // product id\n"
+            "\n"
+            "    const html = `<a href=\"//x\">${ ok ? `y` : '}' }</a>`; /* note */\n"
+            "let ratio = a / b / c;\n"
+        )
+        self.assertEqual(staticfiles.minify_js(source), (
+            "const id = url.match(/add-to-cart\\/(\\d+)\\//)[1];\n"
+            "const html = `<a href=\"//x\">${ ok ? `y` : '}' }</a>`;\n"
+            "let ratio = a / b / c;\n"
+        ))
+
+    def test_css(self):
+        source = "/* nav */\n.nav a :hover ,\n.b {\n    content: '  ;  ';\n    margin: 0 auto;\n}\n"
+        self.assertEqual(staticfiles.minify_css(source), ".nav a :hover,.b{content:'  ;  ';margin:0 auto}\n")
+
+
+class StaticAssetPipelineTests(SimpleTestCase):
+    """collectstatic writes hashed, minified, precompressed bundles"""
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+
+    def test_collect_and_serve(self):
+        with override_settings(STATIC_ROOT=self.static_root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            storage = staticfiles.StaticAssetStorage()
+            name = storage.stored_name('js/site.js')
+            self.assertRegex(name, staticfiles.HASHED_NAME_RE)
+            with storage.open(name) as bundle, storage.open(name + '.gz') as compressed:
+                self.assertEqual(gzip.decompress(compressed.read()), bundle.read())
+
+            request = RequestFactory().get(f'/static/{name}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+            response = staticfiles.serve(request, name)
+            response.close()
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Cache-Control'], staticfiles.IMMUTABLE)
+            response = staticfiles.serve(RequestFactory().get('/static/js/site.js'), 'js/site.js')
+            response.close()
+            self.assertEqual(response['Cache-Control'], staticfiles.REVALIDATE)
@@ -0,0 +1,1061 @@
+// Cart
+
+// Add to cart functionality with AJAX
+function addToCartAjax(productId, quantity = 1) {
+    const formData = new FormData();
+    formData.append('quantity', quantity);
+    formData.append('csrfmiddlewaretoken', getCookie('csrftoken'));
+
+    fetch(`/add-to-cart/${productId}/`, {
+        method: 'POST',
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest',
+            'X-CSRFToken': getCookie('csrftoken')
+        },
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            updateCartCount(data.cart_total);
+            showToast('Product added to cart!', 'success');
+        } else {
+            showToast(data.error || 'Error adding product to cart', 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showToast('Error adding product to cart', 'error');
+    });
+}
+
+// Update cart count badge
+function updateCartCount(count) {
+    const cartBadge = document.getElementById('cart-count');
+    if (cartBadge) {
+        cartBadge.textContent = count;
+        cartBadge.style.display = count > 0 ? 'inline' : 'none';
+    }
+}
+
+// Show toast notification
+function showToast(message, type = 'info') {
+    const toastContainer = document.querySelector('.toast-container');
+    if (!toastContainer) return;
+
+    const toastId = 'toast_' + Date.now();
+    const iconMap = {
+        success: 'check-circle-fill text-success',
+        error: 'exclamation-triangle-fill text-danger',
+        warning: 'exclamation-triangle-fill text-warning',
+        info: 'info-circle-fill text-info'
+    };
+
+    const toastHTML = `
+        <div class="toast" id="${toastId}" role="alert" aria-live="assertive" aria-atomic="true" data-bs-autohide="true" data-bs-delay="3000">
+            <div class="toast-header">
+                <i class="bi bi-${iconMap[type]} me-2"></i>
+                <strong class="me-auto">${type.charAt(0).toUpperCase() + type.slice(1)}</strong>
+                <small class="text-muted">now</small>
+                <button type="button" class="btn-close" data-bs-dismiss="toast" aria-label="Close"></button>
+            </div>
+            <div class="toast-body">
+                ${message}
+            </div>
+        </div>
+    `;
+
+    toastContainer.insertAdjacentHTML('beforeend', toastHTML);
+    const toastElement = document.getElementById(toastId);
+    const toast = new bootstrap.Toast(toastElement);
+    toast.show();
+
+    // Remove from DOM after hiding
+    toastElement.addEventListener('hidden.bs.toast', function() {
+        toastElement.remove();
+    });
+}
+
+// Initialize add to cart buttons and cart count
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize cart count
+    const cartBadge = document.getElementById('cart-count');
+    if (cartBadge) {
+        try {
+            const cartCount = parseInt(document.body.dataset.cartCount, 10) || 0;
+            updateCartCount(cartCount);
+        } catch (e) {
+            updateCartCount(0);
+        }
+    }
+
+    // Add click handlers to add to cart buttons
+    const addToCartButtons = document.querySelectorAll('button[type="submit"]');
+    addToCartButtons.forEach(button => {
+        const form = button.closest('form');
+        if (form && form.action.includes('/add-to-cart/')) {
+            form.addEventListener('submit', function(e) {
+                e.preventDefault();
+
+                const actionUrl = form.action;
+                const productId = actionUrl.match(/add-to-cart\/(\d+)\//)[1];
+                const quantityInput = form.querySelector('input[name="quantity"]');
+                const quantity = quantityInput ? quantityInput.value : 1;
+
+                // Disable button temporarily
+                button.disabled = true;
+                const originalText = button.innerHTML;
+                button.innerHTML = '<i class="bi bi-hourglass-split"></i> Adding...';
+
+                addToCartAjax(productId, quantity);
+
+                // Re-enable button after delay
+                setTimeout(() => {
+                    button.disabled = false;
+                    button.innerHTML = originalText;
+                }, 1000);
+            });
+        }
+    });
+});
+
+// Chat widget
+
+let chatOpen = false;
+let messageCount = 0;
+let selectedRating = 0;
+let sessionId = 'web_' + Math.random().toString(36).substr(2, 9) + Date.now().toString(36);
+let hasNewMessages = false;
+let nameCollected = false;
+let hasShownNotification = sessionStorage.getItem('base_chatbot_notification_shown') === 'true';
+
+// Initialize session greeting status
+document.addEventListener('DOMContentLoaded', function() {
+    // Hide initial welcome if user has already been greeted
+    if (sessionStorage.getItem('chatbot_greeted') === 'true') {
+        const welcomeElement = document.getElementById('initial-welcome');
+        if (welcomeElement) {
+            welcomeElement.style.display = 'none';
+        }
+    }
+});
+
+function toggleChatbot() {
+    const chatbot = document.getElementById('chatbot');
+    const overlay = document.getElementById('chatbot-overlay');
+    const toggle = document.querySelector('.chatbot-toggle');
+    const badge = document.getElementById('notificationBadge');
+
+    if (chatOpen) {
+        chatbot.style.display = 'none';
+        overlay.style.display = 'none';
+        overlay.classList.remove('show');
+        toggle.style.display = 'block';
+        toggle.style.animation = 'pulse-ring 2s ease-out infinite';
+        document.body.style.overflow = 'auto';
+        chatOpen = false;
+    } else {
+        chatbot.style.display = 'flex';
+        overlay.style.display = 'block';
+        setTimeout(() => overlay.classList.add('show'), 10);
+        toggle.style.display = 'none';
+        toggle.style.animation = 'none';
+        badge.classList.remove('show');
+        document.body.style.overflow = 'hidden';
+        chatOpen = true;
+        hasNewMessages = false;
+
+        // Reset notification state since user opened the chat
+        hasShownNotification = true;
+        sessionStorage.setItem('base_chatbot_notification_shown', 'true');
+
+        // Mark greeting as shown
+        sessionStorage.setItem('chatbot_greeted', 'true');
+
+        // Check if user is authenticated and show name form if needed
+        checkAndShowNameFormOnOpen();
+
+        setTimeout(() => {
+            const input = document.getElementById('chat-input');
+            if (input) {
+                input.focus();
+            }
+        }, 100);
+    }
+}
+
+function sendSuggestion(message) {
+    document.getElementById('chat-input').value = message;
+    sendMessage();
+}
+
+function sendMessage() {
+    const input = document.getElementById('chat-input');
+    const sendBtn = document.getElementById('send-btn');
+    const message = input.value.trim();
+
+    if (!message || sendBtn.disabled) return;
+
+    // Disable send button
+    sendBtn.disabled = true;
+
+    addMessage(message, 'user');
+    input.value = '';
+    messageCount++;
+
+    // Show typing indicator
+    showTyping();
+
+    // Send to chatbot API
+    fetch('/chatbot/api/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCookie('csrftoken')
+        },
+        body: JSON.stringify({ 
+            message: message,
+            channel: 'website',
+            session_id: sessionId
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        hideTyping();
+
+        if (data.status === 'success') {
+            // Add message with products if available
+            addMessage(data.response, 'bot', false, data.products);
+
+            // Check if bot is collecting name and show name collection form
+            if (data.collecting_name || data.greeting_type === 'new_guest') {
+                showMainChatbotNameForm();
+            }
+
+            // Update suggestions based on response
+            if (data.suggested_actions && data.suggested_actions.length > 0) {
+                updateSuggestions(data.suggested_actions);
+            }
+
+            if (data.escalated) {
+                setTimeout(() => {
+                    addMessage('Your conversation has been forwarded to one of our team members who will assist you shortly.', 'bot', true);
+                }, 1000);
+                subscribeToAgentReplies(data.session_id);
+            }
+        } else {
+            addMessage(data.response || 'Sorry, I encountered an error. Please try again.', 'bot');
+        }
+    })
+    .catch(error => {
+        hideTyping();
+        addMessage('Sorry, I encountered a connection error. Please try again.', 'bot');
+    })
+    .finally(() => {
+        sendBtn.disabled = false;
+        input.focus();
+    });
+}
+
+// Live agent replies after escalation (Server-Sent Events)
+let agentStream = null;
+
+function subscribeToAgentReplies(chatSessionId) {
+    if (agentStream || !chatSessionId || !window.EventSource) return;
+
+    agentStream = new EventSource(`/chatbot/stream/${chatSessionId}/`);
+    agentStream.addEventListener('message', function(event) {
+        const msg = JSON.parse(event.data);
+        // User and bot messages are already rendered locally
+        if (msg.type === 'agent') {
+            addMessage(msg.content, 'bot');
+        }
+    });
+}
+
+function addMessage(message, type, isSystem = false, products = []) {
+    const messagesContainer = document.getElementById('chat-messages');
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message ${type}`;
+
+    const now = new Date();
+    const timeString = now.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+
+    const bubbleClass = isSystem ? 'bot-message' : (type === 'user' ? 'user-message' : 'bot-message');
+
+    // Format message with markdown support
+    const formattedMessage = formatMessageWithMarkdown(message);
+
+    messageDiv.innerHTML = `
+        <div class="message-bubble ${bubbleClass}">
+            ${formattedMessage}
+            <div class="message-time">${timeString}</div>
+        </div>
+    `;
+
+    messagesContainer.appendChild(messageDiv);
+
+    // Add product display if products are provided
+    if (products && products.length > 0) {
+        const productContainer = createMainChatbotProductDisplay(products);
+        messagesContainer.appendChild(productContainer);
+    }
+
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+}
+
+function formatMessageWithMarkdown(content) {
+    // Convert markdown-style formatting to HTML
+    return content
+        .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')  // Bold text
+        .replace(/\*(.*?)\*/g, '<em>$1</em>')  // Italic text
+        .replace(/\n/g, '<br>')  // Line breaks
+        .replace(/• /g, '&bull; ')  // Bullet points
+        .replace(/\[([^\]]+)\]\(([^)]+)\)/g, '<a href="$2" target="_blank" style="color: var(--info-color); text-decoration: none;">$1</a>');  // Links
+}
+
+function createMainChatbotProductDisplay(products) {
+    const container = document.createElement('div');
+    container.className = 'message bot';
+    container.style.cssText = 'margin-top: 10px;';
+
+    const productGrid = document.createElement('div');
+    productGrid.style.cssText = `
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+        gap: 12px;
+        padding: 15px;
+        background: #f8f9fa;
+        border-radius: 15px;
+        border: 1px solid #e9ecef;
+    `;
+
+    products.slice(0, 4).forEach(product => {
+        const productCard = document.createElement('div');
+        productCard.style.cssText = `
+            background: white;
+            border: 1px solid #e0e0e0;
+            border-radius: 12px;
+            padding: 12px;
+            cursor: pointer;
+            transition: all 0.3s ease;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.05);
+        `;
+
+        let imageHtml = '';
+        if (product.image_url) {
+            imageHtml = `
+                <img src="${product.image_url}" alt="${product.name}" 
+                     style="width: 100%; height: 120px; object-fit: cover; border-radius: 8px; margin-bottom: 10px;">
+            `;
+        }
+
+        const stockStatus = product.stock_quantity > 0 ? 'In Stock' : 'Out of Stock';
+        const stockColor = product.stock_quantity > 0 ? 'var(--success-color)' : 'var(--danger-color)';
+
+        productCard.innerHTML = `
+            ${imageHtml}
+            <div style="font-size: 14px; font-weight: 600; margin-bottom: 6px; color: var(--primary-color); line-height: 1.3;">
+                ${product.name}
+            </div>
+            <div style="font-size: 16px; font-weight: 700; color: var(--secondary-color); margin-bottom: 6px;">
+                ₵${parseFloat(product.price).toFixed(2)} <span style="font-size: 11px; font-weight: 400; color: #6c757d;">per ${product.unit}</span>
+            </div>
+            <div style="font-size: 12px; color: ${stockColor}; font-weight: 600;">
+                ${stockStatus}
+                ${product.stock_quantity > 0 ? ` (${product.stock_quantity} available)` : ''}
+            </div>
+        `;
+
+        productCard.addEventListener('click', () => {
+            sendSuggestion(`Tell me more about ${product.name}`);
+        });
+
+        productCard.addEventListener('mouseover', () => {
+            productCard.style.transform = 'translateY(-2px)';
+            productCard.style.boxShadow = '0 4px 15px rgba(0,0,0,0.15)';
+        });
+
+        productCard.addEventListener('mouseout', () => {
+            productCard.style.transform = 'translateY(0)';
+            productCard.style.boxShadow = '0 2px 8px rgba(0,0,0,0.05)';
+        });
+
+        productGrid.appendChild(productCard);
+    });
+
+    container.appendChild(productGrid);
+    return container;
+}
+
+function showTyping() {
+    const typingIndicator = document.getElementById('typing-indicator');
+    const messagesContainer = document.getElementById('chat-messages');
+
+    typingIndicator.style.display = 'block';
+    messagesContainer.appendChild(typingIndicator);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+}
+
+function hideTyping() {
+    const typingIndicator = document.getElementById('typing-indicator');
+    typingIndicator.style.display = 'none';
+}
+
+function updateSuggestions(actions) {
+    // Keep the permanent "Talk to human" button and don't add other suggestions
+    // The "Talk to human" button is already in the HTML and should always be visible
+}
+
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+// Handle Enter key in chat input
+document.addEventListener('DOMContentLoaded', function() {
+    const input = document.getElementById('chat-input');
+    if (input) {
+        input.addEventListener('keypress', function(e) {
+            if (e.key === 'Enter' && !e.shiftKey) {
+                e.preventDefault();
+                sendMessage();
+            }
+        });
+
+        // Auto-resize input as user types
+        input.addEventListener('input', function() {
+            const sendBtn = document.getElementById('send-btn');
+            sendBtn.style.opacity = this.value.trim() ? '1' : '0.6';
+        });
+    }
+});
+
+// Feedback system functions
+function showFeedback() {
+    const feedbackSection = document.getElementById('feedbackSection');
+    feedbackSection.classList.add('show');
+}
+
+function hideFeedback() {
+    const feedbackSection = document.getElementById('feedbackSection');
+    feedbackSection.classList.remove('show');
+}
+
+function showNotification() {
+    const badge = document.getElementById('notificationBadge');
+    const toggle = document.querySelector('.chatbot-toggle');
+
+    if (!chatOpen && !hasShownNotification) {
+        badge.classList.add('show');
+        hasNewMessages = true;
+        hasShownNotification = true;
+
+        // Mark notification as shown for this session
+        sessionStorage.setItem('base_chatbot_notification_shown', 'true');
+
+        // Add pulse animation
+        toggle.style.animation = 'pulse-ring 1s infinite';
+    }
+}
+
+// Rating system
+document.addEventListener('DOMContentLoaded', function() {
+    const stars = document.querySelectorAll('.star');
+    stars.forEach(star => {
+        star.addEventListener('click', function() {
+            selectedRating = parseInt(this.dataset.rating);
+            updateStars();
+        });
+
+        star.addEventListener('mouseover', function() {
+            const rating = parseInt(this.dataset.rating);
+            updateStars(rating);
+        });
+    });
+
+    const ratingStars = document.getElementById('ratingStars');
+    if (ratingStars) {
+        ratingStars.addEventListener('mouseleave', function() {
+            updateStars(selectedRating);
+        });
+    }
+});
+
+function updateStars(rating = selectedRating) {
+    document.querySelectorAll('.star').forEach((star, index) => {
+        if (index < rating) {
+            star.classList.add('active');
+        } else {
+            star.classList.remove('active');
+        }
+    });
+}
+
+async function submitFeedback() {
+    const feedback = document.getElementById('feedbackInput').value;
+
+    try {
+        const response = await fetch('/chatbot/feedback/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({
+                session_id: sessionId,
+                rating: selectedRating,
+                feedback: feedback,
+                was_helpful: selectedRating >= 3
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.status === 'success') {
+            addMessage('Thank you for your feedback! 🙏', 'bot', true);
+        }
+    } catch (error) {
+        console.error('Feedback error:', error);
+    }
+
+    hideFeedback();
+}
+
+function showMainChatbotNameForm() {
+    const messagesContainer = document.getElementById('chat-messages');
+    const nameFormDiv = document.createElement('div');
+    nameFormDiv.id = 'mainChatbotNameForm';
+    nameFormDiv.className = 'message bot';
+    nameFormDiv.style.cssText = 'margin-top: 10px; margin-right: 15%;';
+
+    nameFormDiv.innerHTML = `
+        <div class="message-bubble bot-message">
+            <div style="margin-bottom: 15px; color: var(--primary-color); font-weight: 600;">
+                <i class="bi bi-person-circle me-2"></i>May I have your name?
+            </div>
+            <div style="display: flex; gap: 10px; align-items: center; margin-bottom: 10px;">
+                <input type="text" id="mainGuestNameInput" placeholder="Enter your name" style="
+                    flex: 1;
+                    border: 2px solid var(--secondary-color);
+                    border-radius: 25px;
+                    padding: 10px 15px;
+                    font-size: 14px;
+                    outline: none;
+                    transition: border-color 0.3s ease;
+                ">
+                <button onclick="submitMainChatbotGuestName()" style="
+                    background: linear-gradient(135deg, var(--secondary-color), #d35400);
+                    color: white;
+                    border: none;
+                    border-radius: 20px;
+                    padding: 10px 20px;
+                    font-size: 13px;
+                    font-weight: 600;
+                    cursor: pointer;
+                    transition: transform 0.2s ease;
+                " onmouseover="this.style.transform='scale(1.05)'" onmouseout="this.style.transform='scale(1)'">
+                    <i class="bi bi-send me-1"></i>Send
+                </button>
+            </div>
+            <div style="font-size: 11px; color: #6c757d; text-align: center;">
+                <i class="bi bi-info-circle me-1"></i>This helps me personalize our conversation
+            </div>
+        </div>
+    `;
+
+    messagesContainer.appendChild(nameFormDiv);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+    // Focus on the input
+    setTimeout(() => {
+        const nameInput = document.getElementById('mainGuestNameInput');
+        if (nameInput) {
+            nameInput.focus();
+
+            // Allow Enter key to submit
+            nameInput.addEventListener('keypress', function(e) {
+                if (e.key === 'Enter') {
+                    submitMainChatbotGuestName();
+                }
+            });
+        }
+    }, 100);
+}
+
+async function submitMainChatbotGuestName() {
+    const nameInput = document.getElementById('mainGuestNameInput');
+    const name = nameInput ? nameInput.value.trim() : '';
+
+    if (!name) return;
+
+    // Mark that we've collected the name for this session
+    nameCollected = true;
+
+    // Remove the name collection form
+    const nameForm = document.getElementById('mainChatbotNameForm');
+    if (nameForm) {
+        nameForm.remove();
+    }
+
+    // Add the name as a user message and send it
+    addMessage(name, 'user');
+
+    // Show typing indicator
+    showTyping();
+
+    try {
+        const response = await fetch('/chatbot/api/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({
+                message: name,
+                channel: 'website'
+            })
+        });
+
+        const data = await response.json();
+
+        hideTyping();
+
+        if (data.status === 'success') {
+            addMessage(data.response, 'bot', false, data.products);
+        } else {
+            addMessage(data.response || 'Sorry, I encountered an error. Please try again.', 'bot');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        hideTyping();
+        addMessage('Sorry, I encountered a connection error. Please try again.', 'bot');
+    }
+}
+
+function checkAndShowNameFormOnOpen() {
+    // Only ask for name if we haven't collected it yet this session
+    if (nameCollected) {
+        return;
+    }
+
+    // Check if user is authenticated by making a quick API call
+    fetch('/chatbot/api/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCookie('csrftoken')
+        },
+        body: JSON.stringify({
+            message: 'hello',
+            channel: 'website'
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success') {
+            // Clear the initial static welcome message and replace with dynamic response
+            const messagesContainer = document.getElementById('chat-messages');
+            // Remove the static welcome message
+            const staticWelcome = messagesContainer.querySelector('.message.bot');
+            if (staticWelcome) {
+                staticWelcome.remove();
+            }
+            // Add the dynamic bot response
+            addMessage(data.response, 'bot');
+
+            // Only show name form if we haven't collected name AND bot is asking for it
+            if (!nameCollected && (data.collecting_name || data.greeting_type === 'new_guest')) {
+                setTimeout(() => {
+                    showMainChatbotNameForm();
+                }, 500); // Small delay for better UX
+            }
+        }
+    })
+    .catch(error => {
+        console.error('Error checking authentication:', error);
+        // If there's an error, just show the regular interface
+    });
+}
+
+// Auto-show functionality has been disabled - chatbot opens only when clicked
+
+// Contextual chatbot functionality based on current page
+function getPageContext() {
+    const path = window.location.pathname;
+    const currentPage = document.title;
+
+    if (path.includes('/products/')) {
+        return {
+            context: 'product_page',
+            suggestions: [
+                { text: 'Product Details', query: 'Tell me more about this product' },
+                { text: 'Similar Products', query: 'Show me similar products' }
+            ]
+        };
+    } else if (path.includes('/cart/')) {
+        return {
+            context: 'cart_page',
+            suggestions: [
+                { text: 'Checkout Help', query: 'I need help with checkout' },
+                { text: 'Shipping Info', query: 'What are the shipping options?' },
+                { text: 'Payment Methods', query: 'What payment methods do you accept?' },
+                { text: 'Delivery Time', query: 'When will my order arrive?' }
+            ]
+        };
+    } else if (path.includes('/orders/')) {
+        return {
+            context: 'orders_page',
+            suggestions: [
+                { text: 'Track Order', query: 'How can I track my order?' },
+                { text: 'Order Status', query: 'What is the status of my order?' },
+                { text: 'Modify Order', query: 'Can I modify my order?' },
+                { text: 'Return Policy', query: 'What is your return policy?' }
+            ]
+        };
+    } else if (path === '/' || path === '/home/') {
+        return {
+            context: 'home_page',
+            suggestions: []
+        };
+    }
+
+    return {
+        context: 'general',
+        suggestions: []
+    };
+}
+
+// Update suggestions based on page context
+function updateContextualSuggestions() {
+    const context = getPageContext();
+    if (context.suggestions.length > 0) {
+        const suggestionsContainer = document.querySelector('.suggestion-chips');
+
+        // Add contextual suggestions
+        context.suggestions.forEach(suggestion => {
+            const chip = document.createElement('div');
+            chip.className = 'suggestion-chip';
+            chip.innerHTML = `<i class="bi bi-lightbulb me-1"></i>${suggestion.text}`;
+            chip.onclick = () => sendSuggestion(suggestion.query);
+            chip.style.background = 'linear-gradient(135deg, #e3f2fd, #bbdefb)';
+            chip.style.borderColor = '#2196f3';
+            chip.style.color = '#1976d2';
+            suggestionsContainer.appendChild(chip);
+        });
+    }
+}
+
+// Initialize contextual suggestions when DOM is ready
+document.addEventListener('DOMContentLoaded', function() {
+    setTimeout(updateContextualSuggestions, 500);
+});
+
+// Initialize toasts
+document.addEventListener('DOMContentLoaded', function() {
+    var toastElements = document.querySelectorAll('.toast');
+
+    toastElements.forEach(function(toastEl, index) {
+        // Add delay for multiple toasts to appear one after another
+        setTimeout(function() {
+            toastEl.classList.add('showing');
+
+            var toast = new bootstrap.Toast(toastEl, {
+                autohide: true,
+                delay: 5000
+            });
+
+            // Show the toast
+            toast.show();
+
+            // Handle toast hiding
+            toastEl.addEventListener('hide.bs.toast', function() {
+                toastEl.classList.add('hide');
+            });
+
+        }, index * 200); // 200ms delay between each toast
+    });
+});
+
+// Contact Form Functions
+function showContactForm() {
+    document.getElementById('contactModalOverlay').style.display = 'flex';
+    // Pre-fill user name if available
+    const userName = sessionStorage.getItem('userName');
+    if (userName) {
+        document.getElementById('contactName').value = userName;
+    }
+}
+
+function hideContactForm() {
+    document.getElementById('contactModalOverlay').style.display = 'none';
+    document.getElementById('contactForm').reset();
+}
+
+function requestQuote() {
+    addMessage('I would like to request a quote for your products and services.', 'user');
+    setTimeout(() => {
+        sendMessage('quote request');
+    }, 300);
+}
+
+function talkToHuman() {
+    addMessage('I would like to speak with a human agent.', 'user');
+    setTimeout(() => {
+        addMessage('I\'ll connect you with our team. Please fill out this form and we\'ll get back to you shortly.', 'bot');
+        showContactForm();
+    }, 800);
+}
+
+function showContactForm() {
+    const messagesContainer = document.getElementById('chat-messages');
+    const contactFormDiv = document.createElement('div');
+    contactFormDiv.className = 'message bot';
+    contactFormDiv.style.cssText = 'margin-top: 10px; margin-right: 15%;';
+
+    contactFormDiv.innerHTML = `
+        <div class="message-bubble bot-message">
+            <div style="margin-bottom: 15px; color: var(--primary-color); font-weight: 600;">
+                <i class="bi bi-person-headset me-2"></i>Contact Our Team
+            </div>
+            <form id="chatContactForm" style="display: flex; flex-direction: column; gap: 12px;">
+                <input type="text" id="chatContactName" placeholder="Your Name" style="
+                    border: 2px solid var(--secondary-color);
+                    border-radius: 8px;
+                    padding: 8px 12px;
+                    font-size: 14px;
+                    outline: none;
+                " required>
+                <input type="email" id="chatContactEmail" placeholder="Your Email" style="
+                    border: 2px solid var(--secondary-color);
+                    border-radius: 8px;
+                    padding: 8px 12px;
+                    font-size: 14px;
+                    outline: none;
+                " required>
+                <select id="chatContactPriority" style="
+                    border: 2px solid var(--secondary-color);
+                    border-radius: 8px;
+                    padding: 8px 12px;
+                    font-size: 14px;
+                    outline: none;
+                " required>
+                    <option value="">Select Priority</option>
+                    <option value="Low">Low - General Inquiry</option>
+                    <option value="Medium">Medium - Product Question</option>
+                    <option value="High">High - Order Issue</option>
+                    <option value="Urgent">Urgent - Problem</option>
+                </select>
+                <textarea id="chatContactMessage" placeholder="Describe your inquiry..." rows="3" style="
+                    border: 2px solid var(--secondary-color);
+                    border-radius: 8px;
+                    padding: 8px 12px;
+                    font-size: 14px;
+                    outline: none;
+                    resize: vertical;
+                " required></textarea>
+                <button type="submit" style="
+                    background: linear-gradient(135deg, var(--secondary-color), #d35400);
+                    color: white;
+                    border: none;
+                    border-radius: 8px;
+                    padding: 10px 20px;
+                    font-size: 14px;
+                    font-weight: 600;
+                    cursor: pointer;
+                ">
+                    <i class="bi bi-send me-1"></i>Send Message
+                </button>
+            </form>
+        </div>
+    `;
+
+    messagesContainer.appendChild(contactFormDiv);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+    // Handle form submission
+    const form = contactFormDiv.querySelector('#chatContactForm');
+    form.addEventListener('submit', async function(e) {
+        e.preventDefault();
+
+        const name = document.getElementById('chatContactName').value;
+        const email = document.getElementById('chatContactEmail').value;
+        const priority = document.getElementById('chatContactPriority').value;
+        const message = document.getElementById('chatContactMessage').value;
+
+        // Submit the form
+        try {
+            const response = await fetch('/chatbot/contact-support/', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': getCookie('csrftoken')
+                },
+                body: JSON.stringify({
+                    name: name,
+                    email: email,
+                    priority: priority,
+                    description: message,
+                    source: 'chatbot'
+                })
+            });
+
+            if (response.ok) {
+                contactFormDiv.remove();
+                addMessage('Thank you! Your message has been sent to our team. We\'ll get back to you soon!', 'bot');
+            } else {
+                addMessage('Sorry, there was an error sending your message. Please try again.', 'bot');
+            }
+        } catch (error) {
+            addMessage('Sorry, there was a connection error. Please try again.', 'bot');
+        }
+    });
+}
+
+// Handle contact form submission
+document.addEventListener('DOMContentLoaded', function() {
+    const contactForm = document.getElementById('contactForm');
+    if (contactForm) {
+        contactForm.addEventListener('submit', async function(e) {
+            e.preventDefault();
+
+            const submitBtn = document.querySelector('.contact-btn-submit');
+            const originalText = submitBtn.textContent;
+            submitBtn.textContent = 'Sending...';
+            submitBtn.disabled = true;
+
+            const formData = {
+                name: document.getElementById('contactName').value,
+                email: document.getElementById('contactEmail').value,
+                priority: document.getElementById('contactPriority').value,
+                description: document.getElementById('contactDescription').value
+            };
+
+            try {
+                const response = await fetch('/chatbot/contact-support/', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'X-CSRFToken': getCookie('csrftoken')
+                    },
+                    body: JSON.stringify(formData)
+                });
+
+                if (response.ok) {
+                    hideContactForm();
+                    addMessage('Thank you! Your support request has been sent. Our team will contact you within 24 hours.', 'bot');
+                } else {
+                    alert('There was an error sending your request. Please try again.');
+                }
+            } catch (error) {
+                alert('There was an error sending your request. Please try again.');
+            } finally {
+                submitBtn.textContent = originalText;
+                submitBtn.disabled = false;
+            }
+        });
+    }
+
+    // Close modal when clicking outside
+    document.getElementById('contactModalOverlay').addEventListener('click', function(e) {
+        if (e.target === this) {
+            hideContactForm();
+        }
+    });
+});
+
+// Hero slider
+
+// Hero Slider Functionality
+let currentSlideIndex = 0;
+let slideInterval;
+
+function initializeSlider() {
+    const slides = document.querySelectorAll('.hero-slide');
+    const indicators = document.querySelectorAll('.indicator');
+
+    if (slides.length === 0) return;
+
+    // Start auto-slide
+    startAutoSlide();
+
+    // Pause on hover
+    const sliderContainer = document.querySelector('.hero-slider-container');
+    if (sliderContainer) {
+        sliderContainer.addEventListener('mouseenter', stopAutoSlide);
+        sliderContainer.addEventListener('mouseleave', startAutoSlide);
+    }
+}
+
+function changeSlide(direction) {
+    const slides = document.querySelectorAll('.hero-slide');
+    const indicators = document.querySelectorAll('.indicator');
+
+    if (slides.length === 0) return;
+
+    // Remove active class from current slide and indicator
+    slides[currentSlideIndex].classList.remove('active');
+    indicators[currentSlideIndex].classList.remove('active');
+
+    // Calculate next slide index
+    currentSlideIndex += direction;
+
+    if (currentSlideIndex >= slides.length) {
+        currentSlideIndex = 0;
+    } else if (currentSlideIndex < 0) {
+        currentSlideIndex = slides.length - 1;
+    }
+
+    // Add active class to new slide and indicator
+    slides[currentSlideIndex].classList.add('active');
+    indicators[currentSlideIndex].classList.add('active');
+}
+
+function currentSlide(slideIndex) {
+    const slides = document.querySelectorAll('.hero-slide');
+    const indicators = document.querySelectorAll('.indicator');
+
+    if (slides.length === 0) return;
+
+    // Remove active class from current slide and indicator
+    slides[currentSlideIndex].classList.remove('active');
+    indicators[currentSlideIndex].classList.remove('active');
+
+    // Set new slide index (subtract 1 because slideIndex is 1-based)
+    currentSlideIndex = slideIndex - 1;
+
+    // Add active class to new slide and indicator
+    slides[currentSlideIndex].classList.add('active');
+    indicators[currentSlideIndex].classList.add('active');
+
+    // Restart auto-slide
+    stopAutoSlide();
+    startAutoSlide();
+}
+
+function startAutoSlide() {
+    slideInterval = setInterval(function() {
+        changeSlide(1);
+    }, 10000); // Change slide every 10 seconds
+}
+
+function stopAutoSlide() {
+    if (slideInterval) {
+        clearInterval(slideInterval);
+    }
+}
+
+// Initialize slider when DOM is loaded
+document.addEventListener('DOMContentLoaded', function() {
+    initializeSlider();
+});
@@ -0,0 +1,413 @@
+// Initialize welcome time
+document.getElementById('welcomeTime').textContent = new Date().toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+
+// Show auth prompt if not authenticated and no guest name
+if (!userAuthenticated && !guestName) {
+    showAuthPrompt();
+}
+
+function handleKeyPress(event) {
+    if (event.key === 'Enter') {
+        sendMessage();
+    }
+}
+
+function sendSuggestion(message) {
+    document.getElementById('messageInput').value = message;
+    sendMessage();
+}
+
+async function sendMessage() {
+    const input = document.getElementById('messageInput');
+    const message = input.value.trim();
+
+    if (!message) return;
+
+    const sendButton = document.getElementById('sendButton');
+    sendButton.disabled = true;
+    sendButton.innerHTML = '<div class="loading-spinner"></div>';
+
+    // Add user message to chat
+    addMessage('user', message);
+    input.value = '';
+
+    // Show typing indicator
+    showTyping();
+
+    try {
+        const response = await fetch('/chatbot/api/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({
+                message: message,
+                channel: 'website'
+            })
+        });
+
+        const data = await response.json();
+
+        // Hide typing indicator
+        hideTyping();
+
+        if (data.status === 'success') {
+            // Add bot response
+            addMessage('bot', data.response);
+
+            // Display products if provided
+            if (data.products && data.products.length > 0) {
+                displayProducts(data.products);
+            }
+
+            // Update suggestions if provided
+            if (data.suggested_actions && data.suggested_actions.length > 0) {
+                updateSuggestions(data.suggested_actions);
+            }
+
+            // Show escalation notice if escalated
+            if (data.escalated) {
+                addMessage('system', 'Your conversation has been forwarded to one of our team members who will assist you shortly.');
+                subscribeToAgentReplies(data.session_id);
+            }
+
+            // Update user authentication status
+            if (data.user_authenticated !== undefined) {
+                userAuthenticated = data.user_authenticated;
+                if (data.username) {
+                    userName = data.username;
+                }
+            }
+
+            messageCount++;
+
+            // Show feedback after 3 messages
+            if (messageCount >= 3) {
+                setTimeout(() => showFeedback(), 2000);
+            }
+        } else {
+            addMessage('bot', data.response || 'Sorry, I encountered an error. Please try again.');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        hideTyping();
+        addMessage('bot', 'Sorry, I encountered a connection error. Please try again.');
+    }
+
+    sendButton.disabled = false;
+    sendButton.innerHTML = '<svg width="20" height="20" viewBox="0 0 24 24" fill="none"><path d="M2 21L23 12L2 3V10L17 12L2 14V21Z" fill="currentColor"/></svg>';
+}
+
+// Live agent replies after escalation (Server-Sent Events)
+let agentStream = null;
+
+function subscribeToAgentReplies(chatSessionId) {
+    if (agentStream || !chatSessionId || !window.EventSource) return;
+
+    agentStream = new EventSource(`/chatbot/stream/${chatSessionId}/`);
+    agentStream.addEventListener('message', function(event) {
+        const msg = JSON.parse(event.data);
+        // User and bot messages are already rendered locally
+        if (msg.type === 'agent') {
+            addMessage('bot', msg.content);
+        }
+    });
+}
+
+function addMessage(type, content) {
+    const messagesContainer = document.getElementById('chatMessages');
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message ${type}`;
+
+    const now = new Date();
+    const timeString = now.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+
+    // Personalize greeting messages
+    if (type === 'bot' && content.toLowerCase().includes('welcome')) {
+        const displayName = userName || guestName;
+        if (displayName && !content.toLowerCase().includes('hello ' + displayName.toLowerCase())) {
+            content = `Hello ${displayName}! ` + content;
+        }
+    }
+
+    messageDiv.innerHTML = `
+        <div class="message-content">
+            ${content}
+            <div class="message-time">${timeString}</div>
+        </div>
+    `;
+
+    messagesContainer.appendChild(messageDiv);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+}
+
+function showTyping() {
+    const typingIndicator = document.getElementById('typingIndicator');
+    const messagesContainer = document.getElementById('chatMessages');
+
+    typingIndicator.style.display = 'block';
+    messagesContainer.appendChild(typingIndicator);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+}
+
+function hideTyping() {
+    const typingIndicator = document.getElementById('typingIndicator');
+    typingIndicator.style.display = 'none';
+}
+
+function updateSuggestions(actions) {
+    const suggestionsMap = {
+        'show_more_products': 'Show me more products',
+        'show_popular_products': 'Show popular products',
+        'browse_products': 'Browse all products',
+        'browse_categories': 'Browse by category',
+        'ask_services': 'What services do you offer?',
+        'ask_hours': 'What are your business hours?',
+        'ask_location': 'Where are you located?',
+        'get_quote': 'Can I get a quote?',
+        'get_bulk_quote': 'Get bulk pricing quote',
+        'contact_sales': 'Contact sales team',
+        'contact_support': 'Contact customer support',
+        'call_company': 'How can I contact you?',
+        'check_availability': 'Check product availability',
+        'ask_human_help': 'I need to speak to someone'
+    };
+
+    const suggestionsContainer = document.querySelector('.suggestion-buttons');
+    suggestionsContainer.innerHTML = '';
+
+    actions.slice(0, 4).forEach(action => {
+        if (suggestionsMap[action]) {
+            const button = document.createElement('button');
+            button.className = 'suggestion-btn';
+            button.textContent = suggestionsMap[action];
+            button.onclick = () => sendSuggestion(suggestionsMap[action]);
+            suggestionsContainer.appendChild(button);
+        }
+    });
+}
+
+function showFeedback() {
+    const feedbackSection = document.getElementById('feedbackSection');
+    feedbackSection.classList.add('show');
+}
+
+function hideFeedback() {
+    const feedbackSection = document.getElementById('feedbackSection');
+    feedbackSection.classList.remove('show');
+}
+
+// Rating system
+document.querySelectorAll('.star').forEach(star => {
+    star.addEventListener('click', function() {
+        selectedRating = parseInt(this.dataset.rating);
+        updateStars();
+    });
+
+    star.addEventListener('mouseover', function() {
+        const rating = parseInt(this.dataset.rating);
+        updateStars(rating);
+    });
+});
+
+document.getElementById('ratingStars').addEventListener('mouseleave', function() {
+    updateStars(selectedRating);
+});
+
+function updateStars(rating = selectedRating) {
+    document.querySelectorAll('.star').forEach((star, index) => {
+        if (index < rating) {
+            star.classList.add('active');
+        } else {
+            star.classList.remove('active');
+        }
+    });
+}
+
+async function submitFeedback() {
+    const feedback = document.getElementById('feedbackInput').value;
+
+    try {
+        const response = await fetch('/chatbot/feedback/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({
+                session_id: sessionId,
+                rating: selectedRating,
+                feedback: feedback,
+                was_helpful: selectedRating >= 3
+            })
+        });
+
+        const data = await response.json();
+
+        if (data.status === 'success') {
+            addMessage('system', 'Thank you for your feedback! We really appreciate it.');
+        }
+    } catch (error) {
+        console.error('Feedback error:', error);
+    }
+
+    hideFeedback();
+}
+
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+function showAuthPrompt() {
+    const authPrompt = document.createElement('div');
+    authPrompt.className = 'auth-prompt';
+    authPrompt.id = 'authPrompt';
+    authPrompt.innerHTML = `
+        <h4>Welcome to Riverway Company! To provide better assistance, may I know your name?</h4>
+        <input type="text" class="auth-input" id="guestNameInput" placeholder="Enter your first name" maxlength="50">
+        <div class="auth-buttons">
+            <button class="auth-btn primary" onclick="setGuestName()">Continue</button>
+            <button class="auth-btn secondary" onclick="skipAuth()">Skip</button>
+        </div>
+    `;
+
+    const messagesContainer = document.getElementById('chatMessages');
+    messagesContainer.insertBefore(authPrompt, messagesContainer.firstChild);
+    document.getElementById('guestNameInput').focus();
+}
+
+function setGuestName() {
+    const nameInput = document.getElementById('guestNameInput');
+    const name = nameInput.value.trim();
+
+    if (name.length < 1) {
+        alert('Please enter your name or click Skip');
+        return;
+    }
+
+    guestName = name;
+    localStorage.setItem('guestName', guestName);
+
+    // Remove auth prompt
+    const authPrompt = document.getElementById('authPrompt');
+    if (authPrompt) {
+        authPrompt.remove();
+    }
+
+    // Show greeting with name
+    const greeting = document.createElement('div');
+    greeting.className = 'user-greeting';
+    greeting.innerHTML = `Nice to meet you, ${guestName}! I'm here to help you with our products and services.`;
+
+    const messagesContainer = document.getElementById('chatMessages');
+    messagesContainer.insertBefore(greeting, messagesContainer.children[0]);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+    document.getElementById('messageInput').focus();
+}
+
+function skipAuth() {
+    const authPrompt = document.getElementById('authPrompt');
+    if (authPrompt) {
+        authPrompt.remove();
+    }
+    document.getElementById('messageInput').focus();
+}
+
+function displayProducts(products) {
+    if (!products || products.length === 0) return;
+
+    const productGrid = document.createElement('div');
+    productGrid.className = 'product-grid';
+
+    products.slice(0, 6).forEach(product => {
+        const productCard = document.createElement('div');
+        productCard.className = 'product-card';
+        productCard.onclick = () => sendSuggestion(`Tell me more about ${product.name}`);
+
+        const imageUrl = product.image_url || '/static/images/no-product.png';
+        const stockStatus = product.stock_quantity > 0 ? `${product.stock_quantity} in stock` : 'Out of stock';
+        const stockColor = product.stock_quantity > 0 ? '#28a745' : '#dc3545';
+
+        // Generate star rating display
+        const rating = parseFloat(product.rating) || 0;
+        const ratingCount = product.rating_count || 0;
+        let starsHtml = '';
+        for (let i = 1; i <= 5; i++) {
+            if (i <= rating) {
+                starsHtml += '<span style="color: #ffc107;">★</span>';
+            } else if (i - 0.5 <= rating) {
+                starsHtml += '<span style="color: #ffc107;">☆</span>';
+            } else {
+                starsHtml += '<span style="color: #ddd;">☆</span>';
+            }
+        }
+        const ratingText = ratingCount > 0 ? `${rating.toFixed(1)} (${ratingCount})` : 'No ratings';
+
+        productCard.innerHTML = `
+            <img src="${imageUrl}" alt="${product.name}" class="product-image" onerror="this.src='/static/images/no-product.png'">
+            <div class="product-name">${product.name}</div>
+            <div class="product-price">₵${parseFloat(product.price).toFixed(2)}/${product.unit}</div>
+            <div class="product-rating" style="font-size: 10px; margin: 2px 0;">
+                ${starsHtml}
+                <div style="color: #666; font-size: 9px;">${ratingText}</div>
+            </div>
+            <div class="product-stock" style="color: ${stockColor}">${stockStatus}</div>
+        `;
+
+        productGrid.appendChild(productCard);
+    });
+
+    const messagesContainer = document.getElementById('chatMessages');
+    messagesContainer.appendChild(productGrid);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+}
+
+// Handle Enter key in guest name input
+document.addEventListener('keypress', function(event) {
+    if (event.target.id === 'guestNameInput' && event.key === 'Enter') {
+        setGuestName();
+    }
+});
+
+// Auto-focus input and add intelligent message suggestions
+document.getElementById('messageInput').focus();
+
+// Add intelligent input suggestions
+const inputSuggestions = [
+    'Show me your products',
+    'What products do you have?',
+    'I need cement and steel',
+    'What are your prices?',
+    'Do you deliver?',
+    'What are your business hours?',
+    'Where are you located?'
+];
+
+let suggestionIndex = 0;
+const messageInput = document.getElementById('messageInput');
+
+// Cycle through placeholder suggestions every 3 seconds
+setInterval(() => {
+    if (!messageInput.value && document.activeElement !== messageInput) {
+        messageInput.placeholder = inputSuggestions[suggestionIndex];
+        suggestionIndex = (suggestionIndex + 1) % inputSuggestions.length;
+    }
+}, 3000);
+
+// Reset placeholder when focused
+messageInput.addEventListener('focus', () => {
+    messageInput.placeholder = 'Type your message...';
+});
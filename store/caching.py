@@ -0,0 +1,71 @@
+"""
+Versioned cache for the public catalog pages.
+
+The storefront's product and category queries, and the fragments rendered
+from them (product cards, category navigation), are cached under the
+current catalog version. Every change to a Product or Category (saves,
+deletes, bulk imports and edits, new image derivatives) bumps the version
+once its transaction has committed, which orphans every entry at once:
+invalidation is a single ``incr`` and nothing stale is ever served. Orphaned
+entries simply expire after CATALOG_CACHE_TIMEOUT.
+
+Views read the version once per request and hand it to templates as
+``catalog_version`` for ``{% cache %}``. Cached fragments must not contain
+per-visitor markup such as ``{% csrf_token %}``.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'catalog:version'
+
+
+def timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 3600)
+
+
+def version():
+    """The current catalog version"""
+    current = cache.get(VERSION_KEY)
+    if current is None:
+        # Start from the clock, so a version lost from the cache never comes
+        # back with a number whose entries may still be cached
+        cache.add(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        current = cache.get(VERSION_KEY, time.time_ns() // 1000)
+    return current
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Nothing cached under any version yet
+        version()
+
+
+def bump():
+    """Invalidate every cached catalog query and fragment once the transaction commits"""
+    transaction.on_commit(_bump)
+
+
+def cached(catalog_version, name, compute, *parts):
+    """Return ``compute()`` cached for this catalog version, ``name`` and ``parts``
+
+    ``compute`` must return something picklable and already evaluated (a list,
+    not a QuerySet).
+    """
+    digest = hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+    key = f'catalog:{catalog_version}:{name}:{digest}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, timeout())
+    return value
+
+
+def template_context(catalog_version):
+    return {'catalog_version': catalog_version, 'catalog_cache_timeout': timeout()}
@@ -0,0 +1,347 @@
+"""
+Bulk catalog import.
+
+Reads products from CSV, a JSON array or NDJSON, validates every row in one
+streaming pass and upserts them by ``sku`` in chunks of CHUNK_SIZE: one
+``bulk_create(update_conflicts=True)`` per chunk where the database supports
+it, otherwise a ``bulk_create`` of new products plus a ``bulk_update`` of
+existing ones. Only the columns present in the file are updated on existing
+products, so a file of ``sku,price,stock_quantity`` is a price and stock
+update. Categories are matched by name and created when missing.
+
+Invalid rows are skipped and reported with their line number; valid rows
+are imported either way.
+
+``bulk_edit`` applies grid edits of price, stock and status from the
+dashboard in one transaction, skipping products changed by someone else
+since the grid was loaded (their ``updated_at`` no longer matches).
+
+Bulk writes bypass the product signals, so both send one
+``products_changed`` signal per batch; its receivers re-check stock levels
+and refresh the product metrics.
+"""
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Product
+from .signals import products_changed
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+# Columns that may appear in an import; ``category`` is a category name
+COLUMNS = [
+    'sku', 'name', 'category', 'description', 'price', 'unit', 'stock_quantity',
+    'low_stock_threshold', 'specifications', 'is_active',
+]
+# Columns a product needs when it is not in the catalog yet
+REQUIRED_FOR_NEW = ['name', 'category', 'price']
+# Columns the dashboard grid edits
+EDITABLE_COLUMNS = ['price', 'stock_quantity', 'is_active']
+
+UNITS = {code for code, _ in Product.UNIT_CHOICES}
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'active'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'inactive'}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)  # (line, sku, message)
+
+    @property
+    def imported(self):
+        return self.created + self.updated
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(filename):
+    name = filename.lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if name.endswith('.json'):
+        return 'json'
+    return 'csv'
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line, row dict)`` from a text stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key.strip().lower(): value for key, value in row.items() if key}
+    elif fmt == 'ndjson':
+        for line, text in enumerate(stream, start=1):
+            if text.strip():
+                yield line, _json_row(text)
+    elif fmt == 'json':
+        # A JSON array has to be parsed whole; use NDJSON for huge catalogs
+        for index, row in enumerate(json.load(stream), start=1):
+            yield index, row
+    else:
+        raise ValueError(f'Unknown catalog format: {fmt}')
+
+
+def _json_row(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        return {'_error': f'invalid JSON: {e}'}
+
+
+def clean_row(row):
+    """Validate and convert one row. Returns a dict of the columns present"""
+    if not isinstance(row, dict):
+        raise RowError('expected an object')
+    if row.get('_error'):
+        raise RowError(row['_error'])
+
+    cleaned = {}
+    for column in COLUMNS:
+        if column not in row or row[column] is None:
+            continue
+        value = row[column].strip() if isinstance(row[column], str) else row[column]
+        if value == '' and column not in ('description', 'low_stock_threshold', 'specifications'):
+            continue
+        cleaned[column] = _clean_value(column, value)
+
+    if not cleaned.get('sku'):
+        raise RowError('sku is required')
+    if len(cleaned['sku']) > 50:
+        raise RowError('sku is longer than 50 characters')
+    if len(cleaned.get('name', '')) > 200:
+        raise RowError('name is longer than 200 characters')
+    return cleaned
+
+
+def _clean_value(column, value):
+    if column == 'price':
+        try:
+            price = Decimal(str(value)).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise RowError(f'invalid price: {value}')
+        if price < 0 or price >= Decimal('100000000'):
+            raise RowError(f'price out of range: {value}')
+        return price
+    if column in ('stock_quantity', 'low_stock_threshold'):
+        if value == '':
+            return None
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise RowError(f'invalid {column}: {value}')
+        if number < 0:
+            raise RowError(f'{column} cannot be negative')
+        return number
+    if column == 'unit':
+        unit = str(value).lower()
+        if unit not in UNITS:
+            raise RowError(f'unknown unit: {value}')
+        return unit
+    if column == 'is_active':
+        if isinstance(value, bool):
+            return value
+        flag = str(value).lower()
+        if flag not in TRUE_VALUES | FALSE_VALUES:
+            raise RowError(f'invalid is_active: {value}')
+        return flag in TRUE_VALUES
+    if column == 'specifications':
+        if isinstance(value, dict):
+            return value
+        if value == '':
+            return {}
+        try:
+            specifications = json.loads(value)
+        except json.JSONDecodeError:
+            raise RowError('specifications must be a JSON object')
+        if not isinstance(specifications, dict):
+            raise RowError('specifications must be a JSON object')
+        return specifications
+    return str(value)
+
+
+def import_catalog(rows, dry_run=False):
+    """Validate and upsert ``(line, row)`` pairs. Returns an ImportResult"""
+    result = ImportResult()
+    categories = {}
+    seen = {}
+    chunk = []
+
+    for line, row in rows:
+        try:
+            cleaned = clean_row(row)
+        except RowError as e:
+            sku = row.get('sku', '') if isinstance(row, dict) else ''
+            result.errors.append((line, sku, str(e)))
+            continue
+        if cleaned['sku'] in seen:
+            result.errors.append((line, cleaned['sku'], f'duplicate sku (first seen on line {seen[cleaned["sku"]]})'))
+            continue
+        seen[cleaned['sku']] = line
+        chunk.append((line, cleaned))
+        if len(chunk) >= CHUNK_SIZE:
+            _import_chunk(chunk, categories, result, dry_run)
+            chunk = []
+    if chunk:
+        _import_chunk(chunk, categories, result, dry_run)
+
+    logger.info(
+        f"Catalog import{' (dry run)' if dry_run else ''}: {result.created} created, "
+        f"{result.updated} updated, {len(result.errors)} errors"
+    )
+    return result
+
+
+def import_file(fileobj, fmt='csv', dry_run=False):
+    """Import an uploaded or opened binary file"""
+    stream = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        return import_catalog(read_rows(stream, fmt), dry_run=dry_run)
+    finally:
+        stream.detach()
+
+
+def _import_chunk(chunk, categories, result, dry_run):
+    existing = dict(Product.objects.filter(
+        sku__in=[cleaned['sku'] for _, cleaned in chunk]
+    ).values_list('sku', 'pk'))
+
+    rows = []
+    for line, cleaned in chunk:
+        if cleaned['sku'] not in existing:
+            missing = [column for column in REQUIRED_FOR_NEW if column not in cleaned]
+            if missing:
+                result.errors.append((line, cleaned['sku'], f'new product needs {", ".join(missing)}'))
+                continue
+        rows.append(cleaned)
+    if not rows:
+        return
+
+    created = sum(1 for cleaned in rows if cleaned['sku'] not in existing)
+    if dry_run:
+        result.created += created
+        result.updated += len(rows) - created
+        return
+
+    with transaction.atomic():
+        _resolve_categories(rows, categories)
+        # Rows are written in groups with the same columns, so a blank cell
+        # never overwrites a stored value with a default
+        groups = {}
+        for cleaned in rows:
+            groups.setdefault(frozenset(cleaned) - {'sku'}, []).append(cleaned)
+        for columns, group in groups.items():
+            _write_group(group, sorted(columns), existing)
+
+        products_changed.send(
+            sender=Product, products=[Product(sku=cleaned['sku']) for cleaned in rows],
+            fields=sorted(set().union(*groups)),
+        )
+
+    result.created += created
+    result.updated += len(rows) - created
+
+
+def bulk_edit(changes):
+    """Apply ``{sku, updated_at, price?, stock_quantity?, is_active?}`` edits
+
+    ``updated_at`` is the product's timestamp as the editor last saw it.
+    Returns ``(updated, skipped)``: the products changed, and a dict mapping
+    the SKUs that were not changed to the reason.
+    """
+    edits = {}
+    skipped = {}
+    for change in changes:
+        sku = str(change.get('sku') or '').strip()
+        try:
+            values = {
+                column: _clean_value(column, change[column])
+                for column in EDITABLE_COLUMNS if change.get(column) not in (None, '')
+            }
+        except RowError as e:
+            skipped[sku] = str(e)
+            continue
+        seen = parse_datetime(str(change.get('updated_at') or ''))
+        if not sku or seen is None:
+            skipped[sku] = 'sku and updated_at are required'
+        elif sku in edits:
+            skipped[sku] = 'listed more than once'
+        else:
+            edits[sku] = (seen, values)
+
+    updated = []
+    with transaction.atomic():
+        # Locked, so nobody can change a product between the check and the write
+        products = list(Product.objects.select_for_update().filter(sku__in=edits))
+        now = timezone.now()
+        for product in products:
+            seen, values = edits[product.sku]
+            if product.updated_at != seen:
+                skipped[product.sku] = 'changed by someone else since it was loaded'
+                continue
+            for column, value in values.items():
+                setattr(product, column, value)
+            product.updated_at = now
+            updated.append(product)
+        skipped.update({sku: 'not found' for sku in edits.keys() - {product.sku for product in products}})
+
+        Product.objects.bulk_update(updated, EDITABLE_COLUMNS + ['updated_at'], batch_size=500)
+        if updated:
+            products_changed.send(sender=Product, products=updated, fields=EDITABLE_COLUMNS)
+
+    logger.info(f"Bulk product edit: {len(updated)} updated, {len(skipped)} skipped")
+    return updated, skipped
+
+
+def _write_group(group, columns, existing):
+    products = [_build_product(cleaned) for cleaned in group]
+    update_fields = columns + ['updated_at']
+
+    # Upserting inserts a full row, so only rows carrying every required
+    # column can take that path; partial rows update existing products
+    complete = set(REQUIRED_FOR_NEW) <= set(columns)
+    if complete and connection.features.supports_update_conflicts_with_target:
+        Product.objects.bulk_create(
+            products, update_conflicts=True, unique_fields=['sku'], update_fields=update_fields
+        )
+        return
+
+    for product in products:
+        product.pk = existing.get(product.sku)
+    Product.objects.bulk_create([product for product in products if product.pk is None])
+    Product.objects.bulk_update([product for product in products if product.pk is not None], update_fields)
+
+
+def _resolve_categories(rows, categories):
+    """Replace category names with Category objects, creating missing ones"""
+    names = {cleaned['category'] for cleaned in rows if 'category' in cleaned} - set(categories)
+    if names:
+        for category in Category.objects.filter(name__in=names).order_by('pk'):
+            categories.setdefault(category.name, category)
+        missing = [Category(name=name) for name in sorted(names - set(categories))]
+        for category in Category.objects.bulk_create(missing):
+            categories[category.name] = category
+    for cleaned in rows:
+        if 'category' in cleaned:
+            cleaned['category'] = categories[cleaned['category']]
+
+
+def _build_product(cleaned):
+    # Rows only carry some columns; the others get the model defaults and are
+    # only written when the product is new
+    product = Product(**{'description': '', **cleaned})
+    product.updated_at = timezone.now()
+    return product
@@ -0,0 +1,101 @@
+"""
+Per-customer order summaries.
+
+CustomerSummary holds each customer's order count, lifetime value, average
+basket and first and last order dates, so customer and cohort metrics never
+have to group the whole order table. Whenever an order is created, changes
+status or is deleted, its customer's row is recomputed from their orders
+once the transaction commits. ``manage.py rebuild_customer_summaries``
+recomputes every row, e.g. after bulk updates that bypass model signals.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum, Avg, Min, Max, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Order, CustomerSummary
+
+# Lifetime value and average basket leave out cancelled orders
+PAID = ~Q(status='cancelled')
+
+
+def _totals():
+    return {
+        'order_count': Count('id'),
+        'lifetime_value': Sum('total_amount', filter=PAID),
+        'average_basket': Avg('total_amount', filter=PAID),
+        'first_order_at': Min('created_at'),
+        'last_order_at': Max('created_at'),
+    }
+
+
+def update_customer(user_id):
+    """Recompute one customer's summary from their orders"""
+    totals = Order.objects.filter(user_id=user_id).aggregate(**_totals())
+    if not totals['order_count']:
+        CustomerSummary.objects.filter(user_id=user_id).delete()
+        return None
+    totals['lifetime_value'] = totals['lifetime_value'] or 0
+    totals['average_basket'] = round(totals['average_basket'] or 0, 2)
+    summary, _ = CustomerSummary.objects.update_or_create(user_id=user_id, defaults=totals)
+    return summary
+
+
+def schedule_customer_update(user_id):
+    """Recompute a customer's summary once the current transaction commits"""
+    transaction.on_commit(lambda: update_customer(user_id))
+
+
+def schedule_customer_updates(user_ids):
+    """Recompute the summaries of several customers once, after commit"""
+    user_ids = set(user_ids)
+
+    def update():
+        for user_id in user_ids:
+            update_customer(user_id)
+
+    transaction.on_commit(update)
+
+
+def rebuild():
+    """Recompute every customer's summary. Returns the number of customers"""
+    rows = Order.objects.values('user_id').annotate(**_totals()).order_by()
+    summaries = [CustomerSummary(
+        user_id=row['user_id'],
+        order_count=row['order_count'],
+        lifetime_value=row['lifetime_value'] or 0,
+        average_basket=round(row['average_basket'] or 0, 2),
+        first_order_at=row['first_order_at'],
+        last_order_at=row['last_order_at'],
+    ) for row in rows]
+
+    with transaction.atomic():
+        CustomerSummary.objects.all().delete()
+        CustomerSummary.objects.bulk_create(summaries, batch_size=1000)
+    return len(summaries)
+
+
+def cohorts(months=6):
+    """Customers grouped by the month of their first order
+
+    Returns one dict per month, oldest first, with the number of customers
+    acquired, how many of them ordered again and their average lifetime value.
+    """
+    month = timezone.localdate().replace(day=1)
+    for _ in range(months - 1):
+        month = (month - timedelta(days=1)).replace(day=1)
+    rows = CustomerSummary.objects.filter(
+        first_order_at__gte=timezone.make_aware(datetime.combine(month, time.min))
+    ).annotate(cohort=TruncMonth('first_order_at')).values('cohort').annotate(
+        customers=Count('id'),
+        repeat_customers=Count('id', filter=Q(order_count__gt=1)),
+        average_lifetime_value=Avg('lifetime_value'),
+    ).order_by('cohort')
+    return [{
+        'month': row['cohort'].strftime('%b %Y'),
+        'customers': row['customers'],
+        'repeat_customers': row['repeat_customers'],
+        'average_lifetime_value': float(row['average_lifetime_value'] or 0),
+    } for row in rows]
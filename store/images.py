@@ -0,0 +1,135 @@
+"""
+Responsive image derivatives for product and category images.
+
+Uploads are served at full size, which dominates the weight of the catalog
+pages. When a new image is uploaded, a worker thread (off the request path)
+writes WebP copies of it at each of IMAGE_WIDTHS narrower than the original
+to ``<upload dir>/derivatives/`` and records them in the object's
+``image_variants`` as ``{width: storage name}``. Templates pick them up with
+the ``srcset`` and ``image_url`` filters of the ``store_images`` tag library,
+and chatbot product cards use the THUMBNAIL_WIDTH copy. Until the
+derivatives exist, the original image is served.
+
+Images stored before derivatives existed are converted with the
+``build_image_variants`` command.
+"""
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from . import caching
+
+logger = logging.getLogger(__name__)
+
+IMAGE_WIDTHS = (160, 320, 640, 1024)
+# Chatbot product cards are 80px wide; 160px covers high-density screens
+THUMBNAIL_WIDTH = 160
+WEBP_QUALITY = 80
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-derivatives')
+
+
+def derivative_name(name, width):
+    # Keep the source extension: drill.jpg and drill.png must not share copies
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, 'derivatives', f'{filename}-{width}w.webp')
+
+
+def build_variants(name, storage=default_storage):
+    """Write the WebP derivatives of a stored image. Returns ``{width: name}``"""
+    with storage.open(name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    # Every width below the original, plus one no wider than the original
+    # so small uploads still get a WebP copy
+    widths = sorted({width for width in IMAGE_WIDTHS if width < image.width} | {min(image.width, IMAGE_WIDTHS[-1])})
+    variants = {}
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        buffer = BytesIO()
+        image.resize((width, height), Image.Resampling.LANCZOS).save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+        target = derivative_name(name, width)
+        storage.delete(target)
+        variants[str(width)] = storage.save(target, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def generate_variants(model, pk):
+    """Worker entry point: build and record the derivatives of one object's image
+
+    Returns whether derivatives were recorded.
+    """
+    try:
+        obj = model.objects.filter(pk=pk).first()
+        if obj is None or not obj.image:
+            return False
+        variants = build_variants(obj.image.name)
+        # Only record them if the image wasn't replaced in the meantime;
+        # update() also leaves updated_at alone
+        if not model.objects.filter(pk=pk, image=obj.image.name).update(image_variants=variants):
+            delete_variants(variants)
+            return False
+        # Copies from a previous build under other names (rebuilds with --force)
+        delete_variants({
+            width: name for width, name in obj.image_variants.items() if name not in variants.values()
+        })
+        # The cached catalog pages still list the full-size image
+        caching.bump()
+        return True
+    except Exception as e:
+        logger.error(f"Error building image derivatives for {model.__name__} {pk}: {e}")
+        return False
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(instance):
+    """Build the derivatives of ``instance.image`` once the transaction commits"""
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(lambda: _executor.submit(generate_variants, model, pk))
+
+
+def delete_variants(variants):
+    for name in variants.values():
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Could not delete image derivative {name}: {e}")
+
+
+def variant_url(name, variants, width=None):
+    """URL of the narrowest derivative at least ``width`` wide
+
+    Falls back to the widest derivative, and to the original image when no
+    ``width`` is given or there are no derivatives yet.
+    """
+    if not name:
+        return None
+    if width is None or not variants:
+        return default_storage.url(name)
+    widths = sorted(variants, key=int)
+    chosen = next((w for w in widths if int(w) >= width), widths[-1])
+    return default_storage.url(variants[chosen])
+
+
+def image_url(obj, width=None):
+    return variant_url(obj.image.name if obj.image else None, obj.image_variants, width)
+
+
+def srcset(obj):
+    """``srcset`` value listing every derivative of the object's image"""
+    if not obj.image or not obj.image_variants:
+        return ''
+    return ', '.join(
+        f'{default_storage.url(name)} {width}w'
+        for width, name in sorted(obj.image_variants.items(), key=lambda item: int(item[0]))
+    )
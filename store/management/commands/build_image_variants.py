@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from store.images import generate_variants
+from store.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = 'Build the responsive WebP copies of product and category images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild images that already have derivatives')
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        for model in (Category, Product):
+            images = model.objects.exclude(image='').exclude(image__isnull=True)
+            if not options['force']:
+                images = images.filter(image_variants={})
+            for pk in list(images.values_list('pk', flat=True)):
+                if generate_variants(model, pk):
+                    built += 1
+                else:
+                    failed += 1
+        self.stdout.write(self.style.SUCCESS(f'Built image derivatives for {built} image(s)'))
+        if failed:
+            self.stderr.write(f'{failed} image(s) could not be converted; see the log for details')
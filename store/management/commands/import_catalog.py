@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from store.catalog import detect_format, import_file
+
+# Row errors printed before the rest are summarized
+MAX_ERRORS_SHOWN = 50
+
+
+class Command(BaseCommand):
+    help = 'Create or update products by SKU from a CSV, JSON or NDJSON catalog file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file')
+        parser.add_argument(
+            '--format', choices=['csv', 'json', 'ndjson'],
+            help='File format (default: from the file extension)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without saving anything')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'No such file: {path}')
+
+        with path.open('rb') as fileobj:
+            try:
+                result = import_file(fileobj, options['format'] or detect_format(path.name), dry_run=options['dry_run'])
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise CommandError(f'Could not read {path}: {e}')
+
+        for line, sku, message in result.errors[:MAX_ERRORS_SHOWN]:
+            self.stderr.write(f'Line {line}{f" ({sku})" if sku else ""}: {message}')
+        if len(result.errors) > MAX_ERRORS_SHOWN:
+            self.stderr.write(f'... and {len(result.errors) - MAX_ERRORS_SHOWN} more errors')
+
+        prefix = 'Dry run: would have ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}created {result.created} and updated {result.updated} product(s); '
+            f'{len(result.errors)} row(s) skipped'
+        ))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from store.models import Category, Product
+from store.catalog import import_catalog
+from store.models import Category
 
 
 class Command(BaseCommand):
@@ -8,10 +9,8 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         with transaction.atomic():
-            # Clear existing data
-            self.stdout.write(self.style.WARNING('Clearing existing products and categories...'))
-            Product.objects.all().delete()
-            Category.objects.all().delete()
+            # Existing products are updated in place by SKU, so orders that
+            # reference them are kept
             
             # Create categories
             self.stdout.write(self.style.SUCCESS('Creating categories...'))
@@ -36,9 +35,11 @@ class Command(BaseCommand):
             
             category_objects = []
             for cat_data in categories:
-                category = Category.objects.create(**cat_data)
+                category, created = Category.objects.update_or_create(
+                    name=cat_data['name'], defaults={'description': cat_data['description']}
+                )
                 category_objects.append(category)
-                self.stdout.write(f"Created category: {category.name}")
+                self.stdout.write(f"{'Created' if created else 'Updated'} category: {category.name}")
             
             # Create products
             self.stdout.write(self.style.SUCCESS('Creating products...'))
@@ -283,13 +284,15 @@ class Command(BaseCommand):
                 (category_objects[3], lighting_products),
             ]
             
-            product_count = 0
-            for category, products in all_products:
-                for product_data in products:
-                    product_data['category'] = category
-                    product = Product.objects.create(**product_data)
-                    product_count += 1
-                    self.stdout.write(f"Created product: {product.name}")
+            rows = [
+                {**product_data, 'category': category.name}
+                for category, products in all_products
+                for product_data in products
+            ]
+            result = import_catalog(enumerate(rows, start=1))
+            for line, sku, message in result.errors:
+                self.stderr.write(f"Product {sku}: {message}")
+            product_count = result.imported
             
             self.stdout.write(
                 self.style.SUCCESS(
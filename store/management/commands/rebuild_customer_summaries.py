@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from store.customers import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-customer order summaries behind the customer insights'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt order summaries for {count} customer(s)'))
@@ -0,0 +1,28 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from store.sales import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily, per-category and per-product sales rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date', action='append', default=[],
+            help='Recompute a specific day (YYYY-MM-DD); may be repeated (default: every day with orders)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            days = sorted({date.fromisoformat(value) for value in options['date']}) or None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        days = rebuild(days)
+
+        if days:
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt sales rollups for {len(days)} day(s): {days[0]} to {days[-1]}'
+            ))
+        else:
+            self.stdout.write('No orders to roll up')
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:57
+
+import django.db.models.deletion
+from collections import defaultdict
+from decimal import Decimal
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_sales_rollups(apps, schema_editor):
+    """Fill the rollups from existing orders (same figures as store.sales)"""
+    Order = apps.get_model('store', 'Order')
+    OrderItem = apps.get_model('store', 'OrderItem')
+    DailySales = apps.get_model('store', 'DailySales')
+    CategorySales = apps.get_model('store', 'CategorySales')
+    ProductSales = apps.get_model('store', 'ProductSales')
+
+    daily = defaultdict(lambda: {'order_count': 0, 'revenue': Decimal(0), 'delivered_count': 0, 'delivered_revenue': Decimal(0)})
+    for created_at, status, amount in Order.objects.values_list('created_at', 'status', 'total_amount').iterator():
+        totals = daily[timezone.localdate(created_at)]
+        totals['order_count'] += 1
+        totals['revenue'] += amount
+        if status == 'delivered':
+            totals['delivered_count'] += 1
+            totals['delivered_revenue'] += amount
+    DailySales.objects.bulk_create([DailySales(date=day, **totals) for day, totals in daily.items()])
+
+    products = defaultdict(lambda: [0, Decimal(0)])
+    categories = defaultdict(lambda: [0, Decimal(0)])
+    for created_at, product_id, category_id, quantity, price in OrderItem.objects.filter(
+        order__status='delivered'
+    ).values_list('order__created_at', 'product_id', 'product__category_id', 'quantity', 'price').iterator():
+        day = timezone.localdate(created_at)
+        for key, rollup in (((day, product_id), products), ((day, category_id), categories)):
+            rollup[key][0] += quantity
+            rollup[key][1] += price * quantity
+    ProductSales.objects.bulk_create([
+        ProductSales(date=day, product_id=product_id, units_sold=units, revenue=revenue)
+        for (day, product_id), (units, revenue) in products.items()
+    ])
+    CategorySales.objects.bulk_create([
+        CategorySales(date=day, category_id=category_id, units_sold=units, revenue=revenue)
+        for (day, category_id), (units, revenue) in categories.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Total of all orders', max_digits=12)),
+                ('delivered_count', models.PositiveIntegerField(default=0)),
+                ('delivered_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategorySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='store.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Category sales',
+                'unique_together': {('date', 'category')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='store.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Product sales',
+                'unique_together': {('date', 'product')},
+            },
+        ),
+        migrations.RunPython(backfill_sales_rollups, migrations.RunPython.noop),
+    ]
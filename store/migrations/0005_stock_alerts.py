@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_existing_alerts(apps, schema_editor):
+    """Open alerts for products already low when alerts are introduced"""
+    Product = apps.get_model('store', 'Product')
+    StockAlert = apps.get_model('store', 'StockAlert')
+    threshold = getattr(settings, 'LOW_STOCK_THRESHOLD', 10)
+    StockAlert.objects.bulk_create([
+        StockAlert(product_id=pk, threshold=threshold, stock_quantity=stock)
+        for pk, stock in Product.objects.filter(
+            is_active=True, stock_quantity__lte=threshold
+        ).values_list('pk', 'stock_quantity')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(blank=True, help_text='Stock level that raises a low-stock alert for products in this category (default: LOW_STOCK_THRESHOLD)', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(blank=True, help_text='Overrides the category threshold for this product', null=True),
+        ),
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.PositiveIntegerField()),
+                ('stock_quantity', models.PositiveIntegerField(help_text='Stock level when the alert was raised')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='store.product')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('product',), name='stockalert_one_open_per_product')],
+            },
+        ),
+        migrations.RunPython(open_existing_alerts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum, Avg, Min, Max, Q
+
+
+def backfill_customer_summaries(apps, schema_editor):
+    """Fill the summaries from existing orders (same figures as store.customers)"""
+    Order = apps.get_model('store', 'Order')
+    CustomerSummary = apps.get_model('store', 'CustomerSummary')
+
+    paid = ~Q(status='cancelled')
+    rows = Order.objects.values('user_id').annotate(
+        order_count=Count('id'),
+        lifetime_value=Sum('total_amount', filter=paid),
+        average_basket=Avg('total_amount', filter=paid),
+        first_order_at=Min('created_at'),
+        last_order_at=Max('created_at'),
+    ).order_by()
+    CustomerSummary.objects.bulk_create([CustomerSummary(
+        user_id=row['user_id'],
+        order_count=row['order_count'],
+        lifetime_value=row['lifetime_value'] or 0,
+        average_basket=round(row['average_basket'] or 0, 2),
+        first_order_at=row['first_order_at'],
+        last_order_at=row['last_order_at'],
+    ) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0005_stock_alerts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('lifetime_value', models.DecimalField(decimal_places=2, default=0, help_text='Total of non-cancelled orders', max_digits=12)),
+                ('average_basket', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('first_order_at', models.DateTimeField()),
+                ('last_order_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='order_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Customer summaries',
+                'indexes': [models.Index(fields=['first_order_at'], name='customersummary_first_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_customer_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Lower
+
+
+def fill_search_names(apps, schema_editor):
+    Order = apps.get_model('store', 'Order')
+    User = apps.get_model('auth', 'User')
+    Order.objects.update(search_name=Subquery(
+        User.objects.filter(pk=OuterRef('user_id')).values(name=Lower('username'))[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_customer_summaries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, help_text='Lowercased customer username, kept in sync by signals for order search', max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['email'], name='order_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['search_name'], name='order_search_name_idx'),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:48
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def fill_search_emails(apps, schema_editor):
+    Order = apps.get_model('store', 'Order')
+    Order.objects.update(search_email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_email_idx',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='search_email',
+            field=models.CharField(blank=True, editable=False, help_text='Lowercased email, kept in sync by signals for order search', max_length=254),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['search_email'], name='order_search_email_idx'),
+        ),
+        migrations.RunPython(fill_search_emails, migrations.RunPython.noop),
+    ]
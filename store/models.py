@@ -7,6 +7,8 @@ class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Responsive WebP copies of the image by width (see store.images)")
+    low_stock_threshold = models.PositiveIntegerField(null=True, blank=True, help_text="Stock level that raises a low-stock alert for products in this category (default: LOW_STOCK_THRESHOLD)")
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -36,7 +38,9 @@ class Product(models.Model):
     unit = models.CharField(max_length=20, choices=UNIT_CHOICES, default='piece')
     sku = models.CharField(max_length=50, unique=True)
     stock_quantity = models.PositiveIntegerField(default=0)
+    low_stock_threshold = models.PositiveIntegerField(null=True, blank=True, help_text="Overrides the category threshold for this product")
     image = models.ImageField(upload_to='products/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Responsive WebP copies of the image by width (see store.images)")
     specifications = models.JSONField(default=dict, blank=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00, help_text="Product rating out of 5")
     rating_count = models.PositiveIntegerField(default=0, help_text="Number of ratings")
@@ -44,6 +48,17 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Partial indexes over active products only; the flag itself is
+            # too unselective to lead an index
+            models.Index(fields=['stock_quantity'], condition=models.Q(is_active=True), name='product_active_stock_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_active=True), name='product_active_created_idx'),
+            # Storefront sort orders, paginated by keyset (see store.pagination)
+            models.Index(fields=['price', 'id'], condition=models.Q(is_active=True), name='product_active_price_idx'),
+            models.Index(fields=['name', 'id'], condition=models.Q(is_active=True), name='product_active_name_idx'),
+        ]
+    
     def __str__(self):
         return self.name
     
@@ -57,7 +72,7 @@ class Product(models.Model):
 
 class Cart(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
-    session_key = models.CharField(max_length=40, null=True, blank=True)
+    session_key = models.CharField(max_length=40, null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -97,9 +112,19 @@ class Order(models.Model):
     billing_address = models.TextField()
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    search_name = models.CharField(max_length=150, blank=True, editable=False, help_text="Lowercased customer username, kept in sync by signals for order search")
+    search_email = models.CharField(max_length=254, blank=True, editable=False, help_text="Lowercased email, kept in sync by signals for order search")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            models.Index(fields=['search_email'], name='order_search_email_idx'),
+            models.Index(fields=['search_name'], name='order_search_name_idx'),
+        ]
+    
     def __str__(self):
         return f"Order #{self.id} - {self.user.username if self.user else self.email}"
 
@@ -112,3 +137,91 @@ class OrderItem(models.Model):
     
     def get_total_price(self):
         return self.quantity * self.price
+
+
+class StockAlert(models.Model):
+    """A product whose stock fell to its low-stock threshold
+
+    Raised and resolved by store.stock as stock changes; open alerts have no
+    resolved_at and there is at most one per product.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_alerts')
+    threshold = models.PositiveIntegerField()
+    stock_quantity = models.PositiveIntegerField(help_text="Stock level when the alert was raised")
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['product'], condition=models.Q(resolved_at__isnull=True), name='stockalert_one_open_per_product'),
+        ]
+    
+    def __str__(self):
+        return f"Low stock: {self.product} ({self.stock_quantity} <= {self.threshold})"
+
+
+class DailySales(models.Model):
+    """Order totals for one day, maintained by store.sales"""
+    date = models.DateField(unique=True)
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Total of all orders")
+    delivered_count = models.PositiveIntegerField(default=0)
+    delivered_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Daily sales"
+    
+    def __str__(self):
+        return f"Sales {self.date}"
+
+
+class CategorySales(models.Model):
+    """Delivered sales of one category on one day"""
+    date = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='sales_rollups')
+    units_sold = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        unique_together = ['date', 'category']
+        verbose_name_plural = "Category sales"
+    
+    def __str__(self):
+        return f"{self.category} sales {self.date}"
+
+
+class ProductSales(models.Model):
+    """Delivered sales of one product on one day"""
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='sales_rollups')
+    units_sold = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        unique_together = ['date', 'product']
+        verbose_name_plural = "Product sales"
+    
+    def __str__(self):
+        return f"{self.product} sales {self.date}"
+
+
+class CustomerSummary(models.Model):
+    """Order totals of one customer, maintained by store.customers"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='order_summary')
+    order_count = models.PositiveIntegerField(default=0)
+    lifetime_value = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Total of non-cancelled orders")
+    average_basket = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    first_order_at = models.DateTimeField()
+    last_order_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Customer summaries"
+        indexes = [
+            models.Index(fields=['first_order_at'], name='customersummary_first_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Summary for {self.user.username}"
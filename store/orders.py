@@ -0,0 +1,97 @@
+"""
+Bulk order status transitions.
+
+``bulk_transition`` moves many orders to a new status in one transaction:
+every order is checked against ALLOWED_TRANSITIONS, the valid ones are
+written with a single ``bulk_update``, and their customers' notifications
+are queued with a single ``bulk_create``. ``bulk_update`` bypasses the
+per-order model signals, so one ``order_statuses_changed`` signal is sent for
+the whole batch instead; its receivers apply the batch to the sales rollups
+and recompute each affected customer summary once.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order
+from .signals import order_statuses_changed
+
+logger = logging.getLogger(__name__)
+
+# Status -> statuses an order may move to from it
+ALLOWED_TRANSITIONS = {
+    'pending': {'processing', 'cancelled'},
+    'processing': {'shipped', 'cancelled'},
+    'shipped': {'delivered'},
+    'delivered': set(),
+    'cancelled': set(),
+}
+
+STATUS_MESSAGES = {
+    'processing': 'is being prepared',
+    'shipped': 'has been shipped and is on its way',
+    'delivered': 'has been delivered',
+    'cancelled': 'has been cancelled',
+}
+
+
+def parse_order_ids(lines):
+    """Order ids from CSV lines; the first column of each row, headers skipped"""
+    order_ids = []
+    for line in lines:
+        value = line.split(',', 1)[0].strip().lstrip('#')
+        if value.isdigit():
+            order_ids.append(int(value))
+    return order_ids
+
+
+def bulk_transition(order_ids, status, notify=True):
+    """Move the given orders to ``status``
+
+    Returns ``(updated, skipped)``: the orders changed, and a dict mapping the
+    ids that were not changed to the reason.
+    """
+    if status not in ALLOWED_TRANSITIONS:
+        raise ValueError(f'Unknown order status: {status}')
+
+    order_ids = set(order_ids)
+    skipped = {}
+    updated = []
+    with transaction.atomic():
+        orders = Order.objects.select_for_update().filter(pk__in=order_ids)
+        now = timezone.now()
+        for order in orders:
+            if status not in ALLOWED_TRANSITIONS[order.status]:
+                skipped[order.pk] = f'cannot move from {order.get_status_display()} to {status}'
+                continue
+            order.previous_status = order.status
+            order.status = status
+            order.updated_at = now
+            updated.append(order)
+        skipped.update({order_id: 'not found' for order_id in order_ids - {o.pk for o in orders}})
+
+        Order.objects.bulk_update(updated, ['status', 'updated_at'], batch_size=500)
+        if notify:
+            _queue_notifications(updated)
+        if updated:
+            order_statuses_changed.send(sender=Order, orders=updated, status=status)
+
+    logger.info(f"Bulk status update to {status}: {len(updated)} updated, {len(skipped)} skipped")
+    return updated, skipped
+
+
+def _queue_notifications(orders):
+    from chatbot.models import Notification
+
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=order.user_id,
+            notification_type='order_status',
+            channel='email',
+            recipient=order.email,
+            subject=f'Your Riverway order #{order.pk}',
+            message=f'Your order #{order.pk} {STATUS_MESSAGES[order.status]}.',
+        )
+        for order in orders
+    ], batch_size=500)
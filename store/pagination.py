@@ -0,0 +1,208 @@
+"""
+Keyset (seek) pagination for product and order listings.
+
+Django's Paginator counts the whole queryset on every page and skips rows
+with OFFSET, so deep pages get slower the further they are. KeysetPaginator
+instead continues from the sort key of the last row shown (``WHERE key <
+last_key ORDER BY key LIMIT n``), which costs the same on every page when
+the sort order is indexed.
+
+Pages are addressed by opaque, signed cursors passed in the usual ``page``
+query parameter, and the page objects mimic Django's ``Page`` so existing
+templates keep working. ``next_page_number``/``previous_page_number`` return
+cursors, plain page numbers still work (with OFFSET) for old links, and
+``page=last`` jumps to the end. The total count is taken once, on the page a
+visitor starts from, and carried in the cursors; it may drift while someone
+pages through a list that is changing.
+"""
+import math
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
+
+from django.core import signing
+from django.db.models import Q
+
+SALT = 'store.pagination'
+
+
+def _serialize(value):
+    # Full precision: a key rounded to milliseconds would skip or repeat rows
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPaginator:
+    def __init__(self, object_list, per_page, with_count=True):
+        ordering = [str(field) for field in object_list.query.order_by] or ['-pk']
+        # A unique tiebreaker makes every key distinct
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            ordering.append('-pk' if ordering[0].startswith('-') else 'pk')
+        self.object_list = object_list
+        self.per_page = per_page
+        self.ordering = ordering
+        self.with_count = with_count
+        self._count = None
+
+    def __getstate__(self):
+        # Pages are cached with their paginator (see store.views.product_list);
+        # pickling the queryset would fetch the whole listing. Take the count
+        # first: it can't be computed afterwards.
+        state = self.__dict__.copy()
+        state['object_list'] = None
+        return state
+
+    @property
+    def count(self):
+        if self._count is None and self.with_count:
+            self._count = self.object_list.count()
+        return self._count
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(1, math.ceil(self.count / self.per_page))
+
+    @property
+    def page_range(self):
+        # Only the current page can be linked to without an OFFSET
+        return range(self._number, self._number + 1)
+
+    def get_page(self, page):
+        """Return the page for a cursor, ``'last'``, a page number or nothing"""
+        page = str(page or '').strip()
+        if page == 'last':
+            return self._last_page()
+        if page.isdigit():
+            return self._numbered_page(max(int(page), 1))
+        cursor = self._decode(page)
+        if cursor is None:
+            return self._numbered_page(1)
+        self._count = cursor.get('c')
+        return self._seek(cursor['k'], cursor['d'] == 'p', cursor['n'])
+
+    # Fetching pages
+
+    def _field(self, field):
+        return field.lstrip('-')
+
+    def _key(self, obj):
+        return [getattr(obj, self._field(field)) for field in self.ordering]
+
+    def _after(self, key, reverse=False):
+        """Rows after ``key`` in the sort order (before it when ``reverse``)"""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith('-') != reverse
+            lookup = f'{self._field(field)}__{"lt" if descending else "gt"}'
+            step = Q(**{lookup: key[index]})
+            for previous, value in zip(self.ordering[:index], key):
+                step &= Q(**{self._field(previous): value})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def _seek(self, key, backwards, number):
+        if backwards:
+            rows = list(self.object_list.filter(self._after(key, reverse=True)).order_by(
+                *self._reversed_ordering()
+            )[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return self._page(rows, number, has_previous=has_more, has_next=True)
+
+        rows = list(self.object_list.filter(self._after(key)).order_by(*self.ordering)[:self.per_page + 1])
+        return self._page(rows[:self.per_page], number, has_previous=True, has_next=len(rows) > self.per_page)
+
+    def _numbered_page(self, number):
+        offset = (number - 1) * self.per_page
+        rows = list(self.object_list.order_by(*self.ordering)[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            return self._last_page()
+        return self._page(rows[:self.per_page], number, has_previous=number > 1, has_next=len(rows) > self.per_page)
+
+    def _last_page(self):
+        remainder = self.count % self.per_page if self.count else 0
+        rows = list(self.object_list.order_by(*self._reversed_ordering())[:remainder or self.per_page])
+        number = self.num_pages or 1
+        return self._page(rows[::-1], number, has_previous=number > 1, has_next=False)
+
+    def _page(self, rows, number, has_previous, has_next):
+        self._number = number
+        return KeysetPage(rows, number, self, has_previous, has_next)
+
+    # Cursors
+
+    def _signature(self):
+        return ','.join(self.ordering)
+
+    def _encode(self, key, backwards, number):
+        data = {
+            'o': self._signature(),
+            'k': [_serialize(value) for value in key],
+            'd': 'p' if backwards else 'n',
+            'n': number,
+            'c': self._count,
+        }
+        return signing.dumps(data, salt=SALT, compress=True)
+
+    def _decode(self, token):
+        if not token:
+            return None
+        try:
+            data = signing.loads(token, salt=SALT)
+        except signing.BadSignature:
+            return None
+        # Cursors from another sort order (e.g. a changed sort option) don't apply
+        if data.get('o') != self._signature():
+            return None
+        return data
+
+
+class KeysetPage(Sequence):
+    """A page of results with the interface of django.core.paginator.Page"""
+
+    def __init__(self, object_list, number, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_previous = has_previous and bool(object_list)
+        self._has_next = has_next and bool(object_list)
+
+    def __repr__(self):
+        return f'<Page {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def next_page_number(self):
+        """Cursor of the next page"""
+        return self.paginator._encode(self.paginator._key(self.object_list[-1]), False, self.number + 1)
+
+    def previous_page_number(self):
+        """Cursor of the previous page"""
+        return self.paginator._encode(self.paginator._key(self.object_list[0]), True, max(self.number - 1, 1))
+
+    def start_index(self):
+        return (self.number - 1) * self.paginator.per_page + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
@@ -0,0 +1,256 @@
+"""
+Daily sales rollups.
+
+DailySales, CategorySales and ProductSales hold per-day totals so revenue
+widgets never have to join orders and order items. Each order or item change
+adds its delta (the new figures minus what the row counted for before) to
+the rows of its day, product and category. Deltas are summed per row while
+the transaction is open and written once it commits, one ``F()`` update per
+row touched, so a checkout costs a few single-row updates however busy its
+day is. A failing write is logged rather than failing the order it follows.
+``manage.py rebuild_sales_rollups`` recomputes any or all days from scratch,
+e.g. after bulk updates that bypass model signals.
+"""
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum, Q, F, OuterRef, Subquery
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from chatbot.analytics import day_bounds
+from .models import Order, OrderItem, DailySales, CategorySales, ProductSales
+
+# Deltas waiting for the current transaction of this thread to commit
+_pending = threading.local()
+
+
+def rollup_day(day):
+    """Recompute all sales rollups of one day from orders and order items"""
+    start, end = day_bounds(day)
+    delivered = Q(status='delivered')
+    totals = Order.objects.filter(created_at__gte=start, created_at__lt=end).aggregate(
+        order_count=Count('id'),
+        revenue=Sum('total_amount'),
+        delivered_count=Count('id', filter=delivered),
+        delivered_revenue=Sum('total_amount', filter=delivered),
+    )
+
+    items = OrderItem.objects.filter(
+        order__created_at__gte=start, order__created_at__lt=end, order__status='delivered'
+    )
+    product_rows = items.values('product_id').annotate(
+        units=Sum('quantity'), revenue=Sum(F('price') * F('quantity'))
+    ).order_by()
+    category_rows = items.values('product__category_id').annotate(
+        units=Sum('quantity'), revenue=Sum(F('price') * F('quantity'))
+    ).order_by()
+
+    with transaction.atomic():
+        if totals['order_count']:
+            DailySales.objects.update_or_create(date=day, defaults={
+                key: value or 0 for key, value in totals.items()
+            })
+        else:
+            DailySales.objects.filter(date=day).delete()
+
+        # Upserted rather than deleted and re-inserted, so a checkout writing
+        # the same day meanwhile can't collide on the unique (date, ...) key
+        ProductSales.objects.bulk_create([
+            ProductSales(date=day, product_id=row['product_id'], units_sold=row['units'], revenue=row['revenue'])
+            for row in product_rows
+        ], update_conflicts=True, unique_fields=['date', 'product'], update_fields=['units_sold', 'revenue'])
+        ProductSales.objects.filter(date=day).exclude(
+            product_id__in=[row['product_id'] for row in product_rows]
+        ).delete()
+        CategorySales.objects.bulk_create([
+            CategorySales(date=day, category_id=row['product__category_id'], units_sold=row['units'], revenue=row['revenue'])
+            for row in category_rows
+        ], update_conflicts=True, unique_fields=['date', 'category'], update_fields=['units_sold', 'revenue'])
+        CategorySales.objects.filter(date=day).exclude(
+            category_id__in=[row['product__category_id'] for row in category_rows]
+        ).delete()
+
+
+SALES_FIELDS = {'status', 'total_amount', 'created_at'}
+ITEM_FIELDS = {'product', 'quantity', 'price'}
+
+
+def order_state(order):
+    """The stored figures an order counts for in the rollups, or None if new"""
+    if order._state.adding or order.pk is None:
+        return None
+    return Order.objects.filter(pk=order.pk).values('status', 'total_amount', 'created_at').first()
+
+
+def item_state(item):
+    """The stored figures an item counts for in the rollups, or None if new"""
+    if item._state.adding or item.pk is None:
+        return None
+    return OrderItem.objects.filter(pk=item.pk).values(
+        'product_id', 'quantity', 'price', category_id=F('product__category_id')
+    ).first()
+
+
+def record_order(order, previous=None, deleted=False):
+    """Move the order's day totals from ``previous`` (its stored figures) to its current ones
+
+    Entering or leaving the delivered status also moves its items in or out
+    of the product and category rollups. A deleted order's items are taken
+    out by their own deletion.
+    """
+    if deleted:
+        previous = previous or {'created_at': order.created_at, 'status': order.status, 'total_amount': order.total_amount}
+        _add_order(previous['created_at'], previous['status'], previous['total_amount'], -1)
+        return
+    if previous:
+        _add_order(previous['created_at'], previous['status'], previous['total_amount'], -1)
+    _add_order(order.created_at, order.status, order.total_amount, 1)
+
+    was_delivered = bool(previous) and previous['status'] == 'delivered'
+    is_delivered = order.status == 'delivered'
+    if was_delivered or is_delivered:
+        moved_day = was_delivered and is_delivered and previous['created_at'] != order.created_at
+        if was_delivered != is_delivered or moved_day:
+            rows = list(_item_rows([order.pk]))
+            if was_delivered:
+                _add_items(previous['created_at'], rows, -1)
+            if is_delivered:
+                _add_items(order.created_at, rows, 1)
+
+
+def record_status_changes(orders):
+    """Apply a batch of status changes; each order carries ``previous_status``"""
+    moved = [order for order in orders if (order.previous_status == 'delivered') != (order.status == 'delivered')]
+    rows = defaultdict(list)
+    for row in _item_rows([order.pk for order in moved]):
+        rows[row['order_id']].append(row)
+    for order in orders:
+        _add_order(order.created_at, order.previous_status, order.total_amount, -1)
+        _add_order(order.created_at, order.status, order.total_amount, 1)
+    for order in moved:
+        _add_items(order.created_at, rows[order.pk], 1 if order.status == 'delivered' else -1)
+
+
+def record_item(item, previous=None, deleted=False):
+    """Move a delivered order's item from ``previous`` (its stored figures) to its current ones
+
+    Items of orders that aren't delivered count for nothing; the order's own
+    delivery brings them in.
+    """
+    if item.order.status != 'delivered':
+        return
+    current = {
+        'product_id': item.product_id, 'category_id': item.product.category_id,
+        'quantity': item.quantity, 'price': item.price,
+    }
+    if deleted:
+        previous, current = current, None
+    if previous:
+        _add_items(item.order.created_at, [previous], -1)
+    if current:
+        _add_items(item.order.created_at, [current], 1)
+
+
+def _item_rows(order_ids):
+    if not order_ids:
+        return []
+    return OrderItem.objects.filter(order_id__in=order_ids).values(
+        'order_id', 'product_id', 'quantity', 'price', category_id=F('product__category_id')
+    )
+
+
+def _add_order(created_at, status, total_amount, sign):
+    delivered = sign if status == 'delivered' else 0
+    _add(DailySales, {'date': timezone.localdate(created_at)}, {
+        'order_count': sign,
+        'revenue': sign * total_amount,
+        'delivered_count': delivered,
+        'delivered_revenue': delivered * total_amount,
+    })
+
+
+def _add_items(created_at, rows, sign):
+    day = timezone.localdate(created_at)
+    for row in rows:
+        amounts = {'units_sold': sign * row['quantity'], 'revenue': sign * row['quantity'] * Decimal(row['price'])}
+        _add(ProductSales, {'date': day, 'product_id': row['product_id']}, amounts)
+        _add(CategorySales, {'date': day, 'category_id': row['category_id']}, amounts)
+
+
+def _add(model, key, amounts):
+    """Sum a delta into the rows waiting for the current transaction to commit"""
+    pending = getattr(_pending, 'deltas', None)
+    # A rolled-back transaction drops the queued callback with it
+    if pending is None or not any(
+        callback is _flush_deltas for _, callback, _ in transaction.get_connection().run_on_commit
+    ):
+        pending = _pending.deltas = defaultdict(lambda: defaultdict(int))
+        queued = True
+    else:
+        queued = False
+    row = pending[model, tuple(sorted(key.items()))]
+    for field, amount in amounts.items():
+        row[field] += amount
+    if queued:
+        # Outside a transaction this runs at once, so only after summing
+        transaction.on_commit(_flush_deltas, robust=True)
+
+
+def _flush_deltas():
+    deltas, _pending.deltas = _pending.deltas, None
+    with transaction.atomic():
+        for (model, key), amounts in deltas.items():
+            amounts = {field: amount for field, amount in amounts.items() if amount}
+            if amounts:
+                _apply(model, dict(key), amounts)
+
+
+def _apply(model, key, amounts):
+    """Add ``amounts`` to the row for ``key``, creating it if it doesn't exist yet"""
+    count_field = 'order_count' if model is DailySales else 'units_sold'
+    rows = model.objects.filter(**key)
+    changes = {field: F(field) + amount for field, amount in amounts.items()}
+    if model is DailySales:
+        changes['updated_at'] = timezone.now()
+    if not rows.update(**changes):
+        try:
+            with transaction.atomic():
+                model.objects.create(**key, **amounts)
+        except IntegrityError:
+            # Another transaction created the row in the meantime
+            rows.update(**changes)
+    if amounts.get(count_field, 0) < 0:
+        rows.filter(**{count_field: 0}).delete()
+
+
+def rebuild(days=None):
+    """Recompute the given days, or every day that has orders
+
+    Returns the days recomputed.
+    """
+    if days is None:
+        days = sorted(Order.objects.annotate(
+            day=TruncDate('created_at')
+        ).values_list('day', flat=True).distinct())
+        # Drop rollups of days that no longer have orders (e.g. deleted ones)
+        for model in (DailySales, ProductSales, CategorySales):
+            model.objects.exclude(date__in=days).delete()
+
+    for day in days:
+        rollup_day(day)
+    return days
+
+
+def category_revenue(since=None):
+    """Subquery summing a category's delivered revenue from the rollups
+
+    Annotate categories with it instead of joining the rollups, so it can sit
+    next to product counts without multiplying rows.
+    """
+    rollups = CategorySales.objects.filter(category=OuterRef('pk'))
+    if since:
+        rollups = rollups.filter(date__gte=since)
+    return Subquery(rollups.values('category').annotate(total=Sum('revenue')).values('total'))
@@ -0,0 +1,149 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import Signal, receiver
+from .models import Category, Product, Order, OrderItem
+from .sales import (
+    SALES_FIELDS, ITEM_FIELDS, order_state, item_state, record_order, record_status_changes, record_item,
+)
+from .customers import schedule_customer_update, schedule_customer_updates
+from .stock import check_stock, check_stock_levels
+from .images import delete_variants, schedule_variants
+from . import caching
+
+# Sent once for a batch of orders whose status was changed with
+# QuerySet/bulk updates (see store.orders); ``orders`` carry the new status
+# and ``previous_status``
+order_statuses_changed = Signal()
+
+# Sent once for a batch of products written with bulk_create/bulk_update (see
+# store.catalog); ``fields`` are the columns that were written
+products_changed = Signal()
+
+# Sent once for the low-stock alerts opened by a stock check (see
+# store.stock); ``alerts`` are saved with bulk_create, so no post_save is sent
+stock_alerts_opened = Signal()
+
+# Columns that can move a product across its low-stock threshold
+STOCK_FIELDS = {'stock_quantity', 'low_stock_threshold', 'is_active', 'category'}
+
+
+@receiver(pre_save, sender=Order)
+def set_order_search_name(sender, instance, **kwargs):
+    """Copy the customer's username and the email into the indexed order search columns"""
+    instance.search_name = instance.user.username.lower()
+    instance.search_email = instance.email.lower()
+
+
+@receiver(post_save, sender=User)
+def update_order_search_names(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login; only renames need the orders updated
+    if update_fields is None or 'username' in update_fields:
+        Order.objects.filter(user=instance).exclude(
+            search_name=instance.username.lower()
+        ).update(search_name=instance.username.lower())
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_sales(sender, instance, update_fields=None, **kwargs):
+    """Read the figures the order counted for in the sales rollups before this save"""
+    if update_fields is None or SALES_FIELDS & set(update_fields):
+        instance._sales_previous = order_state(instance)
+
+
+@receiver(post_save, sender=Order)
+def update_sales_for_order(sender, instance, **kwargs):
+    """Keep the sales rollups of the order's day and its customer's summary current"""
+    if hasattr(instance, '_sales_previous'):
+        record_order(instance, instance.__dict__.pop('_sales_previous'))
+    schedule_customer_update(instance.user_id)
+
+
+@receiver(pre_delete, sender=Order)
+def remember_deleted_order_sales(sender, instance, **kwargs):
+    # The instance may predate status changes made with bulk updates
+    instance._sales_previous = order_state(instance)
+
+
+@receiver(post_delete, sender=Order)
+def remove_sales_for_order(sender, instance, **kwargs):
+    record_order(instance, instance.__dict__.pop('_sales_previous', None), deleted=True)
+    schedule_customer_update(instance.user_id)
+
+
+@receiver(order_statuses_changed)
+def update_sales_for_orders(sender, orders, **kwargs):
+    """Apply a batch's status changes to the rollups and recompute each customer once"""
+    record_status_changes(orders)
+    schedule_customer_updates(order.user_id for order in orders)
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_order_item_sales(sender, instance, update_fields=None, **kwargs):
+    # Items only count towards the item-level rollups once delivered; the
+    # order's own save covers creation and status changes
+    if instance.order.status == 'delivered' and (update_fields is None or ITEM_FIELDS & set(update_fields)):
+        instance._sales_previous = item_state(instance)
+
+
+@receiver(post_save, sender=OrderItem)
+def update_sales_for_order_item(sender, instance, **kwargs):
+    if hasattr(instance, '_sales_previous'):
+        record_item(instance, instance.__dict__.pop('_sales_previous'))
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_sales_for_order_item(sender, instance, **kwargs):
+    record_item(instance, deleted=True)
+
+
+@receiver(post_save, sender=Product)
+def detect_low_stock(sender, instance, **kwargs):
+    """Raise or resolve the product's low-stock alert as its stock changes"""
+    check_stock(instance)
+
+
+@receiver(products_changed)
+def detect_low_stock_for_products(sender, products, fields, **kwargs):
+    """Re-check the low-stock state of a bulk-written batch once"""
+    if STOCK_FIELDS & set(fields):
+        check_stock_levels(Product.objects.filter(sku__in=[product.sku for product in products]))
+
+
+@receiver(post_save, sender=Category)
+def recheck_category_stock(sender, instance, created, **kwargs):
+    # The category threshold applies to every product without its own
+    if not created:
+        check_stock_levels(instance.products.filter(low_stock_threshold__isnull=True))
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Category)
+def reset_image_variants(sender, instance, **kwargs):
+    """Drop the derivatives of a replaced or removed image"""
+    image = instance.image
+    # A stored image that wasn't reassigned is committed and unchanged
+    instance._image_changed = bool(image) and not image._committed
+    if (instance._image_changed or not image) and instance.image_variants:
+        old_variants = instance.image_variants
+        instance.image_variants = {}
+        transaction.on_commit(lambda: delete_variants(old_variants))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+def build_image_variants(sender, instance, **kwargs):
+    if getattr(instance, '_image_changed', False):
+        schedule_variants(instance)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+def bump_catalog_version(sender, **kwargs):
+    """Orphan every cached catalog query and fragment"""
+    caching.bump()
+
+
+@receiver(products_changed)
+def bump_catalog_version_for_products(sender, **kwargs):
+    caching.bump()
@@ -0,0 +1,132 @@
+"""
+Low-stock detection on the write path.
+
+Whenever a product is saved its stock is compared with its threshold (the
+product's own, else its category's, else LOW_STOCK_THRESHOLD). Crossing the
+threshold opens a StockAlert and queues a staff Notification; restocking
+above it resolves the alert. The open alerts are the low-stock feed read by
+the dashboard, so nothing has to scan the catalogue.
+
+Code that changes stock with ``QuerySet.update()`` bypasses the model
+signals and must call ``check_stock_levels`` with the affected products.
+"""
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Product, StockAlert
+
+logger = logging.getLogger(__name__)
+
+# Products checked per round of queries in check_stock_levels
+BATCH_SIZE = 500
+
+
+def threshold_for(product):
+    if product.low_stock_threshold is not None:
+        return product.low_stock_threshold
+    if product.category.low_stock_threshold is not None:
+        return product.category.low_stock_threshold
+    return getattr(settings, 'LOW_STOCK_THRESHOLD', 10)
+
+
+def check_stock(product):
+    """Open or resolve the product's low-stock alert. Returns the open alert"""
+    alerts = _check([product])
+    return alerts[0] if alerts else None
+
+
+def check_stock_levels(products=None):
+    """Re-check many products, e.g. after a bulk update. Returns open alerts
+
+    Products are checked BATCH_SIZE at a time, each batch with one query for
+    its open alerts, one insert for the alerts it opens and one update for
+    those it resolves.
+    """
+    if products is None:
+        products = Product.objects.all()
+    elif not hasattr(products, 'select_related'):
+        products = Product.objects.filter(pk__in=products)
+    products = list(products.select_related('category'))
+    alerts = []
+    for start in range(0, len(products), BATCH_SIZE):
+        alerts.extend(_check(products[start:start + BATCH_SIZE]))
+    return alerts
+
+
+def _check(products):
+    open_alerts = {
+        alert.product_id: alert
+        for alert in StockAlert.objects.filter(product__in=products, resolved_at__isnull=True)
+    }
+    new_alerts = []
+    recovered = []
+    for product in products:
+        threshold = threshold_for(product)
+        is_low = product.is_active and product.stock_quantity <= threshold
+        alert = open_alerts.get(product.pk)
+        if is_low and alert is None:
+            new_alerts.append(StockAlert(product=product, threshold=threshold, stock_quantity=product.stock_quantity))
+        elif not is_low and alert is not None:
+            recovered.append(open_alerts.pop(product.pk).pk)
+
+    if recovered:
+        StockAlert.objects.filter(pk__in=recovered).update(resolved_at=timezone.now())
+    if new_alerts:
+        new_alerts = _open(new_alerts)
+        _notify_low_stock(new_alerts)
+        # bulk_create skips post_save, so tell the dashboard directly
+        from .signals import stock_alerts_opened
+        stock_alerts_opened.send(sender=StockAlert, alerts=new_alerts)
+    return list(open_alerts.values()) + new_alerts
+
+
+def _open(alerts):
+    """Insert new alerts; returns the ones this call opened"""
+    try:
+        with transaction.atomic():
+            return StockAlert.objects.bulk_create(alerts)
+    except IntegrityError:
+        pass
+    # A concurrent save opened some of them first, so open the rest one by one
+    opened = []
+    for alert in alerts:
+        try:
+            with transaction.atomic():
+                alert.save()
+        except IntegrityError:
+            continue
+        opened.append(alert)
+    return opened
+
+
+def low_stock_feed(limit=None):
+    """Open alerts, lowest stock first, with their products loaded"""
+    alerts = StockAlert.objects.filter(
+        resolved_at__isnull=True, product__is_active=True
+    ).select_related('product').order_by('product__stock_quantity')
+    return alerts[:limit] if limit else alerts
+
+
+def _notify_low_stock(alerts):
+    from chatbot.models import Notification
+
+    recipient = getattr(settings, 'CHATBOT_EMAIL', settings.DEFAULT_FROM_EMAIL)
+    try:
+        Notification.objects.bulk_create([
+            Notification(
+                notification_type='low_stock',
+                channel='email',
+                recipient=recipient,
+                subject=f'Low stock: {alert.product.name}',
+                message=(
+                    f'{alert.product.name} (SKU {alert.product.sku}) is down to {alert.stock_quantity} '
+                    f'{alert.product.get_unit_display().lower()} in stock (threshold {alert.threshold}).'
+                )
+            )
+            for alert in alerts
+        ])
+    except Exception as e:
+        logger.error(f"Error creating low stock notifications for {len(alerts)} product(s): {e}")
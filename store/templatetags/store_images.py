@@ -0,0 +1,23 @@
+"""
+Responsive image helpers for product and category images (see store.images)
+
+    {% load store_images %}
+    <img src="{{ product|image_url:320 }}" srcset="{{ product|srcset }}"
+         sizes="(min-width: 992px) 25vw, 100vw" loading="lazy" alt="...">
+"""
+from django import template
+
+from .. import images
+
+register = template.Library()
+
+
+@register.filter
+def image_url(obj, width=None):
+    """URL of the narrowest derivative at least ``width`` pixels wide"""
+    return images.image_url(obj, int(width) if width else None) or ''
+
+
+@register.filter
+def srcset(obj):
+    return images.srcset(obj)
@@ -1,3 +1,523 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from PIL import Image
+
+from chatbot.models import Notification
+
+from . import caching, catalog, customers, images, orders, sales
+from .models import Product, Category, Cart, Order, OrderItem, DailySales, CategorySales, ProductSales, StockAlert, CustomerSummary
+from .pagination import KeysetPaginator
+from .search import order_search_filter
+from .stock import check_stock_levels, low_stock_feed
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plan assertions target the SQLite planner')
+class HotQueryPlanTests(TestCase):
+    """The storefront and dashboard queries must be served by an index"""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Expected {index_name} in query plan:\n{plan}")
+
+    def test_orders_by_status_and_date(self):
+        self.assertUsesIndex(
+            Order.objects.filter(status='delivered', created_at__gte=timezone.now() - timedelta(days=30)),
+            'order_status_created_idx'
+        )
+
+    def test_orders_by_date(self):
+        self.assertUsesIndex(
+            Order.objects.filter(created_at__gte=timezone.now() - timedelta(days=7)),
+            'order_created_idx'
+        )
+
+    def test_low_stock_products(self):
+        self.assertUsesIndex(
+            Product.objects.filter(is_active=True, stock_quantity__lte=10),
+            'product_active_stock_idx'
+        )
+
+    def test_newest_active_products(self):
+        self.assertUsesIndex(
+            Product.objects.filter(is_active=True).order_by('-created_at')[:6],
+            'product_active_created_idx'
+        )
+
+    def test_order_search(self):
+        for text, index_name in (('Alice@Example.com', 'order_search_email_idx'), ('ali', 'order_search_name_idx')):
+            with self.subTest(text=text):
+                self.assertUsesIndex(Order.objects.filter(order_search_filter(text)), index_name)
+
+    def test_keyset_page_by_price(self):
+        paginator = KeysetPaginator(Product.objects.filter(is_active=True).order_by('price'), 12)
+        self.assertUsesIndex(
+            paginator.object_list.filter(paginator._after([Decimal('5.00'), 3])).order_by(*paginator.ordering)[:13],
+            'product_active_price_idx'
+        )
+
+    def test_cart_by_session_key(self):
+        self.assertUsesIndex(
+            Cart.objects.filter(session_key='abc'),
+            'session_key'
+        )
+
+
+class SalesRollupTests(TestCase):
+    """Sales rollups follow order creation and status changes"""
+
+    def setUp(self):
+        user = User.objects.create_user('customer')
+        category = Category.objects.create(name='Paint')
+        self.product = Product.objects.create(
+            name='Emulsion', category=category, description='Paint', price=Decimal('20.00'), sku='PAINT-1'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order = Order.objects.create(
+                user=user, email='c@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal('60.00')
+            )
+            OrderItem.objects.create(order=self.order, product=self.product, quantity=3, price=Decimal('20.00'))
+
+    def test_delivery_updates_rollups(self):
+        day = DailySales.objects.get()
+        self.assertEqual((day.order_count, day.revenue, day.delivered_revenue), (1, Decimal('60.00'), 0))
+        self.assertFalse(ProductSales.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.status = 'delivered'
+            self.order.save()
+
+        self.assertEqual(DailySales.objects.get().delivered_revenue, Decimal('60.00'))
+        product_sales = ProductSales.objects.get()
+        self.assertEqual((product_sales.units_sold, product_sales.revenue), (3, Decimal('60.00')))
+        self.assertEqual(CategorySales.objects.get().revenue, Decimal('60.00'))
+
+    def test_transaction_writes_each_row_once(self):
+        with mock.patch.object(sales, '_apply', wraps=sales._apply) as apply, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.order.status = 'delivered'
+            self.order.save()
+            OrderItem.objects.create(order=self.order, product=self.product, quantity=1, price=Decimal('20.00'))
+            self.order.total_amount = Decimal('80.00')
+            self.order.save()
+        # The day, the product and the category
+        self.assertEqual(apply.call_count, 3)
+        day = DailySales.objects.get()
+        self.assertEqual((day.order_count, day.revenue, day.delivered_revenue), (1, Decimal('80.00'), Decimal('80.00')))
+        self.assertEqual(ProductSales.objects.get().units_sold, 4)
+
+    def test_deltas_match_a_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Order.objects.create(
+                user=self.order.user, email='c@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal('20.00'), status='delivered'
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            item = OrderItem.objects.create(order=other, product=self.product, quantity=1, price=Decimal('20.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            item.quantity = 2
+            item.save()
+        for status in ('processing', 'shipped', 'delivered'):
+            with self.captureOnCommitCallbacks(execute=True):
+                orders.bulk_transition([self.order.pk], status, notify=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.delete()
+
+        def figures():
+            return [
+                list(model.objects.order_by('pk').values_list(*fields))
+                for model, fields in (
+                    (DailySales, ('date', 'order_count', 'revenue', 'delivered_count', 'delivered_revenue')),
+                    (ProductSales, ('date', 'product', 'units_sold', 'revenue')),
+                    (CategorySales, ('date', 'category', 'units_sold', 'revenue')),
+                )
+            ]
+
+        incremental = figures()
+        self.assertEqual(incremental[1][0][2:], (2, Decimal('40.00')))
+        sales.rebuild()
+        self.assertEqual(figures(), incremental)
+
+    def test_failed_rollup_does_not_fail_the_order(self):
+        with mock.patch.object(sales, '_apply', side_effect=DatabaseError), self.assertLogs(level='ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(
+                user=self.order.user, email='c@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal('10.00')
+            )
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_rebuild_picks_up_bulk_updates(self):
+        Order.objects.filter(pk=self.order.pk).update(status='delivered')
+        sales.rebuild()
+        self.assertEqual(DailySales.objects.get().delivered_count, 1)
+        self.assertEqual(ProductSales.objects.get().units_sold, 3)
+
+
+class StockAlertTests(TestCase):
+    """Low-stock alerts open and resolve as stock crosses the threshold"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Timber')
+        self.product = Product.objects.create(
+            name='Plank', category=self.category, description='Pine', price=Decimal('5.00'),
+            sku='TIMBER-1', stock_quantity=50
+        )
+
+    def test_alert_opens_once_and_resolves_on_restock(self):
+        self.assertFalse(StockAlert.objects.exists())
+
+        for quantity in (8, 3):
+            self.product.stock_quantity = quantity
+            self.product.save()
+        alert = StockAlert.objects.get()
+        self.assertEqual((alert.stock_quantity, alert.threshold), (8, 10))
+        self.assertEqual(Notification.objects.filter(notification_type='low_stock').count(), 1)
+        self.assertEqual([a.product for a in low_stock_feed()], [self.product])
+
+        self.product.stock_quantity = 40
+        self.product.save()
+        self.assertIsNotNone(StockAlert.objects.get().resolved_at)
+        self.assertFalse(low_stock_feed().exists())
+
+    def test_category_threshold_applies_to_products(self):
+        self.category.low_stock_threshold = 60
+        self.category.save()
+        self.assertTrue(low_stock_feed().filter(product=self.product).exists())
+
+        Product.objects.filter(pk=self.product.pk).update(low_stock_threshold=20)
+        check_stock_levels([self.product.pk])
+        self.assertFalse(low_stock_feed().exists())
+
+    def test_batch_is_checked_with_a_fixed_number_of_queries(self):
+        products = Product.objects.bulk_create([
+            Product(name=f'Board {n}', category=self.category, description='Pine', price=Decimal('5.00'),
+                    sku=f'BOARD-{n}', stock_quantity=50)
+            for n in range(20)
+        ])
+        Product.objects.filter(sku__startswith='BOARD-').update(stock_quantity=3)
+        # Products, open alerts, the alert insert in its savepoint, notifications
+        with self.assertNumQueries(6):
+            self.assertEqual(len(check_stock_levels([product.pk for product in products])), 20)
+        self.assertEqual(Notification.objects.filter(notification_type='low_stock').count(), 20)
+
+        Product.objects.filter(sku__startswith='BOARD-').update(stock_quantity=40)
+        with self.assertNumQueries(3):
+            self.assertEqual(check_stock_levels([product.pk for product in products]), [])
+        self.assertFalse(low_stock_feed().exists())
+
+
+class CustomerSummaryTests(TestCase):
+    """Customer summaries follow the customer's orders"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('customer')
+
+    def place_order(self, amount, status='pending'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Order.objects.create(
+                user=self.user, email='c@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal(amount), status=status
+            )
+
+    def test_orders_update_summary(self):
+        first = self.place_order('30.00')
+        self.place_order('50.00')
+        summary = CustomerSummary.objects.get(user=self.user)
+        self.assertEqual((summary.order_count, summary.lifetime_value, summary.average_basket), (2, Decimal('80.00'), Decimal('40.00')))
+        self.assertEqual(summary.first_order_at, first.created_at)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.status = 'cancelled'
+            first.save()
+        summary.refresh_from_db()
+        self.assertEqual((summary.order_count, summary.lifetime_value), (2, Decimal('50.00')))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(user=self.user).delete()
+        self.assertFalse(CustomerSummary.objects.exists())
+
+    def test_rebuild_and_cohorts(self):
+        self.place_order('20.00')
+        self.place_order('40.00')
+        CustomerSummary.objects.all().delete()
+
+        self.assertEqual(customers.rebuild(), 1)
+        self.assertEqual(CustomerSummary.objects.get().lifetime_value, Decimal('60.00'))
+        cohort = customers.cohorts()[-1]
+        self.assertEqual((cohort['customers'], cohort['repeat_customers']), (1, 1))
+
+
+class OrderSearchTests(TestCase):
+    """Order search input is routed to id, email or name lookups"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('AliceB')
+        self.order = Order.objects.create(
+            user=self.user, email='Alice@Example.com', phone='0', shipping_address='A',
+            billing_address='A', total_amount=Decimal('10.00')
+        )
+
+    def search(self, text):
+        return list(Order.objects.filter(order_search_filter(text)))
+
+    def test_query_routing(self):
+        self.assertEqual(self.search(f'#{self.order.pk}'), [self.order])
+        self.assertEqual(self.search(str(self.order.pk)), [self.order])
+        self.assertEqual(self.search('Alice@Example.com'), [self.order])
+        self.assertEqual(self.search('Alice@Exa'), [self.order])
+        self.assertEqual(self.search('alic'), [self.order])
+        self.assertEqual(self.search('lice'), [])
+        self.assertIsNone(order_search_filter('  '))
+
+    def test_email_matches_ignore_case(self):
+        self.assertEqual(self.search('alice@example.com'), [self.order])
+        self.assertEqual(self.search('ALICE@EXAMPLE.COM'), [self.order])
+        self.assertEqual(self.search('alice@exa'), [self.order])
+        self.assertEqual(self.search('ALICE@EXA'), [self.order])
+
+    def test_username_change_updates_search_name(self):
+        self.user.username = 'Bob'
+        self.user.save()
+        self.assertEqual(self.search('bo'), [self.order])
+
+
+class BulkOrderStatusTests(TestCase):
+    """Bulk status updates validate transitions and batch their side effects"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('customer')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.orders = [Order.objects.create(
+                user=self.user, email='c@example.com', phone='0', shipping_address='A',
+                billing_address='A', total_amount=Decimal('10.00'), status=status
+            ) for status in ('shipped', 'shipped', 'pending')]
+
+    def test_valid_transitions_are_applied_in_one_batch(self):
+        order_ids = [order.pk for order in self.orders] + [999999]
+        with self.captureOnCommitCallbacks(execute=True):
+            updated, skipped = orders.bulk_transition(order_ids, 'delivered')
+
+        self.assertEqual(len(updated), 2)
+        self.assertEqual(set(skipped), {self.orders[2].pk, 999999})
+        self.assertEqual(Order.objects.filter(status='delivered').count(), 2)
+        self.assertEqual(Notification.objects.filter(notification_type='order_status').count(), 2)
+        self.assertEqual(DailySales.objects.get().delivered_revenue, Decimal('20.00'))
+
+    def test_parse_order_ids(self):
+        self.assertEqual(orders.parse_order_ids(['order_id,email', '12,a@b.com', '#13', '', 'x']), [12, 13])
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages cover every row once, in order, in both directions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Tools')
+        # Repeated prices make the primary key tiebreaker matter
+        Product.objects.bulk_create([Product(
+            name=f'Tool {i:02d}', category=category, description='Tool',
+            price=Decimal(10 + i % 4), sku=f'TOOL-{i}'
+        ) for i in range(23)])
+
+    def paginator(self):
+        return KeysetPaginator(Product.objects.order_by('price'), 5)
+
+    def test_walk_forward_and_back(self):
+        expected = list(Product.objects.order_by('price', 'pk'))
+        page = self.paginator().get_page(None)
+        self.assertEqual(page.paginator.count, 23)
+        pages = [list(page)]
+        while page.has_next():
+            cursor = page.next_page_number()
+            with self.assertNumQueries(1):
+                page = self.paginator().get_page(cursor)
+                self.assertEqual(page.paginator.num_pages, 5)
+            pages.append(list(page))
+        self.assertEqual([product for rows in pages for product in rows], expected)
+        self.assertEqual(page.number, 5)
+
+        while page.has_previous():
+            page = self.paginator().get_page(page.previous_page_number())
+            self.assertEqual(list(page), pages[page.number - 1])
+        self.assertEqual(page.number, 1)
+
+    def test_page_numbers_last_and_bad_cursors(self):
+        expected = list(Product.objects.order_by('price', 'pk'))
+        self.assertEqual(list(self.paginator().get_page('2')), expected[5:10])
+        last = self.paginator().get_page('last')
+        self.assertEqual((list(last), last.number, last.has_next()), (expected[20:], 5, False))
+        self.assertEqual(list(self.paginator().get_page('not-a-cursor')), expected[:5])
+
+        # A cursor from another sort order starts over
+        cursor = KeysetPaginator(Product.objects.order_by('name'), 5).get_page(None).next_page_number()
+        self.assertEqual(self.paginator().get_page(cursor).number, 1)
+
+
+class CatalogImportTests(TestCase):
+    """Catalog files upsert products by SKU and report bad rows"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Cement')
+        self.product = Product.objects.create(
+            name='Portland Cement', category=self.category, description='50kg bag',
+            price=Decimal('12.00'), sku='CEM-1', stock_quantity=40
+        )
+
+    def test_creates_and_updates_by_sku(self):
+        rows = enumerate([
+            {'sku': 'CEM-1', 'name': 'Portland Cement', 'category': 'Cement', 'price': '13.50'},
+            {'sku': 'NAIL-1', 'name': 'Nails', 'category': 'Fasteners', 'price': '4', 'unit': 'Roll'},
+        ], start=2)
+        result = catalog.import_catalog(rows)
+
+        self.assertEqual((result.created, result.updated, result.errors), (1, 1, []))
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.price, self.product.stock_quantity), (Decimal('13.50'), 40))
+        nails = Product.objects.get(sku='NAIL-1')
+        self.assertEqual((nails.category.name, nails.unit), ('Fasteners', 'roll'))
+
+    def test_partial_columns_and_row_errors(self):
+        csv_file = io.BytesIO(
+            b'sku,stock_quantity\nCEM-1,3\nCEM-2,5\nCEM-1,4\n,1\nCEM-3,-2\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            result = catalog.import_file(csv_file, 'csv')
+
+        self.assertEqual(result.updated, 1)
+        self.assertEqual([line for line, sku, message in result.errors], [4, 5, 6, 3])
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock_quantity, self.product.description), (3, '50kg bag'))
+        self.assertTrue(StockAlert.objects.filter(product=self.product, resolved_at__isnull=True).exists())
+
+    def test_dry_run_writes_nothing(self):
+        result = catalog.import_catalog(enumerate([
+            {'sku': 'NEW-1', 'name': 'New', 'category': 'Cement', 'price': '1'},
+        ]), dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Product.objects.filter(sku='NEW-1').exists())
+
+
+class ImageVariantTests(TestCase):
+    """Uploads get WebP derivatives built off the request path"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.category = Category.objects.create(name='Paint')
+
+    def upload(self, name, size):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'orange').save(buffer, 'JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_builds_variants_and_replacement_resets_them(self):
+        with mock.patch.object(images, '_executor') as executor, self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(
+                name='Gloss Paint', category=self.category, description='Paint',
+                price=Decimal('30.00'), sku='PAINT-1', image=self.upload('gloss.jpg', (800, 600))
+            )
+        executor.submit.assert_called_once_with(images.generate_variants, Product, product.pk)
+
+        self.assertTrue(images.generate_variants(Product, product.pk))
+        product.refresh_from_db()
+        self.assertEqual(sorted(product.image_variants, key=int), ['160', '320', '640', '800'])
+        self.assertIn('gloss.jpg-320w.webp 320w', images.srcset(product))
+        self.assertTrue(images.image_url(product, 200).endswith('/gloss.jpg-320w.webp'))
+        self.assertTrue(images.image_url(product, images.THUMBNAIL_WIDTH).endswith('/gloss.jpg-160w.webp'))
+
+        # Saving without a new upload keeps them; a new image starts over
+        with mock.patch.object(images, '_executor') as executor, self.captureOnCommitCallbacks(execute=True):
+            product.save()
+            executor.submit.assert_not_called()
+            product.image = self.upload('matte.jpg', (100, 100))
+            product.save()
+        executor.submit.assert_called_once()
+        self.assertEqual(product.image_variants, {})
+        self.assertTrue(images.image_url(product, 320).endswith('/matte.jpg'))
+
+    def test_same_stem_with_other_extension_keeps_its_own_copies(self):
+        products = []
+        for i, name in enumerate(['drill.jpg', 'drill.png']):
+            with mock.patch.object(images, '_executor'):
+                products.append(Product.objects.create(
+                    name=f'Drill {i}', category=self.category, description='Drill',
+                    price=Decimal('90.00'), sku=f'DRILL-{i}', image=self.upload(name, (400, 300))
+                ))
+            self.assertTrue(images.generate_variants(Product, products[-1].pk))
+        jpg, png = [Product.objects.get(pk=product.pk) for product in products]
+        self.assertFalse(set(jpg.image_variants.values()) & set(png.image_variants.values()))
+
+        images.delete_variants(png.image_variants)
+        self.assertTrue(all(default_storage.exists(name) for name in jpg.image_variants.values()))
+
+
+class CatalogCacheTests(TestCase):
+    """Catalog pages are served from the cache until the catalog changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Roofing')
+        self.products = [Product.objects.create(
+            name=f'Roofing Sheet {i}', category=self.category, description='Aluminium',
+            price=Decimal('40.00'), sku=f'ROOF-{i}', stock_quantity=10
+        ) for i in range(3)]
+
+    def catalog_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in queries if '"store_product"' in q['sql'] or '"store_category"' in q['sql']]
+
+    def test_repeat_views_skip_catalog_queries(self):
+        product = self.products[0]
+        for url in ('/', '/products/', f'/products/{product.pk}/', f'/products/?category={self.category.pk}'):
+            response, queries = self.catalog_queries(url)
+            self.assertTrue(queries)
+            cached_response, queries = self.catalog_queries(url)
+            self.assertEqual(queries, [])
+            self.assertEqual(cached_response.content.count(b'Roofing Sheet'), response.content.count(b'Roofing Sheet'))
+
+    def test_save_and_delete_bump_the_version(self):
+        product = self.products[0]
+        self.client.get(f'/products/{product.pk}/')
+        version = caching.version()
+
+        product.price = Decimal('55.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        self.assertEqual(caching.version(), version + 1)
+        response, queries = self.catalog_queries(f'/products/{product.pk}/')
+        self.assertTrue(queries)
+        self.assertContains(response, '55.00')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[1].delete()
+        self.assertEqual(caching.version(), version + 2)
+        self.assertNotContains(self.client.get('/products/'), 'Roofing Sheet 1')
+
+    def test_bulk_edit_bumps_the_version(self):
+        product = self.products[2]
+        self.assertContains(self.client.get('/'), '40.00')
+        version = caching.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog.bulk_edit([{'sku': product.sku, 'updated_at': product.updated_at.isoformat(), 'price': '41.25'}])
+        self.assertEqual(caching.version(), version + 1)
+        self.assertContains(self.client.get('/'), '41.25')
@@ -4,26 +4,34 @@ from django.contrib.auth import login, authenticate, logout
 from django.http import JsonResponse
 from django.contrib import messages
 from django.db.models import Q
-from django.core.paginator import Paginator
+from django.db import transaction
 from .models import Product, Category, Cart, CartItem, Order, OrderItem
 from .forms import CustomUserCreationForm, CustomAuthenticationForm
+from .pagination import KeysetPaginator
+from . import caching
 import json
 
 
 def home(request):
-    featured_products = Product.objects.filter(is_active=True)[:8]
-    categories = Category.objects.all()[:6]
+    catalog_version = caching.version()
+    featured_products = caching.cached(
+        catalog_version, 'featured_products',
+        lambda: list(Product.objects.filter(is_active=True)[:8])
+    )
+    categories = caching.cached(catalog_version, 'home_categories', lambda: list(Category.objects.all()[:6]))
     cart = get_cart(request)
     return render(request, 'store/home.html', {
         'featured_products': featured_products,
         'categories': categories,
-        'cart': cart
+        'cart': cart,
+        **caching.template_context(catalog_version),
     })
 
 
 def product_list(request):
+    catalog_version = caching.version()
     products = Product.objects.filter(is_active=True)
-    categories = Category.objects.all()
+    categories = caching.cached(catalog_version, 'categories', lambda: list(Category.objects.all()))
     
     search_query = request.GET.get('search', '')
     category_id = request.GET.get('category', '')
@@ -50,9 +58,16 @@ def product_list(request):
     else:  # featured (default)
         products = products.order_by('-created_at')
     
-    paginator = Paginator(products, 12)
+    paginator = KeysetPaginator(products, 12)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if search_query:
+        page_obj = paginator.get_page(page_number)
+    else:
+        # Browsing pages are the same for everyone; searches vary too much to cache
+        page_obj = caching.cached(
+            catalog_version, 'product_page', lambda: _counted_page(paginator, page_number),
+            category_id, sort_by, page_number
+        )
     cart = get_cart(request)
     
     return render(request, 'store/product_list.html', {
@@ -61,21 +76,35 @@ def product_list(request):
         'search_query': search_query,
         'selected_category': category_id,
         'sort_by': sort_by,
-        'cart': cart
+        'cart': cart,
+        **caching.template_context(catalog_version),
     })
 
 
+def _counted_page(paginator, page_number):
+    page = paginator.get_page(page_number)
+    # A cached page no longer has its queryset to count from
+    paginator.count
+    return page
+
+
 def product_detail(request, pk):
-    product = get_object_or_404(Product, pk=pk, is_active=True)
-    related_products = Product.objects.filter(
-        category=product.category, is_active=True
-    ).exclude(pk=pk)[:4]
+    catalog_version = caching.version()
+    product = caching.cached(
+        catalog_version, 'product',
+        lambda: get_object_or_404(Product.objects.select_related('category'), pk=pk, is_active=True), pk
+    )
+    related_products = caching.cached(
+        catalog_version, 'related_products',
+        lambda: list(Product.objects.filter(category=product.category, is_active=True).exclude(pk=pk)[:4]), pk
+    )
     cart = get_cart(request)
     
     return render(request, 'store/product_detail.html', {
         'product': product,
         'related_products': related_products,
-        'cart': cart
+        'cart': cart,
+        **caching.template_context(catalog_version),
     })
 
 
@@ -190,24 +219,27 @@ def checkout(request):
         return redirect('store:cart')
     
     if request.method == 'POST':
-        order = Order.objects.create(
-            user=request.user,
-            email=request.POST.get('email'),
-            phone=request.POST.get('phone'),
-            shipping_address=request.POST.get('shipping_address'),
-            billing_address=request.POST.get('billing_address'),
-            total_amount=cart.get_total_price()
-        )
-        
-        for item in cart.items.all():
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                price=item.product.price
+        # One transaction, so the sales rollups are written once the order
+        # and all of its items are saved
+        with transaction.atomic():
+            order = Order.objects.create(
+                user=request.user,
+                email=request.POST.get('email'),
+                phone=request.POST.get('phone'),
+                shipping_address=request.POST.get('shipping_address'),
+                billing_address=request.POST.get('billing_address'),
+                total_amount=cart.get_total_price()
             )
-        
-        cart.items.all().delete()
+            
+            for item in cart.items.all():
+                OrderItem.objects.create(
+                    order=order,
+                    product=item.product,
+                    quantity=item.quantity,
+                    price=item.product.price
+                )
+            
+            cart.items.all().delete()
         messages.success(request, f'Order #{order.id} placed successfully!')
         return redirect('store:order_confirmation', order_id=order.id)
     